@@ -0,0 +1,157 @@
+"""
+Production settings for highland_fm_roster project.
+
+Use with DJANGO_SETTINGS_MODULE=highland_fm_roster.production. Everything
+that differs between deployments comes from the environment:
+
+- SECRET_KEY: Required.
+- ALLOWED_HOSTS: Comma separated host names.
+- DATABASE_ENGINE: "sqlite" (default) or "postgresql".
+- SQLITE_PATH: The SQLite database file. Default: db.sqlite3 in BASE_DIR.
+- CONN_MAX_AGE: Seconds a SQLite connection is reused. Default: 600.
+- POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST and
+  POSTGRES_PORT: The PostgreSQL database.
+- POSTGRES_POOL_SIZE: The most pooled PostgreSQL connections. Default: 10.
+- SERVER_TIMING: "1" to send Server-Timing headers and log view timings.
+- JOB_RUNNER: "1" to run background jobs in each server process, or run
+  `./manage.py run_jobs` beside the servers instead.
+- JOB_WORKERS: The most jobs a process runs at once. Default: 2.
+- STATIC_ROOT: Where collectstatic puts static files. Default: staticfiles
+  in BASE_DIR.
+- MEDIA_ROOT: Where the files of background jobs are kept, shared by the
+  servers and the job runners. Default: media in BASE_DIR.
+- CACHE_BACKEND: "file" (default), "database" or "redis".
+- CACHE_LOCATION: The cache directory, table or Redis URL. Default: cache
+  in BASE_DIR, roster_cache, or redis://127.0.0.1:6379/0.
+
+The cache must be shared by every process that serves or writes the
+database: the staff list and feed versions in roster.caching are bumped in
+the process that writes, and read by the ones that render. A per process
+cache would leave other server processes, and every page a `run_jobs`
+runner changes, stale. The database cache needs
+`./manage.py createcachetable`, and the Redis cache the redis package.
+
+Static files are built with `./manage.py vendor_assets` and
+`./manage.py collectstatic`, which fingerprints and precompresses them, and
+are served by roster.assets.StaticAssetsMiddleware.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from roster.database import WALPRAGMAS
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, MIDDLEWARE
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Set the SECRET_KEY environment variable.')
+
+SERVER_TIMING = os.environ.get('SERVER_TIMING') == '1'
+
+JOB_RUNNER = os.environ.get('JOB_RUNNER') == '1'
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('ALLOWED_HOSTS', 'localhost').split(',') if host.strip()]
+
+# Serve static files right after SecurityMiddleware, before sessions and auth.
+MIDDLEWARE = [MIDDLEWARE[0], 'roster.assets.StaticAssetsMiddleware', *MIDDLEWARE[1:]]
+
+
+# Static files
+
+STATIC_ROOT = os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'roster.assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+
+# Cache
+
+CACHEBACKEND = os.environ.get('CACHE_BACKEND', 'file')
+
+if CACHEBACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 20000,
+            },
+        }
+    }
+elif CACHEBACKEND == 'database':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'roster_cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 20000,
+            },
+        }
+    }
+elif CACHEBACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379/0'),
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'Unknown CACHE_BACKEND {CACHEBACKEND!r}, expected file, database or redis.')
+
+
+# Database
+
+DATABASEENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASEENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # Reuse connections across requests and check them before reuse.
+            'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Take the write lock when a transaction starts, so it waits on
+                # busy_timeout instead of failing when it later writes.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    SQLITE_PRAGMAS = WALPRAGMAS
+elif DATABASEENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'highland_fm_roster'),
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            # Pooled connections replace persistent ones, which must stay off.
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': 2,
+                    'max_size': int(os.environ.get('POSTGRES_POOL_SIZE', 10)),
+                },
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'Unknown DATABASE_ENGINE {DATABASEENGINE!r}, expected sqlite or postgresql.')
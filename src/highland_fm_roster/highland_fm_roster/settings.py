@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,13 +52,25 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
+    'roster.timing.ServerTimingMiddleware',
 ]
 
+# Server-Timing headers and the timing stats page, see roster.timing.
+SERVER_TIMING = True
+
+# Run background jobs in the server process, see roster.jobs. The
+# development server runs them in its reloaded child process only; other
+# commands leave them to `./manage.py run_jobs`.
+JOB_RUNNER = os.environ.get('JOB_RUNNER') == '1' or (
+    sys.argv[1:2] == ['runserver'] and (os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv)
+)
+JOB_WORKERS = 2
+
 ROOT_URLCONF = 'highland_fm_roster.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'roster.timing.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -85,6 +99,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Staff list items are cached one fragment per staff, so leave room for them.
+# This cache lives in each process, so pages changed by `./manage.py run_jobs`
+# show up late here; production.py configures a cache shared by processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'highland-fm-roster',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -121,6 +152,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Files made by background jobs, such as exports, are kept here.
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -0,0 +1,134 @@
+"""Bulk activity lookups for the staff assignments of a roster.
+`StaffRosterAssignment.isActive` answers for one assignment on one date. The
+`ActivityMatrix` answers for every staff on every day of a roster's month. It
+is loaded with a single query and stores each staff's row as an integer bitset
+where bit `i` is set when the staff is active on the `i`th day of the month.
+"""
+import calendar
+import datetime
+from collections.abc import Iterable
+
+from .models import Roster, StaffRosterAssignment
+
+
+def monthDates(roster: Roster) -> list[datetime.date]:
+    """Returns every date in the month of a roster.
+    Parameters:
+    - roster: The roster whose month is expanded.
+    Returns:
+    - list: The dates from the first to the last day of the month.
+    """
+    first = roster.date.replace(day=1)
+    _, numberOfDays = calendar.monthrange(first.year, first.month)
+    return [first + datetime.timedelta(days=offset) for offset in range(numberOfDays)]
+
+
+def windowBits(window, first: datetime.date, numberOfDays: int) -> int:
+    """Converts an active window into a bitset over a range of days.
+    Parameters:
+    - window: The result of `StaffRosterAssignment.activeWindow`.
+    - first: The date of bit 0.
+    - numberOfDays: The number of days covered by the bitset.
+    Returns:
+    - int: A bitset with a bit set for each day inside the window.
+    """
+    if window is None:
+        return 0
+    start, end = window
+    low = 0 if start is None else min(max((start - first).days, 0), numberOfDays)
+    high = numberOfDays if end is None else min(max((end - first).days, 0), numberOfDays)
+    if high <= low:
+        return 0
+    return ((1 << high) - 1) ^ ((1 << low) - 1)
+
+
+class ActivityMatrix:
+    """A staff by day matrix of whether a staff is active.
+    Attributes:
+    - dates: The dates of the columns.
+    - staffIds: The staff ids of the rows.
+    - groups: The group of each row.
+    - rows: The bitset of each row.
+    """
+
+    def __init__(self, dates: list[datetime.date], staffIds: list[int], groups: list[int], rows: list[int]):
+        self.dates = dates
+        self.staffIds = staffIds
+        self.groups = groups
+        self.rows = rows
+        self._index = {staffId: index for index, staffId in enumerate(staffIds)}
+
+    @classmethod
+    def fromValues(cls, dates: list[datetime.date], values: Iterable[tuple]) -> "ActivityMatrix":
+        """Builds a matrix from assignment values.
+        Parameters:
+        - dates: Consecutive dates of the columns.
+        - values: Tuples of (staff_id, active, vacationDate, resumptionDate, group).
+        Returns:
+        - ActivityMatrix: The matrix. A staff assigned twice is active when either assignment is.
+        """
+        first, numberOfDays = dates[0], len(dates)
+        index: dict[int, int] = {}
+        staffIds: list[int] = []
+        groups: list[int] = []
+        rows: list[int] = []
+        for staffId, active, vacationDate, resumptionDate, group in values:
+            bits = windowBits(
+                StaffRosterAssignment.activeWindow(active, vacationDate, resumptionDate), first, numberOfDays
+            )
+            if staffId in index:
+                rows[index[staffId]] |= bits
+                continue
+            index[staffId] = len(staffIds)
+            staffIds.append(staffId)
+            groups.append(group)
+            rows.append(bits)
+        return cls(dates, staffIds, groups, rows)
+
+    @classmethod
+    def forRosters(cls, rosters: Iterable[Roster]) -> list["ActivityMatrix"]:
+        """Loads the matrices of several rosters with one query."""
+        rosters = list(rosters)
+        values = (
+            StaffRosterAssignment.objects.filter(roster__in=rosters)
+            .order_by("id")
+            .values_list("roster_id", "staff_id", "active", "vacationDate", "resumptionDate", "group")
+        )
+        byRoster: dict[int, list[tuple]] = {roster.id: [] for roster in rosters}
+        for rosterId, *rest in values:
+            byRoster[rosterId].append(rest)
+        return [cls.fromValues(monthDates(roster), byRoster[roster.id]) for roster in rosters]
+
+    @classmethod
+    def forRoster(cls, roster: Roster) -> "ActivityMatrix":
+        """Loads the matrix of a roster with one query."""
+        return cls.forRosters([roster])[0]
+
+    def dayIndex(self, date: datetime.date) -> int:
+        """Returns the column of a date, or -1 if it is outside the matrix."""
+        index = (date - self.dates[0]).days
+        return index if 0 <= index < len(self.dates) else -1
+
+    def isActive(self, staffId: int, date: datetime.date) -> bool:
+        """Checks if a staff is active on a given day."""
+        row = self._index.get(staffId)
+        day = self.dayIndex(date)
+        if row is None or day < 0:
+            return False
+        return bool(self.rows[row] >> day & 1)
+
+    def activeRows(self, day: int) -> list[int]:
+        """Returns the rows that are active on the `day`th column."""
+        return [index for index, bits in enumerate(self.rows) if bits >> day & 1]
+
+    def activeStaffs(self, date: datetime.date) -> list[int]:
+        """Returns the ids of the staffs that are active on a given day."""
+        day = self.dayIndex(date)
+        if day < 0:
+            return []
+        return [self.staffIds[index] for index in self.activeRows(day)]
+
+    def activeDays(self, staffId: int) -> int:
+        """Returns how many days a staff is active."""
+        row = self._index.get(staffId)
+        return 0 if row is None else self.rows[row].bit_count()
@@ -0,0 +1,247 @@
+"""Simulated annealing search over the schedule of a roster.
+This module is pure Python and does not import Django, so the search can run
+in worker processes that never set Django up. A problem is a compact snapshot
+of an `ActivityMatrix`; a schedule is a list with one bitset per staff where
+bit `i` is set when the staff works the afternoon shift on day `i`. Staffs
+work the morning shift on every other active day.
+
+The score of a schedule is a weighted sum of soft constraint penalties, lower
+is better:
+- fairness: the square of each staff's mornings minus afternoons.
+- turnarounds: an afternoon shift followed by a morning shift the next day.
+- splits: members of a group working a different shift from the rest of the group.
+- coverage: the square of each day's morning minus afternoon head count.
+"""
+import math
+import random
+import time
+
+FAIRNESSWEIGHT = 1
+TURNAROUNDWEIGHT = 4
+SPLITWEIGHT = 2
+COVERAGEWEIGHT = 1
+
+STARTTEMPERATURE = 4.0
+ENDTEMPERATURE = 0.05
+# Share of moves that swap whole groups instead of single staffs.
+GROUPMOVES = 0.5
+# How many staffs are sampled when looking for one on the other shift.
+SWAPTRIES = 8
+
+
+class Problem:
+    """A compact snapshot of a roster to schedule.
+    Attributes:
+    - numberOfDays: The number of days in the roster.
+    - groups: The group of each staff.
+    - rows: The activity bitset of each staff.
+    - initial: The afternoon bitset of each staff to start searching from.
+    """
+
+    def __init__(self, numberOfDays: int, groups: list[int], rows: list[int], initial: list[int]):
+        self.numberOfDays = numberOfDays
+        self.groups = groups
+        self.rows = rows
+        self.initial = initial
+
+
+def scoreOf(problem: Problem, afternoons: list[int]) -> int:
+    """Computes the score of a schedule from scratch.
+    Parameters:
+    - problem: The problem being scheduled.
+    - afternoons: The afternoon bitset of each staff.
+    Returns:
+    - int: The weighted penalty of the schedule.
+    """
+    fairness = turnarounds = splits = coverage = 0
+    groupCounts: dict[tuple[int, int], list[int]] = {}
+    for day in range(problem.numberOfDays):
+        difference = 0
+        for row, afternoon, group in zip(problem.rows, afternoons, problem.groups):
+            if row >> day & 1:
+                isAfternoon = afternoon >> day & 1
+                difference += -1 if isAfternoon else 1
+                groupCounts.setdefault((day, group), [0, 0])[isAfternoon] += 1
+        coverage += difference * difference
+    for row, afternoon in zip(problem.rows, afternoons):
+        active = row.bit_count()
+        afternoonCount = (afternoon & row).bit_count()
+        balance = active - 2 * afternoonCount
+        fairness += balance * balance
+        # An afternoon on day i followed by an active morning on day i + 1.
+        turnarounds += (afternoon & row & (row & ~afternoon) >> 1).bit_count()
+    splits = sum(min(counts) for counts in groupCounts.values())
+    return (
+        FAIRNESSWEIGHT * fairness
+        + TURNAROUNDWEIGHT * turnarounds
+        + SPLITWEIGHT * splits
+        + COVERAGEWEIGHT * coverage
+    )
+
+
+def toBitsets(afternoon: list[list[bool]]) -> list[int]:
+    """Converts afternoon[staff][day] flags into an afternoon bitset per staff."""
+    return [sum(1 << day for day, isAfternoon in enumerate(flags) if isAfternoon) for flags in afternoon]
+
+
+class Search:
+    """The mutable state of one annealing run with incrementally maintained penalties.
+    Attributes:
+    - problem: The problem being scheduled.
+    - active: active[staff][day] for each staff.
+    - afternoon: afternoon[staff][day] for each staff.
+    - balances: Mornings minus afternoons of each staff.
+    - coverage: Morning minus afternoon head count of each day.
+    - groupCounts: [mornings, afternoons] of each (day, group index).
+    - members: The active staffs of each (day, group index).
+    - cells: The active (staff, day) pairs.
+    - dayStaffs: The active staffs of each day.
+    - score: The current score.
+    """
+
+    def __init__(self, problem: Problem, afternoons: list[int]):
+        numberOfDays = problem.numberOfDays
+        self.problem = problem
+        groupIndex = {group: index for index, group in enumerate(sorted(set(problem.groups)))}
+        self.groupOf = [groupIndex[group] for group in problem.groups]
+        self.active = [[bool(row >> day & 1) for day in range(numberOfDays)] for row in problem.rows]
+        self.afternoon = [
+            [bool(bits >> day & 1) and active[day] for day in range(numberOfDays)]
+            for bits, active in zip(afternoons, self.active)
+        ]
+        self.balances = [0] * len(problem.rows)
+        self.coverage = [0] * numberOfDays
+        self.groupCounts = [[[0, 0] for _ in groupIndex] for _ in range(numberOfDays)]
+        self.members: list[list[list[int]]] = [[[] for _ in groupIndex] for _ in range(numberOfDays)]
+        for staff, (active, afternoon) in enumerate(zip(self.active, self.afternoon)):
+            for day in range(numberOfDays):
+                if active[day]:
+                    sign = -1 if afternoon[day] else 1
+                    self.balances[staff] += sign
+                    self.coverage[day] += sign
+                    self.groupCounts[day][self.groupOf[staff]][afternoon[day]] += 1
+                    self.members[day][self.groupOf[staff]].append(staff)
+        self.cells = [
+            (staff, day) for staff, active in enumerate(self.active) for day in range(numberOfDays) if active[day]
+        ]
+        self.dayStaffs = [[staff for staff, active in enumerate(self.active) if active[day]] for day in range(numberOfDays)]
+        self.score = scoreOf(problem, self.afternoons())
+
+    def afternoons(self) -> list[int]:
+        """Returns the current schedule as afternoon bitsets."""
+        return toBitsets(self.afternoon)
+
+    def partner(self, staff: int, day: int, randomizer: random.Random) -> int | None:
+        """Picks a random active staff working the other shift on a day, if one is found quickly."""
+        current = self.afternoon[staff][day]
+        candidates = self.dayStaffs[day]
+        for _ in range(SWAPTRIES):
+            other = randomizer.choice(candidates)
+            if self.afternoon[other][day] != current:
+                return other
+        return None
+
+    def groupMates(self, staff: int, day: int) -> list[int]:
+        """Returns the active members of a staff's group on the same shift on a day."""
+        current = self.afternoon[staff][day]
+        return [mate for mate in self.members[day][self.groupOf[staff]] if self.afternoon[mate][day] == current]
+
+    def delta(self, staff: int, day: int) -> int:
+        """Returns the change in score if a staff switches shift on a day."""
+        active = self.active[staff]
+        afternoon = self.afternoon[staff]
+        current = afternoon[day]
+        step = 2 if current else -2
+        balance = self.balances[staff]
+        fairness = (balance + step) ** 2 - balance * balance
+        difference = self.coverage[day]
+        coverage = (difference + step) ** 2 - difference * difference
+        mornings, afternoons = self.groupCounts[day][self.groupOf[staff]]
+        if current:
+            split = min(mornings + 1, afternoons - 1) - min(mornings, afternoons)
+        else:
+            split = min(mornings - 1, afternoons + 1) - min(mornings, afternoons)
+        turnarounds = 0
+        if day > 0 and active[day - 1] and afternoon[day - 1]:
+            # Switching to morning creates a turnaround, switching to afternoon removes one.
+            turnarounds += 1 if current else -1
+        if day + 1 < len(active) and active[day + 1] and not afternoon[day + 1]:
+            turnarounds += -1 if current else 1
+        return (
+            FAIRNESSWEIGHT * fairness
+            + TURNAROUNDWEIGHT * turnarounds
+            + SPLITWEIGHT * split
+            + COVERAGEWEIGHT * coverage
+        )
+
+    def flip(self, staff: int, day: int, delta: int) -> None:
+        """Switches the shift of a staff on a day."""
+        current = self.afternoon[staff][day]
+        step = 2 if current else -2
+        self.afternoon[staff][day] = not current
+        self.balances[staff] += step
+        self.coverage[day] += step
+        counts = self.groupCounts[day][self.groupOf[staff]]
+        counts[current] -= 1
+        counts[not current] += 1
+        self.score += delta
+
+
+def anneal(
+    problem: Problem, seed: int, timeBudget: float | None = None, iterations: int | None = None
+) -> tuple[int, list[int]]:
+    """Runs one simulated annealing restart.
+    Stops after `timeBudget` seconds or `iterations` moves, whichever comes first.
+    Parameters:
+    - problem: The problem being scheduled.
+    - seed: Seed of the random number generator.
+    - timeBudget: Optional wall clock budget in seconds.
+    - iterations: Optional number of moves.
+    Returns:
+    - tuple: (score, afternoons) of the best schedule the walk went through,
+      which may be the initial one.
+    """
+    if timeBudget is None and iterations is None:
+        raise ValueError("One of timeBudget and iterations is required.")
+    search = Search(problem, problem.initial)
+    if not search.cells:
+        return search.score, list(problem.initial)
+    # The walk accepts worse moves, so the best schedule seen is kept aside.
+    bestScore = search.score
+    bestAfternoon = [row[:] for row in search.afternoon]
+    randomizer = random.Random(seed)
+    start = time.perf_counter()
+    cooling = math.log(ENDTEMPERATURE / STARTTEMPERATURE)
+    iteration = 0
+    while iterations is None or iteration < iterations:
+        # Checking the clock is slow, so it and the temperature are only updated every few hundred moves.
+        if iteration % 256 == 0:
+            progress = iteration / iterations if iterations is not None else 0.0
+            if timeBudget is not None:
+                progress = max(progress, (time.perf_counter() - start) / timeBudget if timeBudget > 0 else 1)
+            temperature = STARTTEMPERATURE * math.exp(cooling * min(progress, 1))
+            if progress >= 1:
+                break
+        staff, day = randomizer.choice(search.cells)
+        # Swapping a staff or group with one on the other shift keeps the day's coverage.
+        # When no partner is found the move is a single switch.
+        other = search.partner(staff, day, randomizer)
+        if randomizer.random() < GROUPMOVES:
+            moved = search.groupMates(staff, day)
+            if other is not None:
+                moved += search.groupMates(other, day)
+        else:
+            moved = [staff] if other is None else [staff, other]
+        delta = 0
+        for mover in moved:
+            step = search.delta(mover, day)
+            search.flip(mover, day, step)
+            delta += step
+        if delta > 0 and randomizer.random() >= math.exp(-delta / temperature):
+            for mover in reversed(moved):
+                search.flip(mover, day, search.delta(mover, day))
+        elif search.score < bestScore:
+            bestScore = search.score
+            bestAfternoon = [row[:] for row in search.afternoon]
+        iteration += 1
+    return bestScore, toBitsets(bestAfternoon)
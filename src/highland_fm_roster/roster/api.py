@@ -0,0 +1,173 @@
+"""A read only JSON API for other station tools.
+Each resource is a list of rows in `updatedAt` then `id` order, paginated
+with keyset cursors, see `roster.pagination`. The `(updatedAt, id)` index of
+each model answers every page and every `since` filter with a range scan.
+Rows are read with `values()` and dumped to JSON as they are, without
+building model instances.
+
+A poller passes the `updatedAt` of the last row it saw as `since`. A row's
+`updatedAt` is set before its transaction commits, so a row can become
+visible after a poll that already went past its `updatedAt`. `since`
+therefore also returns the rows of the `SINCEOVERLAP` before it, as well
+as the rows at `since` itself. A poller sees every change whose
+transaction took less than `SINCEOVERLAP`, and sees some rows again, so
+it must apply rows by id. The same holds for the tombstones of the
+`deleted` resource.
+
+Deleted rows are listed by the `deleted` resource, one tombstone per row
+with its resource and id, see `roster.tombstones`. Generating a roster
+replaces its days and shifts, so pollers see tombstones for the old rows
+and new rows for the same dates.
+"""
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Day, DeletedRow, Roster, Shift, Staff
+from .pagination import CursorJSONEncoder, KeysetPage, akeysetPage
+
+APIORDERING = ("updatedAt", "id")
+# How long before `since` rows are sent again, for transactions that commit late.
+SINCEOVERLAP = datetime.timedelta(seconds=60)
+DEFAULTPAGESIZE = 100
+MAXPAGESIZE = 1000
+
+
+class ApiResource:
+    """A model exposed by the API.
+    Attributes:
+    - model: The model.
+    - fields: {public name: field path} of the fields clients may ask for.
+    - relatedFields: Fields filled in by a second query over a page's rows.
+    """
+
+    def __init__(self, model, fields: dict[str, str], relatedFields: Sequence[str] = ()):
+        self.model = model
+        self.fields = fields
+        self.relatedFields = tuple(relatedFields)
+
+    def fieldNames(self, requested: str | None) -> list[str]:
+        """Returns the fields of a `fields` parameter, every field when it is empty.
+        The ordering fields are always included, as cursors and `since` need them.
+        Raises:
+        - ValueError: If a field is unknown.
+        """
+        names = [*self.fields, *self.relatedFields]
+        if not requested:
+            return names
+        fields = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+        return [*APIORDERING, *(name for name in fields if name not in APIORDERING)]
+
+    def rows(self, fieldNames: Sequence[str], since: datetime.datetime | None = None) -> QuerySet:
+        """Returns the `values()` queryset of the given fields.
+        With `since`, only the rows changed at or after `SINCEOVERLAP` before it.
+        """
+        plain = [name for name in fieldNames if self.fields.get(name) == name]
+        renamed = {name: F(self.fields[name]) for name in fieldNames if name in self.fields and name not in plain}
+        queryset = self.model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(updatedAt__gte=since - SINCEOVERLAP)
+        return queryset.values(*plain, **renamed)
+
+    async def aaddRelated(self, rows: list[dict], fieldNames: Sequence[str]) -> None:
+        """Fills in the related fields of a page's rows."""
+
+
+class ShiftResource(ApiResource):
+    """Shifts, with the ids of their staffs as the optional `staffs` field."""
+
+    async def aaddRelated(self, rows: list[dict], fieldNames: Sequence[str]) -> None:
+        """Adds the staff ids of each shift with one query over the through table."""
+        if "staffs" not in fieldNames:
+            return
+        staffs: dict[int, list[int]] = {row["id"]: [] for row in rows}
+        links = Shift.staffs.through.objects.filter(shift_id__in=staffs).order_by("shift_id", "staff_id")
+        async for shiftId, staffId in links.values_list("shift_id", "staff_id"):
+            staffs[shiftId].append(staffId)
+        for row in rows:
+            row["staffs"] = staffs[row["id"]]
+
+
+RESOURCES = {
+    "staffs": ApiResource(
+        Staff,
+        {name: name for name in ("id", "firstName", "middleName", "lastName", "createdAt", "updatedAt")},
+    ),
+    "rosters": ApiResource(Roster, {name: name for name in ("id", "date", "createdAt", "updatedAt")}),
+    "days": ApiResource(Day, {name: name for name in ("id", "date", "createdAt", "updatedAt")}),
+    "shifts": ShiftResource(
+        Shift,
+        {
+            "id": "id",
+            "shiftType": "shiftType",
+            "day": "day",
+            "date": "day__date",
+            "createdAt": "createdAt",
+            "updatedAt": "updatedAt",
+        },
+        relatedFields=["staffs"],
+    ),
+    "deleted": ApiResource(DeletedRow, {name: name for name in ("id", "resource", "rowId", "createdAt", "updatedAt")}),
+}
+
+
+def parseSince(value: str | None) -> datetime.datetime | None:
+    """Parses a `since` parameter; naive datetimes are in the current time zone.
+    Raises:
+    - ValueError: If the datetime is malformed.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value.replace(" ", "+"))
+    if since is None:
+        raise ValueError("Invalid since, expected an ISO 8601 datetime.")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def parsePageSize(value: str | None) -> int:
+    """Parses a `limit` parameter into a page size from 1 to MAXPAGESIZE.
+    Raises:
+    - ValueError: If the limit is not a number.
+    """
+    if not value:
+        return DEFAULTPAGESIZE
+    return min(max(int(value), 1), MAXPAGESIZE)
+
+
+async def apage(
+    resource: ApiResource,
+    fieldNames: Sequence[str],
+    cursor: str | None,
+    pageSize: int,
+    since: datetime.datetime | None = None,
+) -> KeysetPage:
+    """Fetches a page of a resource's rows.
+    Parameters:
+    - resource: The resource.
+    - fieldNames: The fields of the rows, from `ApiResource.fieldNames`.
+    - cursor: The cursor of the page, or None for the first page.
+    - pageSize: The number of rows in a page.
+    - since: Only rows updated since this time, less `SINCEOVERLAP`, when given.
+    Returns:
+    - KeysetPage: The row dicts and the cursor of the next page.
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    page = await akeysetPage(resource.rows(fieldNames, since), APIORDERING, cursor, pageSize)
+    if page.rows and resource.relatedFields:
+        await resource.aaddRelated(page.rows, fieldNames)
+    return page
+
+
+def dumpPage(page: KeysetPage) -> str:
+    """Serializes a page as `{"results": [...], "next": cursor}`."""
+    return json.dumps({"results": page.rows, "next": page.nextCursor}, cls=CursorJSONEncoder, separators=(",", ":"))
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RosterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'roster'
+
+    def ready(self):
+        from . import assets, signals  # noqa: F401
+        if getattr(settings, 'JOB_RUNNER', False):
+            from .jobs import jobRunner
+            jobRunner.start()
@@ -0,0 +1,189 @@
+"""Self hosted front-end assets.
+Third party assets are kept in `roster/static/roster/vendor`, so pages load
+nothing from other origins and pay no extra DNS or TLS round trips. The
+`vendor_assets` command downloads them from `VENDORASSETS`. A file that was
+not downloaded is an error of `./manage.py check --deploy`, and
+`collectstatic` fails on it.
+
+In production `collectstatic` runs the files through
+`CompressedManifestStaticFilesStorage`, which adds a content hash to their
+names and writes gzip copies, and brotli copies when the brotli package is
+installed. `StaticAssetsMiddleware` then serves the collected files in the
+best encoding the client accepts, and lets browsers cache fingerprinted
+files forever.
+"""
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # Brotli copies are skipped without the brotli package.
+    brotli = None
+
+VENDORDIR = Path(__file__).resolve().parent / "static" / "roster" / "vendor"
+VENDORASSETS = {
+    "htmx.min.js": "https://unpkg.com/htmx.org@2.0.10/dist/htmx.min.js",
+    "materialize.min.css": "https://cdn.jsdelivr.net/npm/@materializecss/materialize@2.1.1/dist/css/materialize.min.css",
+    "materialize.min.js": "https://cdn.jsdelivr.net/npm/@materializecss/materialize@2.1.1/dist/js/materialize.min.js",
+    "material-symbols-outlined.woff2": (
+        "https://cdn.jsdelivr.net/npm/material-symbols@0.27.0/material-symbols-outlined.woff2"
+    ),
+}
+
+# Fonts and images are compressed already.
+COMPRESSIBLE = re.compile(r"\.(css|js|mjs|json|map|svg|txt|xml|html)$")
+# ManifestStaticFilesStorage inserts the first 12 hex digits of the md5 of the content.
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# (encoding, suffix) in order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def missingVendorAssets() -> list[str]:
+    """Returns the names of the `VENDORASSETS` that are not in `VENDORDIR`."""
+    return [name for name in VENDORASSETS if not (VENDORDIR / name).is_file()]
+
+
+@register(Tags.staticfiles, deploy=True)
+def checkVendorAssets(app_configs, **kwargs) -> list[Error]:
+    """Reports the third party assets that were not vendored."""
+    return [
+        Error(
+            f"The front-end asset {name} is not vendored.",
+            hint="Run ./manage.py vendor_assets and commit roster/static/roster/vendor.",
+            id="roster.E001",
+        )
+        for name in missingVendorAssets()
+    ]
+
+
+def compressedCopies(data: bytes) -> dict[str, bytes]:
+    """Returns the gzip and brotli copies of data that are smaller than it.
+    Returns:
+    - dict: {suffix: compressed data}.
+    """
+    copies = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies[".br"] = brotli.compress(data)
+    return {suffix: copy for suffix, copy in copies.items() if len(copy) < len(data)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Fingerprints static files and writes precompressed copies of the text ones."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Hashes the collected files, then compresses the hashed copies."""
+        hashedNames = []
+        for name, hashedName, processed in super().post_process(paths, dry_run, **options):
+            if isinstance(hashedName, str):
+                hashedNames.append(hashedName)
+            yield name, hashedName, processed
+        if dry_run:
+            return
+        for hashedName in hashedNames:
+            if not COMPRESSIBLE.search(hashedName):
+                continue
+            with self.open(hashedName) as file:
+                data = file.read()
+            for suffix, copy in compressedCopies(data).items():
+                with open(self.path(hashedName + suffix), "wb") as file:
+                    file.write(copy)
+
+
+def acceptedEncodings(request) -> set[str]:
+    """Returns the content codings of the request's Accept-Encoding header."""
+    encodings = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, parameters = part.partition(";")
+        quality = parameters.replace(" ", "").removeprefix("q=")
+        try:
+            if parameters and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def assetResponse(request, root: Path, name: str):
+    """Returns the response for a collected static file, or None if there is no such file.
+    Parameters:
+    - request: The request.
+    - root: STATIC_ROOT.
+    - name: The path of the file below STATIC_URL.
+    """
+    try:
+        path = Path(safe_join(root, name))
+    except SuspiciousFileOperation:
+        return None
+    if not path.is_file():
+        return None
+    accepted = acceptedEncodings(request)
+    encoding = None
+    for candidate, suffix in ENCODINGS:
+        if candidate in accepted and path.with_name(path.name + suffix).is_file():
+            encoding = candidate
+            path = path.with_name(path.name + suffix)
+            break
+    contentType = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if FINGERPRINTED.search(name):
+        response = HttpResponse(path.read_bytes(), content_type=contentType)
+        response["Cache-Control"] = IMMUTABLE
+    else:
+        lastModified = int(path.stat().st_mtime)
+        response = get_conditional_response(request, last_modified=lastModified)
+        if response is None:
+            response = HttpResponse(path.read_bytes(), content_type=contentType)
+        response["Last-Modified"] = http_date(lastModified)
+        response["Cache-Control"] = "no-cache"
+    if encoding is not None:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+class StaticAssetsMiddleware:
+    """Serves the files that `collectstatic` put in STATIC_ROOT."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "STATIC_ROOT", None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = Path(settings.STATIC_ROOT)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.isAsync = iscoroutinefunction(get_response)
+        if self.isAsync:
+            markcoroutinefunction(self)
+
+    def asset(self, request):
+        """Returns the response for a static file request, else None."""
+        if request.method not in ("GET", "HEAD") or not request.path_info.startswith(self.prefix):
+            return None
+        return assetResponse(request, self.root, request.path_info.removeprefix(self.prefix))
+
+    def __call__(self, request):
+        """Serves static files and passes other requests on."""
+        if self.isAsync:
+            return self.acall(request)
+        response = self.asset(request)
+        return response if response is not None else self.get_response(request)
+
+    async def acall(self, request):
+        """Serves static files and passes other requests on asynchronously."""
+        response = self.asset(request)
+        return response if response is not None else await self.get_response(request)
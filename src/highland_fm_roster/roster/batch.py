@@ -0,0 +1,45 @@
+"""Batch actions on many staffs at once.
+The staff list lets users tick several staffs and delete them or set their
+names in one request. Each action is a single set based `delete` or
+`update` over the ticked ids in one transaction, instead of a read and a
+write per staff.
+"""
+from collections.abc import Collection
+
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bumpFeedVersions, bumpStaffListVersion
+from .editing import nameChanges
+from .models import Staff
+from .tombstones import recordedDeletions
+
+
+def deleteStaffs(ids: Collection[int]) -> int:
+    """Deletes the staffs with the given ids and their assignments and shifts.
+    Parameters:
+    - ids: The staff ids.
+    Returns:
+    - int: The number of staffs deleted.
+    """
+    with transaction.atomic(), recordedDeletions():
+        _, deleted = Staff.objects.filter(id__in=ids).delete()
+    return deleted.get(Staff._meta.label, 0)
+
+
+def editStaffs(ids: Collection[int], names: dict[str, str]) -> list[Staff]:
+    """Sets the given name fields of the staffs with the given ids.
+    The search fields and `updatedAt` are set with `nameChanges`, and the
+    cached staff list pages and feeds are invalidated.
+    Parameters:
+    - ids: The staff ids.
+    - names: {name field: new value} for the fields to change.
+    Returns:
+    - list: The edited staffs.
+    """
+    with transaction.atomic():
+        Staff.objects.filter(id__in=ids).update(**nameChanges(names, timezone.now()))
+        staffs = list(Staff.objects.filter(id__in=ids))
+    bumpStaffListVersion()
+    bumpFeedVersions(ids)
+    return staffs
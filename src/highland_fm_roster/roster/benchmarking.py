@@ -0,0 +1,171 @@
+"""Benchmarks of views and model operations against the current database.
+The `bench` management command runs them on a seeded database (see the
+`seed` command) and reports timings as JSON. Register a new benchmark with
+the `benchmark` decorator on a setup function that returns the callable to
+time, or None when the database lacks the data it needs.
+"""
+import statistics
+import time
+from collections.abc import Callable
+
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from .activity import ActivityMatrix
+from .generation import generateRoster
+from .models import Roster, Staff
+from .pagination import keysetPage
+from .scheduler import rotationSchedule
+from .views import STAFFORDERING, StaffListView
+
+Setup = Callable[[Client], Callable[[], object] | None]
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Registers a benchmark setup function under a name."""
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def request(client: Client, method: str, url: str, **extra) -> Callable[[], object]:
+    """Returns a callable that makes a request and fails on error responses."""
+    def call():
+        response = getattr(client, method)(url, **extra)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}.")
+        return response
+    return call
+
+
+def rolledBack(function: Callable[[], object]) -> Callable[[], object]:
+    """Returns a callable that runs a function in a transaction that is rolled back."""
+    def call():
+        with transaction.atomic():
+            function()
+            transaction.set_rollback(True)
+    return call
+
+
+class QueryCounter:
+    """An `execute_wrapper` that counts queries.
+    `CaptureQueriesContext` cannot be used around test client requests
+    because every request resets `connection.queries`.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def latestRoster() -> Roster | None:
+    """Returns the roster with the latest date."""
+    return Roster.objects.order_by("-date").first()
+
+
+@benchmark("staffList")
+def staffList(client):
+    return request(client, "get", reverse("roster:staffsList"))
+
+
+@benchmark("staffListNextPage")
+def staffListNextPage(client):
+    cursor = keysetPage(Staff.objects.all(), STAFFORDERING, None, StaffListView.pageSize).nextCursor
+    if cursor is None:
+        return None
+    return request(client, "get", reverse("roster:staffsList"), data={"cursor": cursor}, HTTP_HX_REQUEST="true")
+
+
+@benchmark("staffSearch")
+def staffSearch(client):
+    staff = Staff.objects.order_by("id").first()
+    if staff is None:
+        return None
+    return request(client, "get", reverse("roster:searchStaffs"), data={"q": staff.firstName[:2]})
+
+
+@benchmark("staffEditForm")
+def staffEditForm(client):
+    staff = Staff.objects.order_by("id").first()
+    if staff is None:
+        return None
+    return request(client, "get", reverse("roster:staffActions", args=[staff.id]))
+
+
+@benchmark("activityMatrix")
+def activityMatrix(client):
+    roster = latestRoster()
+    if roster is None:
+        return None
+    return lambda: ActivityMatrix.forRoster(roster)
+
+
+@benchmark("rotationSchedule")
+def rotationScheduleBenchmark(client):
+    roster = latestRoster()
+    if roster is None:
+        return None
+    matrix = ActivityMatrix.forRoster(roster)
+    return lambda: rotationSchedule([matrix])
+
+
+@benchmark("generateRoster")
+def generateRosterBenchmark(client):
+    roster = latestRoster()
+    if roster is None:
+        return None
+    return rolledBack(lambda: generateRoster(roster))
+
+
+def runBenchmarks(repeat: int = 5, names: list[str] | None = None) -> dict[str, dict[str, float]]:
+    """Runs the registered benchmarks.
+    Each benchmark runs once to count its queries and warm caches, then
+    `repeat` more times to be timed.
+    Parameters:
+    - repeat: How many timed runs each benchmark gets.
+    - names: The benchmarks to run, or None for all of them.
+    Returns:
+    - dict: minMs, medianMs and queries of each benchmark that had data to run on.
+    """
+    client = Client(SERVER_NAME="localhost")
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        function = setup(client)
+        if function is None:
+            continue
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            function()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "minMs": round(min(timings), 3),
+            "medianMs": round(statistics.median(timings), 3),
+            "queries": counter.count,
+        }
+    return results
+
+
+def compareResults(old: dict, new: dict) -> list[str]:
+    """Formats a comparison of two benchmark runs, one line per benchmark."""
+    lines = [f"{'benchmark':<24}{'old ms':>12}{'new ms':>12}{'change':>10}{'queries':>12}"]
+    for name, result in new.items():
+        before = old.get(name)
+        if before is None:
+            lines.append(f"{name:<24}{'-':>12}{result['medianMs']:>12.2f}{'new':>10}{result['queries']:>12}")
+            continue
+        change = (result["medianMs"] - before["medianMs"]) / before["medianMs"] * 100 if before["medianMs"] else 0
+        queries = f"{before['queries']}->{result['queries']}"
+        lines.append(f"{name:<24}{before['medianMs']:>12.2f}{result['medianMs']:>12.2f}{change:>+9.1f}%{queries:>12}")
+    return lines
@@ -0,0 +1,3 @@
+"""Benchmarks for the roster app.
+Run them with `./manage.py test roster.benchmarks --pattern "bench_*.py"`.
+"""
@@ -0,0 +1,63 @@
+"""Benchmarks for serializing shifts for the JSON API."""
+import datetime
+import time
+
+from asgiref.sync import async_to_sync
+from django.core import serializers
+from django.test import TestCase
+
+from roster.api import MAXPAGESIZE, RESOURCES, apage, dumpPage
+from roster.generation import insertShiftStaffs
+from roster.models import Day, Shift, Staff
+
+from .utils import reportRate
+
+NUMBEROFSHIFTS = 100_000
+
+
+class BenchApiShifts(TestCase):
+    """Times serializing 100k shifts, each with two staffs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seeds 50k days of a morning and an afternoon shift."""
+        staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Api") for index in range(20)])
+        first = datetime.date(year=1900, month=1, day=1)
+        days = Day.objects.bulk_create(
+            [Day(date=first + datetime.timedelta(days=offset)) for offset in range(NUMBEROFSHIFTS // 2)], batch_size=5000
+        )
+        shifts = Shift.objects.bulk_create(
+            [Shift(day=day, shiftType=shiftType) for day in days for shiftType in (Shift.MORNINGSHIFT, Shift.AFTERNOONSHIFT)],
+            batch_size=5000,
+        )
+        insertShiftStaffs(
+            (shift.id, staffs[(index + offset) % len(staffs)].id) for index, shift in enumerate(shifts) for offset in (0, 1)
+        )
+
+    def walk(self, fields: str | None) -> int:
+        """Serializes every shift a page at a time, following the cursors."""
+        resource = RESOURCES["shifts"]
+        fieldNames = resource.fieldNames(fields)
+        cursor, rows = None, 0
+        while True:
+            page = async_to_sync(apage)(resource, fieldNames, cursor, MAXPAGESIZE)
+            dumpPage(page)
+            rows += len(page.rows)
+            cursor = page.nextCursor
+            if cursor is None:
+                return rows
+
+    def test_serialize(self):
+        """Compare API pages from values() with Django's model serializer."""
+        rates = {}
+        for name, fields in (("all fields", None), ("sparse fields", "date,shiftType")):
+            start = time.perf_counter()
+            rows = self.walk(fields)
+            rates[name] = rows / (time.perf_counter() - start)
+            reportRate(f"API shifts per second ({name}, pages of {MAXPAGESIZE})", rates[name])
+            self.assertEqual(rows, NUMBEROFSHIFTS)
+        start = time.perf_counter()
+        serializers.serialize("json", Shift.objects.prefetch_related("staffs").iterator(chunk_size=MAXPAGESIZE))
+        serializerRate = NUMBEROFSHIFTS / (time.perf_counter() - start)
+        reportRate("django serializer shifts per second (model instances)", serializerRate)
+        self.assertGreater(rates["all fields"], serializerRate)
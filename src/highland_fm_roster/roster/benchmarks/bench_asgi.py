@@ -0,0 +1,75 @@
+"""Load test of the read views under ASGI and WSGI.
+Both handlers run in process: the ASGI handler serves concurrent requests
+from one event loop, like uvicorn or daphne, and the WSGI handler serves
+them from a pool of threads, like a threaded WSGI server.
+"""
+import asyncio
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client, TransactionTestCase
+from django.urls import reverse
+
+from roster.models import Staff
+from roster.seeding import seedDatabase
+
+from .utils import reportRate
+
+
+class BenchConcurrentReads(TransactionTestCase):
+    """Compares the throughput of concurrent reads under ASGI and WSGI.
+    Attributes:
+    - concurrency: How many requests are in flight at a time.
+    - requests: How many requests each run makes.
+    """
+
+    concurrency = 20
+    requests = 200
+
+    def setUp(self):
+        """Seeds 200 staffs and a roster, committed so every thread sees them."""
+        seedDatabase(200, 1, datetime.date(year=2024, month=1, day=1))
+        staff = Staff.objects.order_by("id").first()
+        self.urls = [
+            reverse("roster:staffsList"),
+            reverse("roster:staffActions", args=[staff.id]),
+            reverse("roster:searchStaffs") + f"?q={staff.firstName[:2]}",
+            reverse("roster:rosterMonth", args=[2024, 1]),
+        ]
+
+    def asgiRun(self) -> float:
+        """Returns requests per second through the ASGI handler."""
+        async def run():
+            client = AsyncClient(SERVER_NAME="localhost")
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(url):
+                async with semaphore:
+                    response = await client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+            await asyncio.gather(*(fetch(self.urls[index % len(self.urls)]) for index in range(self.requests)))
+
+        start = time.perf_counter()
+        async_to_sync(run)()
+        return self.requests / (time.perf_counter() - start)
+
+    def wsgiRun(self) -> float:
+        """Returns requests per second through the WSGI handler."""
+        def fetch(index):
+            response = Client(SERVER_NAME="localhost").get(self.urls[index % len(self.urls)])
+            self.assertEqual(response.status_code, 200)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            list(executor.map(fetch, range(self.requests)))
+        return self.requests / (time.perf_counter() - start)
+
+    def test_throughput(self):
+        """Serve the same mix of list, edit form, search and calendar requests both ways."""
+        asgi = self.asgiRun()
+        wsgi = self.wsgiRun()
+        reportRate(f"ASGI requests, {self.concurrency} concurrent", asgi)
+        reportRate(f"WSGI requests, {self.concurrency} concurrent", wsgi)
@@ -0,0 +1,22 @@
+"""Benchmarks for cloning a roster into another month."""
+import datetime
+
+from django.test import TestCase
+
+from roster.benchmarking import rolledBack
+from roster.cloning import cloneRoster
+from roster.generation import generateRoster
+
+from .utils import bestOf, report, seedRoster
+
+
+class BenchCloneRoster(TestCase):
+    """Times copying a generated 31 day month with 200 staffs."""
+
+    def test_clone_month(self):
+        """Clone January into March with 200 staffs; each run is rolled back."""
+        roster = seedRoster(200, datetime.date(year=2024, month=1, day=1))
+        generateRoster(roster)
+        seconds = bestOf(rolledBack(lambda: cloneRoster(roster, datetime.date(year=2024, month=3, day=1))))
+        report("cloneRoster (31 days, 200 staffs)", seconds)
+        self.assertLess(seconds, 1.0)
@@ -0,0 +1,87 @@
+"""Benchmarks for the fairness report over materialized shift counts."""
+import datetime
+
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from roster.benchmarking import rolledBack
+from roster.counters import deleteDays, fairnessRows
+from roster.generation import generateRosters
+from roster.models import Day, Roster, Shift, StaffRosterAssignment
+
+from .utils import bestOf, report, seedRoster
+
+
+class BenchFairnessReport(TestCase):
+    """Times a year's fairness report for 300 staffs with three years of shifts."""
+
+    def setUp(self):
+        """Seeds and generates 36 monthly rosters sharing 300 staffs."""
+        first = seedRoster(300, datetime.date(year=2022, month=1, day=1))
+        assignments = list(StaffRosterAssignment.objects.filter(roster=first))
+        rosters = [first]
+        for month in range(1, 36):
+            roster = Roster.objects.create(date=datetime.date(year=2022 + month // 12, month=month % 12 + 1, day=1))
+            StaffRosterAssignment.objects.bulk_create(
+                [
+                    StaffRosterAssignment(staff_id=assignment.staff_id, roster=roster, group=assignment.group)
+                    for assignment in assignments
+                ]
+            )
+            rosters.append(roster)
+        generateRosters(rosters)
+
+    def test_report(self):
+        """Compare the counts table with aggregating the through table."""
+        first, last = datetime.date(year=2023, month=1, day=1), datetime.date(year=2023, month=12, day=31)
+
+        def aggregated():
+            return list(
+                Shift.staffs.through.objects.filter(shift__day__date__range=(first, last))
+                .values("staff_id")
+                .annotate(
+                    mornings=Count("id", filter=Q(shift__shiftType=Shift.MORNINGSHIFT)),
+                    afternoons=Count("id", filter=Q(shift__shiftType=Shift.AFTERNOONSHIFT)),
+                )
+                .order_by("staff_id")
+            )
+
+        countsSeconds = bestOf(lambda: list(fairnessRows(first, last)))
+        aggregateSeconds = bestOf(aggregated)
+        report("fairness report from shift counts (1 of 3 years, 300 staffs)", countsSeconds)
+        report("fairness report from the through table (1 of 3 years, 300 staffs)", aggregateSeconds)
+        self.assertLess(countsSeconds, aggregateSeconds)
+
+
+class BenchDeleteDays(TestCase):
+    """Times deleting three generated months of 200 staffs."""
+
+    def setUp(self):
+        """Seeds and generates three monthly rosters sharing 200 staffs."""
+        first = seedRoster(200, datetime.date(year=2024, month=1, day=1))
+        assignments = list(StaffRosterAssignment.objects.filter(roster=first))
+        rosters = [first]
+        for month in (2, 3):
+            roster = Roster.objects.create(date=datetime.date(year=2024, month=month, day=1))
+            StaffRosterAssignment.objects.bulk_create(
+                [
+                    StaffRosterAssignment(staff_id=assignment.staff_id, roster=roster, group=assignment.group)
+                    for assignment in assignments
+                ]
+            )
+            rosters.append(roster)
+        generateRosters(rosters)
+
+    def test_delete(self):
+        """Compare deleteDays with a delete that adjusts the counts from a signal per shift."""
+        with CaptureQueriesContext(connection) as bulkQueries:
+            rolledBack(lambda: deleteDays(Day.objects.all()))()
+        with CaptureQueriesContext(connection) as signalQueries:
+            rolledBack(lambda: Day.objects.all().delete())()
+        bulkSeconds = bestOf(rolledBack(lambda: deleteDays(Day.objects.all())), repeat=3)
+        signalSeconds = bestOf(rolledBack(lambda: Day.objects.all().delete()), repeat=3)
+        report(f"deleteDays (3 months, 200 staffs, {len(bulkQueries)} queries)", bulkSeconds)
+        report(f"per shift signals (3 months, 200 staffs, {len(signalQueries)} queries)", signalSeconds)
+        self.assertLess(bulkSeconds, signalSeconds)
@@ -0,0 +1,113 @@
+"""Concurrency benchmark of the SQLite connection profiles.
+Writer threads edit staffs while reader threads list them, all against the
+same database file, once with SQLite's defaults and once with the
+production profile of `highland_fm_roster.production`.
+"""
+import random
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import OperationalError, connections, transaction
+from django.test import SimpleTestCase, override_settings
+
+from roster.database import WALPRAGMAS
+from roster.models import Staff
+
+from .utils import reportRate
+
+# Database alias of each profile: (pragmas, OPTIONS).
+PROFILES = {
+    "benchDefault": (None, {}),
+    "benchProduction": (WALPRAGMAS, {"transaction_mode": "IMMEDIATE"}),
+}
+
+
+class BenchSqliteConcurrency(SimpleTestCase):
+    """Times parallel writers and readers on one SQLite file per profile.
+    Attributes:
+    - writers: How many threads edit staffs.
+    - readers: How many threads list staffs.
+    - seconds: How long each profile runs.
+    """
+
+    writers = 4
+    readers = 4
+    seconds = 2.0
+
+    @classmethod
+    def setUpClass(cls):
+        """Adds a file database for each profile."""
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        for alias, (_, options) in PROFILES.items():
+            connections.settings[alias] = {
+                **connections["default"].settings_dict,
+                "NAME": str(Path(cls.directory) / f"{alias}.sqlite3"),
+                "OPTIONS": options,
+                "TEST": {},
+            }
+        # Added after setUpClass, so the test runner does not create test databases for them.
+        cls.databases = cls.databases | set(PROFILES)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Removes the profile databases."""
+        super().tearDownClass()
+        for alias in PROFILES:
+            connections[alias].close()
+            del connections.settings[alias]
+        shutil.rmtree(cls.directory)
+
+    def runProfile(self, alias: str) -> dict[str, int]:
+        """Runs the writers and readers against a profile and reports their throughput."""
+        pragmas, _ = PROFILES[alias]
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            with connections[alias].schema_editor() as editor:
+                editor.create_model(Staff)
+            staffs = [Staff(firstName=f"Staff{index}", lastName="Bench") for index in range(1000)]
+            for staff in staffs:
+                staff.setSearchNames()
+            Staff.objects.using(alias).bulk_create(staffs)
+            connections[alias].close()
+            deadline = time.perf_counter() + self.seconds
+
+            def work(write: bool):
+                randomizer = random.Random()
+                done = errors = 0
+                while time.perf_counter() < deadline:
+                    try:
+                        if write:
+                            with transaction.atomic(using=alias):
+                                staff = Staff.objects.using(alias).get(pk=randomizer.randint(1, 1000))
+                                staff.lastName = f"Bench{done}"
+                                staff.save(using=alias)
+                        else:
+                            list(Staff.objects.using(alias).order_by("firstName", "id")[:50])
+                        done += 1
+                    except OperationalError:
+                        errors += 1
+                connections[alias].close()
+                with lock:
+                    counts["writes" if write else "reads"] += done
+                    counts["errors"] += errors
+
+            threads = [threading.Thread(target=work, args=(True,)) for _ in range(self.writers)]
+            threads += [threading.Thread(target=work, args=(False,)) for _ in range(self.readers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        for kind in ["writes", "reads", "errors"]:
+            reportRate(f"{alias} {kind}", counts[kind] / self.seconds)
+        return counts
+
+    def test_profiles(self):
+        """Compare SQLite's defaults with WAL, the tuned pragmas and immediate transactions."""
+        self.runProfile("benchDefault")
+        production = self.runProfile("benchProduction")
+        self.assertEqual(production["errors"], 0)
@@ -0,0 +1,43 @@
+"""Benchmarks for the cached staff list fragments."""
+import itertools
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import TestCase
+
+from roster.caching import staffListVersion
+from roster.models import Staff
+
+from .utils import bestOf, report
+
+
+class BenchStaffListFragments(TestCase):
+    """Times rendering 5k staff list items with a cold and a warm cache."""
+
+    def setUp(self):
+        """Seeds 5k staffs."""
+        Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Bench") for index in range(5000)])
+        self.staffs = list(Staff.objects.all())
+
+    def render(self, cursor: str):
+        """Renders every staff as one page of list items."""
+        context = {"staffs": self.staffs, "cursor": cursor, "staffListVersion": staffListVersion()}
+        return render_to_string("roster/staff_list_items.html", context)
+
+    def test_cold_and_warm(self):
+        """Render with an empty cache, with cached items and with a cached page."""
+        def cold():
+            cache.clear()
+            self.render("")
+
+        coldSeconds = bestOf(cold, repeat=3)
+        cache.clear()
+        self.render("")
+        # A new cursor misses the page fragment but hits every item fragment.
+        cursors = itertools.count(1)
+        itemSeconds = bestOf(lambda: self.render(str(next(cursors))), repeat=3)
+        pageSeconds = bestOf(lambda: self.render(""))
+        report("staff list items, cold cache (5k staffs)", coldSeconds)
+        report("staff list items, cached items (5k staffs)", itemSeconds)
+        report("staff list items, cached page (5k staffs)", pageSeconds)
+        self.assertLess(itemSeconds, coldSeconds)
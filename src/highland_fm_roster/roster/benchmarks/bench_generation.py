@@ -0,0 +1,17 @@
+"""Benchmarks for roster generation."""
+import datetime
+
+from django.test import TestCase
+
+from roster.generation import generateRoster
+
+from .utils import bestOf, report, seedRoster
+
+
+class BenchGenerateRoster(TestCase):
+    """Times the generation of a 31 day month with 200 staffs."""
+
+    def test_generate_month(self):
+        """Generate January with 200 staffs."""
+        roster = seedRoster(200, datetime.date(year=2024, month=1, day=1))
+        report("generateRoster (31 days, 200 staffs)", bestOf(lambda: generateRoster(roster)))
@@ -0,0 +1,41 @@
+"""Benchmarks for the parallel roster optimizer."""
+import datetime
+import os
+
+from django.test import TestCase
+
+from roster.activity import ActivityMatrix
+from roster.optimizer import optimizeMatrix
+
+from .utils import bestOf, report, seedRoster
+
+
+class BenchOptimizer(TestCase):
+    """Times a fixed amount of search work on 1, 2, 4, ... worker processes."""
+
+    restarts = 8
+    iterations = 5_000
+
+    def test_scaling(self):
+        """Run eight restarts of a 200 staff month with more and more workers."""
+        matrix = ActivityMatrix.forRoster(seedRoster(200, datetime.date(year=2024, month=1, day=1)))
+        workers = 1
+        baseline = None
+        while workers <= min(os.cpu_count() or 1, self.restarts):
+            scores = []
+
+            def run():
+                scores.append(
+                    optimizeMatrix(
+                        matrix, timeBudget=None, workers=workers, restarts=self.restarts, iterations=self.iterations
+                    )[0]
+                )
+
+            seconds = bestOf(run, repeat=1)
+            baseline = baseline or seconds
+            report(
+                f"optimizeMatrix ({self.restarts} restarts, {workers} workers,"
+                f" speedup {baseline / seconds:.2f}x, score {scores[0]})",
+                seconds,
+            )
+            workers *= 2
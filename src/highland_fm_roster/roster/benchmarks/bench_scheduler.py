@@ -0,0 +1,38 @@
+"""Benchmarks for the group rotation scheduler."""
+import datetime
+
+from django.test import TestCase
+
+from roster.activity import ActivityMatrix
+from roster.generation import generateRosters
+from roster.models import Roster, StaffRosterAssignment
+from roster.scheduler import rotationSchedule
+
+from .utils import bestOf, report, seedRoster
+
+
+class BenchRotationSchedule(TestCase):
+    """Times scheduling a year of rosters for 500 staffs."""
+
+    def setUp(self):
+        """Seeds twelve rosters sharing 500 staffs."""
+        january = seedRoster(500, datetime.date(year=2024, month=1, day=1), numberOfGroups=6)
+        assignments = list(StaffRosterAssignment.objects.filter(roster=january))
+        self.rosters = [january]
+        for month in range(2, 13):
+            roster = Roster.objects.create(date=datetime.date(year=2024, month=month, day=1))
+            StaffRosterAssignment.objects.bulk_create(
+                [
+                    StaffRosterAssignment(staff_id=assignment.staff_id, roster=roster, group=assignment.group)
+                    for assignment in assignments
+                ]
+            )
+            self.rosters.append(roster)
+
+    def test_schedule_year(self):
+        """Schedule a year in memory, then schedule and write it."""
+        matrices = ActivityMatrix.forRosters(self.rosters)
+        seconds = bestOf(lambda: rotationSchedule(matrices))
+        report("rotationSchedule (12 months, 500 staffs)", seconds)
+        self.assertLess(seconds, 1)
+        report("generateRosters (12 months, 500 staffs)", bestOf(lambda: generateRosters(self.rosters), repeat=1))
@@ -0,0 +1,44 @@
+"""Benchmarks for the overhead of the Server-Timing middleware."""
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from roster.models import Staff
+
+from .utils import bestOf, report
+
+REQUESTS = 200
+
+
+class BenchServerTiming(TestCase):
+    """Times staff list requests without the middleware, with it disabled and with it enabled."""
+
+    def setUp(self):
+        """Seeds a page of staffs."""
+        Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Bench") for index in range(50)])
+        self.url = reverse("roster:staffsList")
+
+    def requests(self) -> float:
+        """Returns the best time of REQUESTS staff list requests with a fresh middleware chain."""
+        client = Client()
+
+        def run():
+            for _ in range(REQUESTS):
+                client.get(self.url)
+
+        return bestOf(run, repeat=3)
+
+    def test_overhead(self):
+        """Compare request times with and without timing."""
+        middleware = [name for name in settings.MIDDLEWARE if name != "roster.timing.ServerTimingMiddleware"]
+        with override_settings(MIDDLEWARE=middleware):
+            baseSeconds = self.requests()
+        with override_settings(SERVER_TIMING=False):
+            disabledSeconds = self.requests()
+        with override_settings(SERVER_TIMING=True):
+            enabledSeconds = self.requests()
+        report(f"staff list, no timing middleware ({REQUESTS} requests)", baseSeconds)
+        report(f"staff list, timing disabled ({REQUESTS} requests)", disabledSeconds)
+        report(f"staff list, timing enabled ({REQUESTS} requests)", enabledSeconds)
+        # Disabled, the middleware is left out and only the no-op wrappers remain.
+        self.assertLess(disabledSeconds, baseSeconds * 1.1)
@@ -0,0 +1,48 @@
+"""Helpers shared by the roster benchmarks."""
+import datetime
+import time
+from collections.abc import Callable
+
+from roster.models import Roster, Staff, StaffRosterAssignment
+
+
+def seedRoster(numberOfStaffs: int, date: datetime.date, numberOfGroups: int = 4) -> Roster:
+    """Creates a roster with the given number of assigned staffs.
+    Parameters:
+    - numberOfStaffs: How many staffs to create and assign.
+    - date: A date in the month of the roster.
+    - numberOfGroups: How many groups the staffs are spread over.
+    Returns:
+    - Roster: The created roster.
+    """
+    staffs = Staff.objects.bulk_create(
+        [Staff(firstName=f"Staff{index}", lastName="Bench") for index in range(numberOfStaffs)]
+    )
+    roster = Roster.objects.create(date=date)
+    StaffRosterAssignment.objects.bulk_create(
+        [
+            StaffRosterAssignment(staff=staff, roster=roster, group=index % numberOfGroups + 1)
+            for index, staff in enumerate(staffs)
+        ]
+    )
+    return roster
+
+
+def bestOf(function: Callable[[], object], repeat: int = 5) -> float:
+    """Returns the fastest wall clock time of several calls in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(name: str, seconds: float) -> None:
+    """Prints the result of a benchmark."""
+    print(f"\n{name}: {seconds * 1000:.2f} ms")
+
+
+def reportRate(name: str, perSecond: float) -> None:
+    """Prints the throughput measured by a benchmark."""
+    print(f"\n{name}: {perSecond:.1f} per second")
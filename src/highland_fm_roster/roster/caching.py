@@ -0,0 +1,123 @@
+"""Versioning of cached fragments and feeds.
+Each staff list item is cached under its staff's id and `updatedAt`, so an
+edit only misses the cache for the edited staff. Each page of items is also
+cached under a list version that the `Staff` signals bump, so adding,
+editing or deleting any staff rebuilds the pages from the item fragments.
+
+Staff calendar feeds are cached under two versions: the staff's own, bumped
+when staffs join or leave shifts, and a shared one, bumped when days or
+shifts change. Bulk writes send no signals and must call
+`bumpStaffListVersion` and `invalidateFeeds` themselves.
+
+Async views use the `a` prefixed helpers, which call the cache's async
+methods: a database cache cannot be used from the event loop, and the
+others would block it.
+"""
+import time
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+STAFFLISTVERSIONKEY = "roster:staffListVersion"
+FEEDVERSIONKEY = "roster:feedVersion"
+
+
+def cacheVersion(key: str) -> int:
+    """Returns the current value of a version key, starting it if it is missing."""
+    version = cache.get(key)
+    if version is None:
+        # A clock based start never repeats a version whose entries are still cached.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def acacheVersion(key: str) -> int:
+    """Async version of `cacheVersion`."""
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bumpCacheVersion(key: str) -> None:
+    """Increments a version key, invalidating what was cached under it."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+async def abumpCacheVersion(key: str) -> None:
+    """Async version of `bumpCacheVersion`."""
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, time.time_ns(), None)
+
+
+def staffListVersion() -> int:
+    """Returns the current version of the staff list."""
+    return cacheVersion(STAFFLISTVERSIONKEY)
+
+
+async def astaffListVersion() -> int:
+    """Async version of `staffListVersion`."""
+    return await acacheVersion(STAFFLISTVERSIONKEY)
+
+
+def bumpStaffListVersion() -> None:
+    """Invalidates the cached staff list pages."""
+    bumpCacheVersion(STAFFLISTVERSIONKEY)
+
+
+async def abumpStaffListVersion() -> None:
+    """Async version of `bumpStaffListVersion`."""
+    await abumpCacheVersion(STAFFLISTVERSIONKEY)
+
+
+def staffFeedVersionKey(staffId: int) -> str:
+    """Returns the key of a staff's own feed version."""
+    return f"{FEEDVERSIONKEY}:{staffId}"
+
+
+async def afeedVersions(staffId: int) -> tuple[int, int]:
+    """Returns the shared feed version and the version of a staff's feed."""
+    keys = [FEEDVERSIONKEY, staffFeedVersionKey(staffId)]
+    versions = await cache.aget_many(keys)
+    if len(versions) < len(keys):
+        return await acacheVersion(keys[0]), await acacheVersion(keys[1])
+    return versions[keys[0]], versions[keys[1]]
+
+
+def bumpFeedVersions(staffIds: Iterable[int] | None = None) -> None:
+    """Invalidates the cached feeds of some staffs, or of every staff when None."""
+    if staffIds is None:
+        bumpCacheVersion(FEEDVERSIONKEY)
+        return
+    for staffId in set(staffIds):
+        bumpCacheVersion(staffFeedVersionKey(staffId))
+
+
+async def abumpFeedVersions(staffIds: Iterable[int] | None = None) -> None:
+    """Async version of `bumpFeedVersions`."""
+    if staffIds is None:
+        await abumpCacheVersion(FEEDVERSIONKEY)
+        return
+    for staffId in set(staffIds):
+        await abumpCacheVersion(staffFeedVersionKey(staffId))
+
+
+def invalidateFeeds(staffIds: Iterable[int] | None = None, using: str | None = None) -> None:
+    """Bumps feed versions now and again when the current transaction commits.
+    A feed rendered by another request before the commit may have been
+    cached under the first bump.
+    Parameters:
+    - staffIds: The staffs whose feeds changed, or None for every staff.
+    - using: The database alias of the transaction.
+    """
+    staffIds = None if staffIds is None else set(staffIds)
+    bumpFeedVersions(staffIds)
+    transaction.on_commit(lambda: bumpFeedVersions(staffIds), using=using)
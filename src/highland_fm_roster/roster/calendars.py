@@ -0,0 +1,45 @@
+"""Month calendars of generated rosters.
+A month is loaded as one query tree: its days, their shifts and the staffs
+on those shifts are three queries however many staffs there are, and only
+the columns the calendar shows are selected.
+"""
+import calendar
+import datetime
+
+from django.db.models import Prefetch, QuerySet
+
+from .models import Day, Shift, Staff
+
+
+def monthRange(year: int, month: int) -> tuple[datetime.date, datetime.date]:
+    """Returns the first and last dates of a month."""
+    return datetime.date(year, month, 1), datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+def calendarDays(year: int, month: int) -> QuerySet:
+    """Returns the days of a month with their shifts and staffs prefetched."""
+    staffs = Staff.objects.only("firstName", "middleName", "lastName")
+    shifts = Shift.objects.only("day", "shiftType").order_by("id").prefetch_related(Prefetch("staffs", queryset=staffs))
+    return (
+        Day.objects.filter(date__range=monthRange(year, month))
+        .only("date")
+        .order_by("date")
+        .prefetch_related(Prefetch("shifts", queryset=shifts))
+    )
+
+
+def monthWeeks(year: int, month: int, days: list[Day]) -> list[list[Day | datetime.date | None]]:
+    """Lays the days of a month out in weeks starting on Monday.
+    Parameters:
+    - year: The year of the month.
+    - month: The month.
+    - days: The generated days of the month.
+    Returns:
+    - list: Weeks of seven cells; a `Day` for generated dates, the date for
+      other dates of the month and None for dates of neighbouring months.
+    """
+    byDate = {day.date: day for day in days}
+    return [
+        [byDate.get(date, date) if date.month == month else None for date in week]
+        for week in calendar.Calendar().monthdatescalendar(year, month)
+    ]
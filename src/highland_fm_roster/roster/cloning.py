@@ -0,0 +1,124 @@
+"""Cloning a roster into another month.
+A clone copies a roster's staff assignments, days, shifts and shift staffs
+into a new month. Day `n` of the source month becomes day `n` of the target
+month, and days the target month does not have are dropped. Assignments,
+days and shifts are bulk inserted. The `Shift.staffs` through rows, by far
+the most numerous, never pass through Python: a single `INSERT ... SELECT`
+copies them, mapping each source shift to its copy with a `CASE`
+expression, so a clone costs the same few queries however many staffs the
+roster has.
+"""
+import calendar
+import datetime
+
+from django.db import connections, router, transaction
+
+from .activity import monthDates
+from .caching import invalidateFeeds
+from .calendars import monthRange
+from .counters import monthRosters, pausedShiftCounts, rebuildShiftCounts
+from .models import Day, Roster, Shift, StaffRosterAssignment
+from .tombstones import recordedDeletions
+
+
+def shiftMonths(date: datetime.date | None, months: int) -> datetime.date | None:
+    """Moves a date by a number of months, keeping its day where the month has it.
+    Parameters:
+    - date: The date, or None.
+    - months: How many months to move forward; negative moves back.
+    Returns:
+    - date: The moved date, on the last day of its month if the day does not exist.
+    """
+    if date is None:
+        return None
+    year, month = divmod(date.year * 12 + date.month - 1 + months, 12)
+    return date.replace(year=year, month=month + 1, day=min(date.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def copyLinksStatement(connection, shiftIds: dict[int, int]) -> tuple[str, list[int]]:
+    """Returns the `INSERT ... SELECT` that copies the staffs of shifts onto other shifts.
+    Parameters:
+    - connection: The connection the statement runs on.
+    - shiftIds: {source shift id: target shift id}.
+    Returns:
+    - tuple: The sql and its parameters.
+    """
+    quote = connection.ops.quote_name
+    Through = Shift.staffs.through
+    shiftColumn = quote(Through._meta.get_field("shift").column)
+    staffColumn = quote(Through._meta.get_field("staff").column)
+    cases = " ".join("WHEN %s THEN %s" for _ in shiftIds)
+    placeholders = ", ".join("%s" for _ in shiftIds)
+    sql = (
+        f"INSERT INTO {quote(Through._meta.db_table)} ({shiftColumn}, {staffColumn}) "
+        f"SELECT CASE {shiftColumn} {cases} END, {staffColumn} FROM {quote(Through._meta.db_table)} "
+        f"WHERE {shiftColumn} IN ({placeholders})"
+    )
+    return sql, [id for pair in shiftIds.items() for id in pair] + list(shiftIds)
+
+
+def cloneRoster(source: Roster, target: datetime.date, batchSize: int | None = None) -> Roster:
+    """Copies a roster's assignments, days, shifts and shift staffs into another month.
+    The target month's days are replaced, and the shift counts of the new
+    roster are rebuilt from its copied shifts, all in one transaction.
+    Parameters:
+    - source: The roster to copy.
+    - target: Any date in the month to copy into.
+    - batchSize: Optional batch size for the `bulk_create` calls.
+    Returns:
+    - Roster: The new roster.
+    Raises:
+    - ValueError: If the target month already has a roster.
+    """
+    target = target.replace(day=1)
+    if monthRosters([(target.year, target.month)])[(target.year, target.month)]:
+        raise ValueError(f"{target:%B %Y} already has a roster.")
+    sourceRange = monthRange(source.date.year, source.date.month)
+    months = (target.year - source.date.year) * 12 + target.month - source.date.month
+    roster = Roster(date=target)
+    targetDates = monthDates(roster)
+    connection = connections[router.db_for_write(Shift)]
+    targetRange = (targetDates[0], targetDates[-1])
+    with transaction.atomic(using=connection.alias), pausedShiftCounts():
+        roster.save()
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(
+                    staff_id=staffId,
+                    roster=roster,
+                    active=active,
+                    vacationDate=shiftMonths(vacationDate, months),
+                    resumptionDate=shiftMonths(resumptionDate, months),
+                    group=group,
+                )
+                for staffId, active, vacationDate, resumptionDate, group in StaffRosterAssignment.objects.filter(
+                    roster=source
+                ).values_list("staff_id", "active", "vacationDate", "resumptionDate", "group")
+            ],
+            batch_size=batchSize,
+        )
+        with recordedDeletions(batchSize):
+            Day.objects.filter(date__range=targetRange).delete()
+        sourceDates = Day.objects.filter(date__range=sourceRange).order_by("date").values_list("date", flat=True)
+        days = Day.objects.bulk_create(
+            [Day(date=targetDates[date.day - 1]) for date in sourceDates if date.day <= len(targetDates)],
+            batch_size=batchSize,
+        )
+        byDay = {day.date.day: day for day in days}
+        sourceShifts = [
+            (shiftId, byDay[date.day], shiftType)
+            for shiftId, date, shiftType in Shift.objects.filter(day__date__range=sourceRange)
+            .order_by("day__date", "id")
+            .values_list("id", "day__date", "shiftType")
+            if date.day in byDay
+        ]
+        shifts = Shift.objects.bulk_create(
+            [Shift(day=day, shiftType=shiftType) for _, day, shiftType in sourceShifts], batch_size=batchSize
+        )
+        shiftIds = {shiftId: shift.id for (shiftId, *_), shift in zip(sourceShifts, shifts)}
+        if shiftIds:
+            with connection.cursor() as cursor:
+                cursor.execute(*copyLinksStatement(connection, shiftIds))
+        rebuildShiftCounts([roster], batchSize)
+        invalidateFeeds()
+    return roster
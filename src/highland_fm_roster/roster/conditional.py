@@ -0,0 +1,84 @@
+"""Conditional GET for views whose output depends on a few tables.
+Every model has an `updatedAt`, so the latest `updatedAt` and the row count
+of a table change whenever a row is added, edited or deleted. A view can
+compare these with the request's validators in one aggregate query and
+answer `304 Not Modified` without fetching rows or rendering templates.
+"""
+import datetime
+import hashlib
+
+from django.db.models import Count, Max, QuerySet, Value
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+async def tableValidators(querysets: list[QuerySet]) -> list[tuple[int, datetime.datetime | None]]:
+    """Returns the row count and the latest `updatedAt` of each queryset.
+    The aggregates of several querysets are fetched in one UNION ALL query.
+    Parameters:
+    - querysets: The querysets, of models with an `updatedAt` field.
+    Returns:
+    - list: (count, datetime or None) pairs in the order of the querysets.
+    """
+    parts = [
+        queryset.order_by()
+        .annotate(part=Value(index))
+        .values("part")
+        .annotate(count=Count("pk"), lastModified=Max("updatedAt"))
+        .values_list("part", "count", "lastModified")
+        for index, queryset in enumerate(querysets)
+    ]
+    rows = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    validators = [(0, None)] * len(querysets)
+    async for part, count, lastModified in rows:
+        validators[part] = (count, lastModified)
+    return validators
+
+
+def isPartial(request) -> bool:
+    """Checks if a request asks for an htmx partial rather than a full page."""
+    # htmx restores history it has not cached with a request for the full page.
+    return bool(getattr(request, "htmx", None)) and not request.htmx.history_restore_request
+
+
+class ConditionalGetMixin:
+    """Adds ETag and Last-Modified validators to the GET responses of an async view.
+    The htmx partial and the full page are separate representations of a
+    url, so the ETag tells them apart and responses vary on the htmx headers.
+    The full page embeds the CSRF token, so its ETag also covers the CSRF
+    secret.
+    """
+
+    def validatorQuerysets(self) -> list[QuerySet]:
+        """Returns the rows the response depends on."""
+        return [self.model.objects.all()]
+
+    def dispatch(self, request, *args, **kwargs):
+        """Sends GET requests through the validators."""
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        return self.conditionalGet(request, *args, **kwargs)
+
+    async def conditionalGet(self, request, *args, **kwargs):
+        """Answers 304 if the rows did not change, else the view's response."""
+        validators = await tableValidators(self.validatorQuerysets())
+        # HTTP dates have whole seconds, the ETag tells apart changes within a second.
+        timestamps = [int(lastModified.timestamp()) for _, lastModified in validators if lastModified is not None]
+        lastModified = max(timestamps) if timestamps else None
+        if isPartial(request):
+            representation = "partial"
+        else:
+            # get_token settles the secret that this response's CSRF cookie carries.
+            get_token(request)
+            representation = request.META["CSRF_COOKIE"]
+        digest = hashlib.md5(f"{validators}:{representation}".encode()).hexdigest()
+        etag = quote_etag(digest)
+        response = get_conditional_response(request, etag=etag, last_modified=lastModified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        response.headers.setdefault("ETag", etag)
+        if lastModified is not None:
+            response.headers.setdefault("Last-Modified", http_date(lastModified))
+        patch_vary_headers(response, ["HX-Request", "HX-History-Restore-Request"])
+        return response
@@ -1,5 +1,7 @@
 from django.http import HttpRequest
 
+from .conditional import isPartial
+
 
 def setBaseTemplate(request: HttpRequest) -> dict[str, str]:
     """Sets the baseTemplate context variable.
@@ -8,5 +10,5 @@ def setBaseTemplate(request: HttpRequest) -> dict[str, str]:
     Returns:
     - dict: A dictionary that sets either '_base.html' or '_partial.html' as the basetemplate.
     """
-    baseTemplate = '_partial.html' if getattr(request, 'htmx', None) else '_base.html'
+    baseTemplate = '_partial.html' if isPartial(request) else '_base.html'
     return {'baseTemplate': baseTemplate}
@@ -0,0 +1,231 @@
+"""Materialized per staff shift counts.
+`StaffShiftCount` holds how many shifts of each type a staff works in each
+roster, so fairness reports never aggregate the `Shift.staffs` through table.
+Days belong to a month rather than to a roster, so when a month has more than
+one roster its shifts are counted once, in the roster with the lowest id.
+Edits of single shifts adjust the counts from the `m2m_changed` and `Shift`
+delete signals, see `roster.signals`. Bulk generation pauses those receivers
+and replaces the counts of the rosters it wrote in one go, `deleteDays`
+subtracts the staffs of many deleted shifts at once, and
+`rebuildShiftCounts` recomputes counts from scratch.
+"""
+import datetime
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, Q, QuerySet, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear, Greatest
+from django.utils import timezone
+
+from .activity import monthDates
+from .models import Day, Roster, Shift, StaffShiftCount
+from .scheduler import Schedule
+from .tombstones import recordedDeletions
+
+# (staff id, roster id, shift type)
+CountKey = tuple[int, int, str]
+
+countsPaused: ContextVar[bool] = ContextVar("countsPaused", default=False)
+
+
+@contextmanager
+def pausedShiftCounts() -> Iterator[None]:
+    """Stops the signal receivers from adjusting counts, for bulk writes that set them themselves."""
+    token = countsPaused.set(True)
+    try:
+        yield
+    finally:
+        countsPaused.reset(token)
+
+
+def monthRosters(months: Iterable[tuple[int, int]]) -> dict[tuple[int, int], list[int]]:
+    """Returns the ids of the rosters of each (year, month), lowest first.
+    The first id of a month is the roster its shifts are counted in.
+    """
+    months = set(months)
+    rosters: dict[tuple[int, int], list[int]] = {month: [] for month in months}
+    if not months:
+        return rosters
+    years = {year for year, _ in months}
+    for rosterId, date in Roster.objects.filter(date__year__in=years).order_by("id").values_list("id", "date"):
+        if (date.year, date.month) in rosters:
+            rosters[(date.year, date.month)].append(rosterId)
+    return rosters
+
+
+def linkCounts(links: QuerySet) -> Counter[CountKey]:
+    """Counts `Shift.staffs` through rows by staff, roster and shift type.
+    Parameters:
+    - links: A queryset of `Shift.staffs.through` rows.
+    Returns:
+    - Counter: {(staff id, roster id, shift type): number of rows}.
+    """
+    rows = list(
+        links.values(
+            "staff_id", "shift__shiftType", year=ExtractYear("shift__day__date"), month=ExtractMonth("shift__day__date")
+        )
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("staff_id", "shift__shiftType", "year", "month", "count")
+    )
+    rosters = monthRosters((year, month) for _, _, year, month, _ in rows)
+    counts: Counter[CountKey] = Counter()
+    for staffId, shiftType, year, month, count in rows:
+        if rosters[(year, month)]:
+            counts[(staffId, rosters[(year, month)][0], shiftType)] += count
+    return counts
+
+
+def applyShiftCountDeltas(deltas: Counter[CountKey]) -> None:
+    """Adds changes to the counts, creating counts that do not exist yet.
+    The counts are changed with one UPDATE per roster, shift type and change,
+    and counts that did not exist are then looked up and created with one
+    INSERT, so the number of queries does not grow with the number of staffs.
+    Parameters:
+    - deltas: {(staff id, roster id, shift type): change}.
+    """
+    groups: dict[tuple[int, str, int], list[int]] = {}
+    for (staffId, rosterId, shiftType), delta in deltas.items():
+        if delta:
+            groups.setdefault((rosterId, shiftType, delta), []).append(staffId)
+    now = timezone.now()
+    with transaction.atomic():
+        missing = False
+        for (rosterId, shiftType, delta), staffIds in groups.items():
+            updated = StaffShiftCount.objects.filter(
+                roster_id=rosterId, shiftType=shiftType, staff_id__in=staffIds
+            ).update(count=Greatest(F("count") + delta, 0), updatedAt=now)
+            missing = missing or (delta > 0 and updated < len(staffIds))
+        if not missing:
+            return
+        added = {key: delta for key, delta in deltas.items() if delta > 0}
+        existing = set(
+            StaffShiftCount.objects.filter(
+                staff_id__in={key[0] for key in added}, roster_id__in={key[1] for key in added}
+            ).values_list("staff_id", "roster_id", "shiftType")
+        )
+        StaffShiftCount.objects.bulk_create(
+            [
+                StaffShiftCount(staff_id=staffId, roster_id=rosterId, shiftType=shiftType, count=delta)
+                for (staffId, rosterId, shiftType), delta in added.items()
+                if (staffId, rosterId, shiftType) not in existing
+            ]
+        )
+
+
+def adjustShiftCounts(links: QuerySet, sign: int) -> None:
+    """Adds or subtracts the given through rows to or from the counts.
+    Parameters:
+    - links: A queryset of `Shift.staffs.through` rows.
+    - sign: 1 for rows being added, -1 for rows being removed.
+    """
+    if countsPaused.get():
+        return
+    counts = linkCounts(links)
+    applyShiftCountDeltas(Counter({key: sign * count for key, count in counts.items()}))
+
+
+def deleteDays(days: QuerySet) -> int:
+    """Deletes days with their shifts and takes their staffs off the counts.
+    Deleting shifts otherwise adjusts the counts from a signal per shift;
+    here the through rows of all the days are counted with one query and
+    subtracted in one go.
+    Parameters:
+    - days: A queryset of `Day` rows.
+    Returns:
+    - int: The number of days deleted.
+    """
+    with transaction.atomic():
+        counts = linkCounts(Shift.staffs.through.objects.filter(shift__day__in=days))
+        with pausedShiftCounts(), recordedDeletions():
+            _, deleted = days.delete()
+        applyShiftCountDeltas(Counter({key: -count for key, count in counts.items()}))
+    return deleted.get(Day._meta.label, 0)
+
+
+def replaceShiftCounts(rosterIds: Iterable[int], counts: Counter[CountKey], batchSize: int | None = None) -> None:
+    """Replaces the counts of some rosters with the given ones.
+    Call this inside the transaction that wrote the rosters' shifts.
+    Parameters:
+    - rosterIds: The rosters whose counts are replaced.
+    - counts: {(staff id, roster id, shift type): count} of those rosters.
+    - batchSize: Optional batch size for the `bulk_create` call.
+    """
+    StaffShiftCount.objects.filter(roster_id__in=set(rosterIds)).delete()
+    StaffShiftCount.objects.bulk_create(
+        [
+            StaffShiftCount(staff_id=staffId, roster_id=rosterId, shiftType=shiftType, count=count)
+            for (staffId, rosterId, shiftType), count in counts.items()
+            if count
+        ],
+        batch_size=batchSize,
+    )
+
+
+def scheduleCounts(schedule: Schedule, rosters: dict[tuple[int, int], list[int]]) -> Counter[CountKey]:
+    """Counts the shifts of each staff in a schedule, the same way `linkCounts` counts through rows.
+    Parameters:
+    - schedule: {(date, shiftType): staff ids}.
+    - rosters: The roster ids of each month, as `monthRosters` returns them.
+    Returns:
+    - Counter: {(staff id, roster id, shift type): number of shifts}.
+    """
+    counts: Counter[CountKey] = Counter()
+    for (date, shiftType), staffIds in schedule.items():
+        rosterIds = rosters.get((date.year, date.month))
+        if rosterIds:
+            for staffId in staffIds:
+                counts[(staffId, rosterIds[0], shiftType)] += 1
+    return counts
+
+
+def rebuildShiftCounts(rosters: Iterable[Roster] | None = None, batchSize: int | None = None) -> int:
+    """Recomputes the counts of some or all rosters from the `Shift.staffs` through table.
+    Parameters:
+    - rosters: The rosters to recompute. Every roster when None.
+    - batchSize: Optional batch size for the `bulk_create` call.
+    Returns:
+    - int: The number of count rows written.
+    """
+    links = Shift.staffs.through.objects.all()
+    if rosters is None:
+        rosterIds = list(Roster.objects.values_list("id", flat=True))
+    else:
+        rosters = list(rosters)
+        rosterIds = [roster.id for roster in rosters]
+        ranges = Q()
+        for roster in rosters:
+            dates = monthDates(roster)
+            ranges |= Q(shift__day__date__range=(dates[0], dates[-1]))
+        links = links.filter(ranges)
+    rosterIdSet = set(rosterIds)
+    with transaction.atomic():
+        counts = linkCounts(links)
+        counts = Counter({key: count for key, count in counts.items() if key[1] in rosterIdSet})
+        replaceShiftCounts(rosterIds, counts, batchSize)
+    return sum(1 for count in counts.values() if count)
+
+
+def fairnessRows(first: datetime.date, last: datetime.date) -> QuerySet:
+    """Returns each staff's morning and afternoon shift totals over the rosters of a date range.
+    Only `StaffShiftCount` and the staff names are read, so the cost grows
+    with the number of staffs, not with the number of shifts.
+    Parameters:
+    - first: The first date.
+    - last: The last date.
+    Returns:
+    - QuerySet: Dicts with the staff's id and names, mornings, afternoons and total.
+    """
+    return (
+        StaffShiftCount.objects.filter(roster__date__range=(first, last))
+        .values("staff_id", "staff__firstName", "staff__middleName", "staff__lastName")
+        .annotate(
+            mornings=Sum("count", filter=Q(shiftType=Shift.MORNINGSHIFT), default=0),
+            afternoons=Sum("count", filter=Q(shiftType=Shift.AFTERNOONSHIFT), default=0),
+            total=Sum("count"),
+        )
+        .order_by("staff__firstName", "staff__middleName", "staff__lastName", "staff_id")
+    )
@@ -0,0 +1,31 @@
+"""Connection tuning for SQLite.
+By default SQLite journals to a rollback file, so a writer waits for every
+reader and readers wait for the writer. In WAL mode readers and one writer
+run at once, `synchronous=NORMAL` syncs at checkpoints instead of every
+commit, `busy_timeout` makes a blocked connection wait instead of failing
+and memory-mapped I/O spares reads a copy. The `SQLITE_PRAGMAS` setting
+lists the pragmas applied to every new connection.
+"""
+from collections.abc import Mapping
+
+WALPRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+    "temp_store": "MEMORY",
+}
+
+
+def applyPragmas(connection, pragmas: Mapping[str, str | int]) -> None:
+    """Sets pragmas on a new SQLite connection.
+    Parameters:
+    - connection: The Django database connection.
+    - pragmas: Pragma names and values, like `WALPRAGMAS`.
+    """
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,54 @@
+"""Set based staff edits.
+`update` skips `Staff.save` and the `Staff` signals, so these helpers set the
+search fields and `updatedAt` themselves and invalidate the cached staff
+list pages and the staffs' feeds.
+"""
+import datetime
+
+from django.utils import timezone
+
+from .caching import abumpFeedVersions, abumpStaffListVersion
+from .models import Staff, normalizeName
+
+
+def nameChanges(names: dict[str, str], now: datetime.datetime) -> dict[str, object]:
+    """Returns the `update` keyword arguments that set names and their search names.
+    Parameters:
+    - names: {name field: new value} for the fields to change.
+    - now: The new `updatedAt`.
+    """
+    changes: dict[str, object] = {"updatedAt": now}
+    for nameField, searchField in zip(Staff.NAMEFIELDS, Staff.SEARCHFIELDS):
+        if nameField in names:
+            changes[nameField] = names[nameField]
+            changes[searchField] = normalizeName(names[nameField])
+    return changes
+
+
+async def aupdateStaff(
+    id: int, updatedAt: datetime.datetime, names: dict[str, str], renderedNames: dict[str, str]
+) -> Staff | None:
+    """Sets the names of a staff if it was not changed since it was read.
+    The check and the write are one `UPDATE ... WHERE id = ? AND updatedAt = ?`
+    that also matches the names the edit leaves as the editor was shown
+    them, so two editors cannot overwrite each other's changes, and the
+    saved staff is known without reading it back: a forged or stale form
+    matches no row.
+    Parameters:
+    - id: The staff id.
+    - updatedAt: The `updatedAt` of the staff when the editor read it.
+    - names: {name field: new value} for the fields to change.
+    - renderedNames: {name field: value} of the names the editor was shown.
+    Returns:
+    - Staff: The saved staff, without `createdAt`, or None if the staff changed or is gone.
+    """
+    now = timezone.now()
+    unchanged = {name: value for name, value in renderedNames.items() if name not in names}
+    updated = await Staff.objects.filter(id=id, updatedAt=updatedAt, **unchanged).aupdate(**nameChanges(names, now))
+    if not updated:
+        return None
+    await abumpStaffListVersion()
+    await abumpFeedVersions([id])
+    staff = Staff(id=id, **unchanged, **names, updatedAt=now)
+    staff.setSearchNames()
+    return staff
@@ -0,0 +1,170 @@
+"""Streaming spreadsheet exports of generated rosters.
+The shifts of a range of months are read with one query whose rows are
+fetched in chunks, grouped into one spreadsheet row per shift and written
+out as they come, so memory use does not grow with the number of months.
+Under ASGI the chunks are handed to the server through `astream`, as Django
+would otherwise read a synchronous stream into a list before sending it.
+"""
+import csv
+import datetime
+import itertools
+import zipfile
+from collections.abc import AsyncIterator, Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+
+from .models import Shift
+
+EXPORTHEADER = ("Date", "Day", "Shift", "Staffs")
+CHUNKSIZE = 2000
+
+
+def parseMonth(value: str) -> datetime.date:
+    """Parses a YYYY-MM month into the first date of the month.
+    Raises:
+    - ValueError: If the month is malformed.
+    """
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+
+def exportRows(start: datetime.date, end: datetime.date, chunkSize: int = CHUNKSIZE) -> Iterator[tuple[str, ...]]:
+    """Yields one row per shift of the days from start to end inclusive.
+    Parameters:
+    - start: The first date.
+    - end: The last date.
+    - chunkSize: How many database rows are fetched at a time.
+    Returns:
+    - Iterator: (date, weekday, shift, staffs) rows in date order.
+    """
+    names = ("staffs__firstName", "staffs__middleName", "staffs__lastName")
+    links = (
+        Shift.objects.filter(day__date__range=(start, end))
+        .order_by("day__date", "id", *names, "staffs__id")
+        .values_list("day__date", "id", "shiftType", *names)
+        .iterator(chunk_size=chunkSize)
+    )
+    for (date, _, shiftType), rows in itertools.groupby(links, key=lambda row: row[:3]):
+        staffs = [" ".join(filter(None, row[3:])) for row in rows if row[3] is not None]
+        yield (date.isoformat(), date.strftime("%A"), Shift.SHIFTTYPES[shiftType], ", ".join(staffs))
+
+
+class Echo:
+    """A file-like object that returns what is written to it instead of storing it."""
+
+    def write(self, value: str) -> str:
+        """Returns the value."""
+        return value
+
+
+def streamCsv(rows: Iterable[Iterable[str]]) -> Iterator[str]:
+    """Yields the rows as CSV lines."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORTHEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class ZipStream:
+    """A write only file that hands out what was written since the last `drain`."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Buffers data until it is drained."""
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Does nothing; the data is handed out by `drain`."""
+
+    def drain(self) -> bytes:
+        """Returns and forgets the buffered data."""
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSXPARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Roster" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def xlsxRow(row: Iterable[str]) -> str:
+    """Returns a worksheet row of inline string cells."""
+    cells = "".join(f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>' for value in row)
+    return f"<row>{cells}</row>"
+
+
+def streamXlsx(rows: Iterable[Iterable[str]], rowsPerChunk: int = 500) -> Iterator[bytes]:
+    """Yields an XLSX workbook of the rows, written incrementally.
+    The worksheet is compressed into the zip file as the rows come, and
+    the compressed bytes are handed out every `rowsPerChunk` rows.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSXPARTS.items():
+            workbook.writestr(name, content)
+        yield stream.drain()
+        with workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(xlsxRow(EXPORTHEADER).encode())
+            for batch in batched(rows, rowsPerChunk):
+                sheet.write("".join(xlsxRow(row) for row in batch).encode())
+                yield stream.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield stream.drain()
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[tuple]:
+    """Yields tuples of up to `size` items, like `itertools.batched` of Python 3.12."""
+    iterator = iter(iterable)
+    while batch := tuple(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def astream(chunks: Iterable, batchSize: int = 100) -> AsyncIterator:
+    """Yields the chunks of a synchronous stream from an async iterator.
+    The stream queries the database, so it is advanced in the thread of
+    `sync_to_async`, taking `batchSize` chunks at a time to limit the hops.
+    """
+    iterator = iter(chunks)
+    nextBatch = sync_to_async(lambda: list(itertools.islice(iterator, batchSize)))
+    while batch := await nextBatch():
+        for chunk in batch:
+            yield chunk
@@ -0,0 +1,108 @@
+"""iCalendar feeds of each staff's shifts.
+Calendar apps poll feeds every few minutes, so a rendered feed is cached
+with its ETag under the feed versions of `roster.caching`. A poll of a
+cached feed reads the cache only, and an unchanged feed is answered with
+`304 Not Modified`. Shifts have no times, so each shift is an all day event.
+"""
+import datetime
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from .caching import afeedVersions
+from .models import Shift, Staff
+
+# How far back feeds reach; later shifts are always included.
+FEEDPASTDAYS = 92
+FEEDTIMEOUT = 86400
+PRODID = "-//Highland FM//Roster//EN"
+
+
+def escapeText(value: str) -> str:
+    """Escapes an iCalendar TEXT value."""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def foldLine(line: str) -> str:
+    """Folds a content line into lines of at most 75 octets, as RFC 5545 asks."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts = []
+    start, limit = 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # Never split a UTF-8 sequence.
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts)
+
+
+def renderFeed(staff: Staff, shifts) -> str:
+    """Renders a VCALENDAR with one all day VEVENT per shift.
+    Parameters:
+    - staff: The staff whose feed it is.
+    - shifts: (shift id, shift type, date, updatedAt) rows.
+    Returns:
+    - str: The feed with CRLF line endings.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escapeText(f'Highland FM shifts of {staff}')}",
+    ]
+    for shiftId, shiftType, date, updatedAt in shifts:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:shift-{shiftId}-staff-{staff.id}@highland-fm-roster",
+            f"DTSTAMP:{updatedAt.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}",
+            f"DTSTART;VALUE=DATE:{date:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{date + datetime.timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{escapeText(Shift.SHIFTTYPES[shiftType])}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "".join(foldLine(line) + "\r\n" for line in lines)
+
+
+async def afeedCacheKey(staffId: int, since: datetime.date) -> str:
+    """Returns the cache key of a staff's feed from a date on."""
+    version, staffVersion = await afeedVersions(staffId)
+    return f"roster:feed:{staffId}:{since:%Y%m%d}:{version}:{staffVersion}"
+
+
+async def astaffFeed(staffId: int) -> tuple[str, str] | None:
+    """Returns a staff's feed and its ETag, from the cache when it is there.
+    Parameters:
+    - staffId: The staff id.
+    Returns:
+    - tuple: (ETag, feed), or None if there is no such staff.
+    """
+    since = timezone.localdate() - datetime.timedelta(days=FEEDPASTDAYS)
+    key = await afeedCacheKey(staffId, since)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+    staff = await Staff.objects.only("firstName", "middleName", "lastName").filter(id=staffId).afirst()
+    if staff is None:
+        return None
+    shifts = [
+        row
+        async for row in Shift.objects.filter(staffs=staffId, day__date__gte=since)
+        .order_by("day__date", "id")
+        .values_list("id", "shiftType", "day__date", "updatedAt")
+    ]
+    feed = renderFeed(staff, shifts)
+    cached = (quote_etag(hashlib.md5(feed.encode()).hexdigest()), feed)
+    await cache.aset(key, cached, FEEDTIMEOUT)
+    return cached
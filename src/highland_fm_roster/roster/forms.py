@@ -1,5 +1,8 @@
 """Forms for the roster app"""
-from django.forms import ModelForm
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.forms import CharField, ChoiceField, Field, FileField, Form, HiddenInput, ModelForm, MultipleHiddenInput
 
 from .models import Staff
 
@@ -9,3 +12,94 @@ class StaffForm(ModelForm):
     class Meta:
         model = Staff
         fields = ['firstName', 'middleName', 'lastName']
+
+
+class StaffEditForm(StaffForm):
+    """Form for editing a staff without reading it first.
+    The form carries the names and the `updatedAt` it was rendered with, so
+    only the changed names are validated and the edit can be applied only if
+    the staff is still as the editor saw it.
+    Attributes:
+    - renderedNames: The names a bound form was rendered with.
+    """
+    updatedAt = CharField(widget=HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.renderedNames: dict[str, str] = {}
+        for name in Staff.NAMEFIELDS:
+            field = self.fields[name]
+            field.show_hidden_initial = True
+            if not self.is_bound:
+                continue
+            hiddenInitial = field.hidden_widget().value_from_datadict(self.data, self.files, self.add_initial_prefix(name))
+            self.renderedNames[name] = field.to_python(hiddenInitial)
+            if not field.has_changed(self.renderedNames[name], self[name].data):
+                del self.fields[name]
+
+    @classmethod
+    def forStaff(cls, staff: Staff) -> "StaffEditForm":
+        """Returns an unbound form for editing a staff."""
+        initial = {name: getattr(staff, name) for name in Staff.NAMEFIELDS}
+        return cls(initial={**initial, "updatedAt": staff.updatedAt.isoformat()})
+
+    def clean_updatedAt(self) -> datetime.datetime:
+        """Parses the `updatedAt` the form was rendered with."""
+        try:
+            return datetime.datetime.fromisoformat(self.cleaned_data["updatedAt"])
+        except ValueError:
+            raise ValidationError("Reload the staff and try again.", code="invalid")
+
+    def names(self) -> dict[str, str]:
+        """Returns the changed names."""
+        return {name: self.cleaned_data[name] for name in Staff.NAMEFIELDS if name in self.fields}
+
+
+class StaffImportForm(Form):
+    """Form for uploading a CSV file of staffs."""
+    file = FileField(help_text="CSV with a header row of firstName, middleName and lastName columns.")
+
+
+class IdsField(Field):
+    """A field for a list of ids, like the values of ticked checkboxes."""
+    widget = MultipleHiddenInput
+    default_error_messages = {"invalid": "Enter whole number ids."}
+
+    def to_python(self, value):
+        """Returns the ids as a set of integers."""
+        if not value:
+            return set()
+        try:
+            return {int(id) for id in value}
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
+
+    def validate(self, value):
+        """Requires at least one id."""
+        if not value:
+            raise ValidationError("Select at least one staff.", code="required")
+
+
+class StaffBatchForm(Form):
+    """Form for deleting or renaming several staffs at once.
+    For edits, the name fields that are left blank are not changed.
+    """
+    DELETE = "delete"
+    EDIT = "edit"
+
+    ids = IdsField()
+    action = ChoiceField(choices=[(DELETE, "Delete"), (EDIT, "Edit")])
+    firstName = CharField(max_length=50, required=False, help_text="First name")
+    middleName = CharField(max_length=50, required=False, help_text="Middle name")
+    lastName = CharField(max_length=50, required=False, help_text="Last name (Surname)")
+
+    def names(self) -> dict[str, str]:
+        """Returns the name fields to set."""
+        return {field: self.cleaned_data[field] for field in Staff.NAMEFIELDS if self.cleaned_data.get(field)}
+
+    def clean(self):
+        """Requires a name to set for edits."""
+        cleaned = super().clean()
+        if cleaned.get("action") == self.EDIT and not self.names():
+            raise ValidationError("Enter a name to set.", code="required")
+        return cleaned
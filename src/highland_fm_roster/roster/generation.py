@@ -0,0 +1,188 @@
+"""Bulk generation of the days and shifts of rosters.
+A roster owns every `Day` whose date falls in the roster's month. Generating
+rosters replaces those days with fresh `Day`, `Shift` and `Shift.staffs` rows
+using bulk inserts, so any number of months costs a handful of queries.
+"""
+import datetime
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .activity import ActivityMatrix, monthDates, windowBits
+from .caching import invalidateFeeds
+from .counters import applyShiftCountDeltas, monthRosters, pausedShiftCounts, replaceShiftCounts, scheduleCounts
+from .models import Day, Roster, Shift, StaffRosterAssignment
+from .scheduler import Schedule, rotationSchedule
+from .tombstones import recordedDeletions
+
+SHIFTORDER = (Shift.MORNINGSHIFT, Shift.AFTERNOONSHIFT)
+
+
+def rosterDays(roster: Roster):
+    """Returns a queryset of the `Day` rows that belong to a roster."""
+    dates = monthDates(roster)
+    return Day.objects.filter(date__range=(dates[0], dates[-1]))
+
+
+def insertShiftStaffs(links: Iterable[tuple[int, int]]) -> None:
+    """Inserts (shift id, staff id) rows into the `Shift.staffs` through table.
+    The through table is by far the largest one, so the rows are sent with a
+    single `executemany` instead of building a model instance per row for
+    `bulk_create`.
+    Parameters:
+    - links: (shift id, staff id) pairs.
+    """
+    Through = Shift.staffs.through
+    connection = connections[router.db_for_write(Through)]
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}, {}) VALUES (%s, %s)".format(
+        quote(Through._meta.db_table),
+        quote(Through._meta.get_field("shift").column),
+        quote(Through._meta.get_field("staff").column),
+    )
+    links = list(links)
+    if links:
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, links)
+
+
+def writeSchedules(items: Sequence[tuple[Roster, Schedule]], batchSize: int | None = None) -> list[Day]:
+    """Replaces the days of several rosters with their schedules in one transaction.
+    The shift counts of the rosters' months are replaced from the schedules
+    too, instead of being adjusted shift by shift from the signals.
+    Parameters:
+    - items: (roster, schedule) pairs; a schedule maps (date, shiftType) to staff ids.
+    - batchSize: Optional batch size for the `Day` and `Shift` `bulk_create` calls.
+    Returns:
+    - list: The created `Day` objects.
+    """
+    if not items:
+        return []
+    ranges = Q()
+    dates: set[datetime.date] = set()
+    merged: dict[tuple[datetime.date, str], Iterable[int]] = {}
+    for roster, schedule in items:
+        rosterDates = monthDates(roster)
+        ranges |= Q(date__range=(rosterDates[0], rosterDates[-1]))
+        dates.update(rosterDates)
+        merged.update(schedule)
+    with transaction.atomic(), pausedShiftCounts():
+        with recordedDeletions(batchSize):
+            Day.objects.filter(ranges).delete()
+        days = Day.objects.bulk_create([Day(date=date) for date in sorted(dates)], batch_size=batchSize)
+        shifts = Shift.objects.bulk_create(
+            [Shift(day=day, shiftType=shiftType) for day in days for shiftType in SHIFTORDER],
+            batch_size=batchSize,
+        )
+        insertShiftStaffs(
+            (shift.id, staffId)
+            for shift in shifts
+            for staffId in merged.get((shift.day.date, shift.shiftType), ())
+        )
+        rosters = monthRosters((date.year, date.month) for date in dates)
+        replaceShiftCounts(
+            [rosterId for rosterIds in rosters.values() for rosterId in rosterIds],
+            scheduleCounts(merged, rosters),
+            batchSize,
+        )
+        invalidateFeeds()
+    return days
+
+
+def writeSchedule(roster: Roster, schedule: Schedule, batchSize: int | None = None) -> list[Day]:
+    """Replaces the days of a roster with the given schedule in one transaction."""
+    return writeSchedules([(roster, schedule)], batchSize)
+
+
+def generateRosters(rosters: Iterable[Roster], batchSize: int | None = None) -> list[Day]:
+    """Generates the days and shifts of several rosters from their staff assignments.
+    The rosters are scheduled together in date order, so shift counts stay
+    balanced across months.
+    Parameters:
+    - rosters: The rosters to generate.
+    - batchSize: Optional batch size for the `bulk_create` calls.
+    Returns:
+    - list: The created `Day` objects.
+    """
+    rosters = sorted(rosters, key=lambda roster: roster.date)
+    schedules = rotationSchedule(ActivityMatrix.forRosters(rosters))
+    return writeSchedules(list(zip(rosters, schedules)), batchSize)
+
+
+def generateRoster(roster: Roster, batchSize: int | None = None) -> list[Day]:
+    """Generates the days and shifts of a roster from its staff assignments.
+    Parameters:
+    - roster: The roster to generate.
+    - batchSize: Optional batch size for the `bulk_create` calls.
+    Returns:
+    - list: The created `Day` objects.
+    """
+    return generateRosters([roster], batchSize)
+
+
+def patchAssignment(assignment: StaffRosterAssignment, oldWindow) -> tuple[int, int]:
+    """Moves a staff onto or off the generated shifts of the days whose activity changed.
+    Only the days where the old and new active windows differ are touched,
+    so hand edits to other days survive. On days the staff is no longer
+    active, the staff leaves its shifts. On days the staff becomes active,
+    it joins the shift its group works that day, or the smaller shift when
+    none of its group is on shift. The touched shifts get a new `updatedAt`.
+    The cost is a constant number of queries.
+    Parameters:
+    - assignment: The saved assignment.
+    - oldWindow: The `StaffRosterAssignment.activeWindow` before the change.
+    Returns:
+    - tuple: The number of (shift, staff) links added and removed.
+    """
+    dates = monthDates(assignment.roster)
+    newWindow = assignment.activeWindow(assignment.active, assignment.vacationDate, assignment.resumptionDate)
+    oldBits = windowBits(oldWindow, dates[0], len(dates))
+    newBits = windowBits(newWindow, dates[0], len(dates))
+    joined = [date for index, date in enumerate(dates) if (newBits & ~oldBits) >> index & 1]
+    left = [date for index, date in enumerate(dates) if (oldBits & ~newBits) >> index & 1]
+    staffId = assignment.staff_id
+    deltas: Counter = Counter()
+    touched: set[int] = set()
+    added = removed = 0
+    with transaction.atomic(), pausedShiftCounts():
+        if left:
+            links = Shift.staffs.through.objects.filter(staff_id=staffId, shift__day__date__in=left)
+            for shiftId, shiftType in links.values_list("shift_id", "shift__shiftType"):
+                deltas[(staffId, assignment.roster_id, shiftType)] -= 1
+                touched.add(shiftId)
+                removed += 1
+            links.delete()
+        if joined:
+            groupStaffs = StaffRosterAssignment.objects.filter(
+                roster_id=assignment.roster_id, group=assignment.group
+            ).exclude(staff_id=staffId).values("staff_id")
+            shifts = (
+                Shift.objects.filter(day__date__in=joined)
+                .annotate(
+                    groupSize=Count("staffs", filter=Q(staffs__in=groupStaffs)),
+                    size=Count("staffs"),
+                    present=Count("staffs", filter=Q(staffs=staffId)),
+                )
+                .values_list("id", "day__date", "shiftType", "groupSize", "size", "present")
+            )
+            byDate: dict[datetime.date, list[tuple]] = {}
+            for row in shifts:
+                byDate.setdefault(row[1], []).append(row)
+            links = []
+            for date, rows in byDate.items():
+                if any(present for *_, present in rows):
+                    continue
+                shiftId, _, shiftType, *_ = min(rows, key=lambda row: (-row[3], row[4], SHIFTORDER.index(row[2])))
+                links.append((shiftId, staffId))
+                touched.add(shiftId)
+                deltas[(staffId, assignment.roster_id, shiftType)] += 1
+            insertShiftStaffs(links)
+            added = len(links)
+        applyShiftCountDeltas(deltas)
+        if touched:
+            Shift.objects.filter(id__in=touched).update(updatedAt=timezone.now())
+            invalidateFeeds([staffId])
+    return added, removed
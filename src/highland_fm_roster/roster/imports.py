@@ -0,0 +1,101 @@
+"""Bulk import of staffs from CSV.
+Every row is validated with `StaffForm`, so imports follow the same rules as
+the new staff page. Rows naming a staff that already exists, in the database
+or earlier in the file, are skipped. Existing staffs are found with one
+query, and the new staffs are inserted with `bulk_create`.
+"""
+import csv
+from collections.abc import Iterable, Iterator
+
+from django.db import transaction
+
+from .caching import bumpStaffListVersion
+from .forms import StaffForm
+from .models import Staff, normalizeName
+
+# Header cells are matched after normalizing, so "First Name" is firstName.
+IMPORTCOLUMNS = {normalizeName(field): field for field in Staff.NAMEFIELDS}
+
+
+class ImportSummary:
+    """The outcome of a staff import.
+    Attributes:
+    - inserted: The number of staffs created.
+    - skipped: Line numbers of rows naming an existing staff.
+    - invalid: (line number, errors) of rows that failed validation.
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.skipped: list[int] = []
+        self.invalid: list[tuple[int, dict[str, list[str]]]] = []
+
+
+def readStaffRows(lines: Iterable[str]) -> Iterator[tuple[int, dict[str, str]]]:
+    """Reads staff rows from CSV lines with a header row.
+    Parameters:
+    - lines: The lines of the CSV file.
+    Returns:
+    - Iterator: (line number, {name field: value}) for each row.
+    Raises:
+    - ValueError: If the header lacks the firstName or lastName column.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, [])
+    columns = {
+        index: IMPORTCOLUMNS[normalizeName(cell)]
+        for index, cell in enumerate(header)
+        if normalizeName(cell) in IMPORTCOLUMNS
+    }
+    missing = {"firstName", "lastName"} - set(columns.values())
+    if missing:
+        raise ValueError(f"The header has no {' or '.join(sorted(missing))} column.")
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        values = {field: "" for field in Staff.NAMEFIELDS}
+        for index, field in columns.items():
+            if index < len(row):
+                values[field] = row[index]
+        yield reader.line_num, values
+
+
+def nameKey(staff: Staff) -> tuple[str, str, str]:
+    """Returns the normalized names that identify a staff."""
+    return tuple(getattr(staff, field) for field in Staff.SEARCHFIELDS)
+
+
+def importStaffs(rows: Iterable[tuple[int, dict[str, str]]], batchSize: int | None = 1000) -> ImportSummary:
+    """Validates staff rows and bulk creates the valid new staffs.
+    Parameters:
+    - rows: (line number, {name field: value}) pairs, like `readStaffRows` yields.
+    - batchSize: Batch size for the `bulk_create` call.
+    Returns:
+    - ImportSummary: What was inserted, skipped and invalid.
+    """
+    summary = ImportSummary()
+    candidates: list[tuple[int, Staff]] = []
+    for line, values in rows:
+        form = StaffForm(data=values)
+        if not form.is_valid():
+            summary.invalid.append((line, {field: list(errors) for field, errors in form.errors.items()}))
+            continue
+        staff = form.save(commit=False)
+        staff.setSearchNames()
+        candidates.append((line, staff))
+    firstNames = {staff.firstNameSearch for _, staff in candidates}
+    seen = set(Staff.objects.filter(firstNameSearch__in=firstNames).values_list(*Staff.SEARCHFIELDS))
+    staffs = []
+    for line, staff in candidates:
+        key = nameKey(staff)
+        if key in seen:
+            summary.skipped.append(line)
+            continue
+        seen.add(key)
+        staffs.append(staff)
+    if staffs:
+        with transaction.atomic():
+            Staff.objects.bulk_create(staffs, batch_size=batchSize)
+        bumpStaffListVersion()
+    summary.inserted = len(staffs)
+    return summary
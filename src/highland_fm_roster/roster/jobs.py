@@ -0,0 +1,290 @@
+"""Background jobs for roster generation, cloning and exports.
+Slow work is queued as a `Job` row and run by a `JobRunner` in the web
+process, so requests return at once and the page polls the job's status.
+The `Job` table is the queue: a runner claims the oldest queued job with a
+conditional `UPDATE ... WHERE status = 'queued'`, so several processes can
+share it without a broker and no job runs twice.
+
+A runner is a supervisor thread and a bounded thread pool. Every
+`pollSeconds` the supervisor refreshes the heartbeat of the jobs it runs,
+requeues jobs whose heartbeat went stale because the process that ran them
+died, and claims queued jobs while workers are free. `RosterConfig.ready`
+starts a runner when the `JOB_RUNNER` setting is on; `./manage.py run_jobs`
+runs one in the foreground.
+"""
+import datetime
+import logging
+import tempfile
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .calendars import monthRange
+from .cloning import cloneRoster
+from .export import exportRows, parseMonth, streamCsv, streamXlsx
+from .generation import generateRosters
+from .models import Job, Roster, Shift
+from .optimizer import optimizeRosters
+
+logger = logging.getLogger(__name__)
+
+POLLSECONDS = 5.0
+STALESECONDS = 60.0
+MAXATTEMPTS = 3
+EXPORTTYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class JobContext:
+    """What a job handler gets to report its progress.
+    Attributes:
+    - job: The running job.
+    """
+
+    def __init__(self, job: Job):
+        self.job = job
+
+    def report(self, progress: int, message: str = "") -> None:
+        """Saves the progress of the job when it changed."""
+        progress = min(max(int(progress), 0), 99)
+        if progress == self.job.progress and message == self.job.message:
+            return
+        self.job.progress, self.job.message = progress, message
+        now = timezone.now()
+        Job.objects.filter(id=self.job.id).update(progress=progress, message=message, heartbeatAt=now, updatedAt=now)
+
+
+def runGenerate(context: JobContext) -> dict:
+    """Generates the rosters of `params["rosters"]`, with the optimizer if `params["optimize"]`."""
+    params = context.job.params
+    rosters = list(Roster.objects.filter(id__in=params["rosters"]))
+    if len(rosters) != len(set(params["rosters"])):
+        raise ValueError("A roster to generate no longer exists.")
+    context.report(10, f"Generating {', '.join(str(roster) for roster in sorted(rosters, key=lambda roster: roster.date))}")
+    if params.get("optimize"):
+        days = optimizeRosters(rosters, params.get("timeBudget", 1.0))
+    else:
+        days = generateRosters(rosters)
+    return {"days": len(days), "months": sorted(f"{roster.date:%Y-%m}" for roster in rosters)}
+
+
+def runClone(context: JobContext) -> dict:
+    """Copies the roster `params["source"]` into the YYYY-MM month `params["month"]`."""
+    params = context.job.params
+    source = Roster.objects.filter(id=params["source"]).first()
+    if source is None:
+        raise ValueError("The roster to copy no longer exists.")
+    month = parseMonth(params["month"])
+    context.report(10, f"Copying {source} into {month:%B %Y}")
+    roster = cloneRoster(source, month)
+    return {"roster": roster.id, "month": f"{month:%Y-%m}"}
+
+
+def countedRows(rows: Iterable, total: int, context: JobContext) -> Iterator:
+    """Yields rows, reporting the share of `total` passed along."""
+    for index, row in enumerate(rows, start=1):
+        if index % 100 == 0:
+            context.report(index * 100 // max(total, 1), f"Exported {index} of {total} shifts")
+        yield row
+
+
+def runExport(context: JobContext) -> dict:
+    """Exports the months `params["start"]` to `params["end"]` as `params["format"]` into the job's output.
+    The export is written to a temporary file as it streams, then saved to
+    the default storage, so the job keeps only the path of the file.
+    """
+    params = context.job.params
+    format = params["format"]
+    if format not in EXPORTTYPES:
+        raise ValueError(f"Unknown export format {format!r}.")
+    start, end = parseMonth(params["start"]), parseMonth(params.get("end") or params["start"])
+    last = monthRange(end.year, end.month)[1]
+    total = Shift.objects.filter(day__date__range=(start, last)).count()
+    rows = countedRows(exportRows(start, last), total, context)
+    name = f"roster-{start:%Y-%m}-{end:%Y-%m}.{format}"
+    output = context.job.output
+    if output:
+        # A retried job replaces the file of its interrupted attempt.
+        output.delete(save=False)
+    with tempfile.TemporaryFile() as temporary:
+        if format == "csv":
+            temporary.writelines(line.encode() for line in streamCsv(rows))
+        else:
+            temporary.writelines(streamXlsx(rows))
+        size = temporary.tell()
+        output.save(name, File(temporary), save=False)
+    Job.objects.filter(id=context.job.id).update(output=output.name, outputName=name, outputType=EXPORTTYPES[format])
+    return {"shifts": total, "bytes": size}
+
+
+HANDLERS: dict[str, Callable[[JobContext], dict]] = {
+    Job.GENERATE: runGenerate,
+    Job.CLONE: runClone,
+    Job.EXPORT: runExport,
+}
+
+
+def enqueueJob(kind: str, params: dict) -> Job:
+    """Queues a job and wakes the runner when the current transaction commits.
+    Parameters:
+    - kind: One of `Job.KINDS`.
+    - params: The JSON parameters of the job's handler.
+    Returns:
+    - Job: The queued job.
+    """
+    job = Job.objects.create(kind=kind, params=params)
+    transaction.on_commit(jobRunner.wake)
+    return job
+
+
+def claimJob() -> Job | None:
+    """Marks the oldest queued job as running and returns it, or None if there is none.
+    The claim is a conditional update, so of several runners racing for a
+    job exactly one gets it.
+    """
+    queued = Job.objects.filter(status=Job.QUEUED).order_by("createdAt", "id").values_list("id", flat=True)
+    for jobId in queued[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(id=jobId, status=Job.QUEUED).update(
+            status=Job.RUNNING, startedAt=now, heartbeatAt=now, attempts=F("attempts") + 1, updatedAt=now
+        )
+        if claimed:
+            return Job.objects.get(id=jobId)
+    return None
+
+
+def runJob(job: Job) -> Job:
+    """Runs a claimed job and saves its result, or its error if it fails."""
+    try:
+        result = HANDLERS[job.kind](JobContext(job))
+    except Exception as error:
+        logger.exception("Job %s failed.", job.id)
+        job.status, job.message, job.result = Job.FAILED, str(error)[:255] or type(error).__name__, {}
+    else:
+        job.status, job.progress, job.message, job.result = Job.DONE, 100, "", result
+    job.finishedAt = timezone.now()
+    job.save(update_fields=["status", "progress", "message", "result", "finishedAt", "updatedAt"])
+    return job
+
+
+def recoverJobs(staleBefore: datetime.datetime) -> int:
+    """Requeues running jobs whose heartbeat is older than `staleBefore`.
+    Their process stopped while running them. Jobs that were started
+    `MAXATTEMPTS` times fail instead.
+    Returns:
+    - int: The number of jobs recovered or failed.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeatAt__lt=staleBefore)
+    failed = stale.filter(attempts__gte=MAXATTEMPTS).update(
+        status=Job.FAILED, message="The job was interrupted too many times.", finishedAt=now, updatedAt=now
+    )
+    requeued = stale.update(status=Job.QUEUED, message="Interrupted, queued again.", updatedAt=now)
+    return failed + requeued
+
+
+def runPendingJobs() -> int:
+    """Runs queued jobs one after another in the calling thread until none is left.
+    Returns:
+    - int: The number of jobs run.
+    """
+    count = 0
+    while (job := claimJob()) is not None:
+        runJob(job)
+        count += 1
+    return count
+
+
+class JobRunner:
+    """Runs queued jobs in a bounded pool of threads.
+    Attributes:
+    - workers: The most jobs run at once.
+    - pollSeconds: How often the queue is checked without being woken.
+    - staleSeconds: How old a running job's heartbeat gets before it is recovered.
+    """
+
+    def __init__(self, workers: int = 2, pollSeconds: float = POLLSECONDS, staleSeconds: float = STALESECONDS):
+        self.workers = workers
+        self.pollSeconds = pollSeconds
+        self.staleSeconds = staleSeconds
+        self.running: set[int] = set()
+        self.lock = threading.Lock()
+        self.woken = threading.Event()
+        self.stopping = threading.Event()
+        self.executor: ThreadPoolExecutor | None = None
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Starts the supervisor thread and the pool, once."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopping.clear()
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="roster-job")
+            self.thread = threading.Thread(target=self.supervise, name="roster-jobs", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stops claiming jobs and waits for the running ones to finish."""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.wake()
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+        self.thread = self.executor = None
+
+    def wake(self) -> None:
+        """Makes the supervisor check the queue now."""
+        self.woken.set()
+
+    def supervise(self) -> None:
+        """Ticks until stopped, sleeping between ticks unless woken."""
+        while not self.stopping.is_set():
+            try:
+                self.tick()
+            except DatabaseError:
+                # Tables may be missing before migrations; the next tick retries.
+                logger.exception("Job runner tick failed.")
+            finally:
+                connection.close()
+            self.woken.wait(self.pollSeconds)
+            self.woken.clear()
+
+    def tick(self) -> None:
+        """Refreshes heartbeats, recovers stale jobs and claims jobs for free workers."""
+        now = timezone.now()
+        with self.lock:
+            running = set(self.running)
+        if running:
+            Job.objects.filter(id__in=running).update(heartbeatAt=now)
+        recoverJobs(now - datetime.timedelta(seconds=self.staleSeconds))
+        while not self.stopping.is_set() and len(running) < self.workers:
+            job = claimJob()
+            if job is None:
+                break
+            running.add(job.id)
+            with self.lock:
+                self.running.add(job.id)
+            self.executor.submit(self.run, job)
+
+    def run(self, job: Job) -> None:
+        """Runs a job on a pool thread."""
+        try:
+            runJob(job)
+        finally:
+            with self.lock:
+                self.running.discard(job.id)
+            connection.close()
+            self.wake()
+
+
+jobRunner = JobRunner(getattr(settings, "JOB_WORKERS", 2))
@@ -0,0 +1,34 @@
+"""Management command for benchmarking views and model operations."""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.benchmarking import BENCHMARKS, compareResults, runBenchmarks
+
+
+class Command(BaseCommand):
+    help = "Times the roster views and model operations against the current database and prints JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)}. Default: all.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Compare the results with a previous JSON file.")
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}.")
+        results = runBenchmarks(options["repeat"], options["names"])
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as file:
+                    previous = json.load(file)
+            except (OSError, json.JSONDecodeError) as error:
+                raise CommandError(f"Cannot read {options['compare']}: {error}")
+            self.stdout.write("\n".join(compareResults(previous, results)))
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,30 @@
+"""Management command for copying a roster into another month."""
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.cloning import cloneRoster
+from roster.export import parseMonth
+from roster.models import Roster
+
+
+class Command(BaseCommand):
+    help = "Copies a roster's assignments, days, shifts and shift staffs into another month."
+
+    def add_arguments(self, parser):
+        parser.add_argument("roster", type=int, help="Id of the roster to copy.")
+        parser.add_argument("month", help="The month to copy into, as YYYY-MM.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Batch size for bulk inserts.")
+
+    def handle(self, *args, **options):
+        try:
+            source = Roster.objects.get(pk=options["roster"])
+        except Roster.DoesNotExist:
+            raise CommandError(f"Roster {options['roster']} does not exist.")
+        try:
+            month = parseMonth(options["month"])
+        except ValueError:
+            raise CommandError(f"Invalid month {options['month']!r}, expected YYYY-MM.")
+        try:
+            roster = cloneRoster(source, month, batchSize=options["batch_size"])
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(f"Copied {source} into {roster} (roster {roster.id})."))
@@ -0,0 +1,35 @@
+"""Management command for generating the days and shifts of rosters."""
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.generation import generateRosters
+from roster.models import Roster
+from roster.optimizer import optimizeRosters
+
+
+class Command(BaseCommand):
+    help = "Generates the days, shifts and shift staffs of rosters from their staff assignments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("rosters", type=int, nargs="+", help="Ids of the rosters to generate.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Batch size for bulk inserts.")
+        parser.add_argument(
+            "--optimize", action="store_true", help="Improve the group rotation with parallel local search."
+        )
+        parser.add_argument(
+            "--time-budget", type=float, default=1.0, help="Seconds the optimizer may spend on all rosters."
+        )
+        parser.add_argument("--workers", type=int, default=None, help="Optimizer worker processes.")
+
+    def handle(self, *args, **options):
+        rosters = list(Roster.objects.filter(pk__in=options["rosters"]))
+        missing = set(options["rosters"]) - {roster.id for roster in rosters}
+        if missing:
+            raise CommandError(f"Rosters {sorted(missing)} do not exist.")
+        if options["optimize"]:
+            days = optimizeRosters(
+                rosters, options["time_budget"], options["workers"], batchSize=options["batch_size"]
+            )
+        else:
+            days = generateRosters(rosters, batchSize=options["batch_size"])
+        names = ", ".join(str(roster) for roster in rosters)
+        self.stdout.write(self.style.SUCCESS(f"Generated {len(days)} days for {names}."))
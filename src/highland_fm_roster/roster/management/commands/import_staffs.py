@@ -0,0 +1,30 @@
+"""Management command for importing staffs from CSV."""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.imports import importStaffs, readStaffRows
+
+
+class Command(BaseCommand):
+    help = "Imports staffs from a CSV file with firstName, middleName and lastName columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV file.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Batch size for bulk inserts.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                summary = importStaffs(readStaffRows(lines), batchSize=options["batch_size"])
+        except (OSError, UnicodeDecodeError, ValueError, csv.Error) as error:
+            raise CommandError(f"Cannot import {options['path']}: {error}")
+        for line, errors in summary.invalid:
+            messages = "; ".join(f"{field}: {' '.join(fieldErrors)}" for field, fieldErrors in errors.items())
+            self.stderr.write(f"Line {line}: {messages}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {summary.inserted} staffs, skipped {len(summary.skipped)} existing, "
+                f"{len(summary.invalid)} invalid."
+            )
+        )
@@ -0,0 +1,23 @@
+"""Management command for recomputing the materialized shift counts."""
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.counters import rebuildShiftCounts
+from roster.models import Roster
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per staff shift counts of rosters from their shifts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("rosters", type=int, nargs="*", help="Ids of the rosters to rebuild. Default: all.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Batch size for bulk inserts.")
+
+    def handle(self, *args, **options):
+        rosters = None
+        if options["rosters"]:
+            rosters = list(Roster.objects.filter(pk__in=options["rosters"]))
+            missing = set(options["rosters"]) - {roster.id for roster in rosters}
+            if missing:
+                raise CommandError(f"Rosters {sorted(missing)} do not exist.")
+        written = rebuildShiftCounts(rosters, batchSize=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} shift counts."))
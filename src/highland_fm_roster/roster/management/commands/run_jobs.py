@@ -0,0 +1,31 @@
+"""Management command for running background jobs outside the web server."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from roster.jobs import POLLSECONDS, STALESECONDS, JobRunner, runPendingJobs
+
+
+class Command(BaseCommand):
+    help = "Runs queued roster jobs until interrupted, or only the pending ones with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the queued jobs one by one, then exit.")
+        parser.add_argument(
+            "--workers", type=int, default=getattr(settings, "JOB_WORKERS", 2), help="The most jobs run at once."
+        )
+        parser.add_argument("--poll", type=float, default=POLLSECONDS, help="Seconds between checks of the queue.")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            count = runPendingJobs()
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs."))
+            return
+        runner = JobRunner(options["workers"], options["poll"], STALESECONDS)
+        runner.start()
+        self.stdout.write(f"Running jobs with {runner.workers} workers, press Ctrl+C to stop.")
+        try:
+            runner.thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Waiting for the running jobs to finish.")
+        finally:
+            runner.stop()
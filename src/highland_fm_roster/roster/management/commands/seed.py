@@ -0,0 +1,52 @@
+"""Management command for seeding synthetic roster data."""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from roster.counters import deleteDays
+from roster.models import Day, Roster, Staff
+from roster.seeding import seedDatabase
+from roster.tombstones import recordedDeletions
+
+
+def month(value: str) -> datetime.date:
+    """Parses a YYYY-MM month argument."""
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Invalid month {value!r}, expected YYYY-MM.")
+
+
+class Command(BaseCommand):
+    help = "Bulk seeds deterministic staffs, monthly rosters, assignments and shifts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--staffs", type=int, default=200, help="Number of staffs.")
+        parser.add_argument("--rosters", type=int, default=12, help="Number of monthly rosters.")
+        parser.add_argument("--start", type=month, default=datetime.date(year=2024, month=1, day=1), help="First month (YYYY-MM).")
+        parser.add_argument("--groups", type=int, default=4, help="Number of groups.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Batch size for bulk inserts.")
+        parser.add_argument("--clear", action="store_true", help="Delete existing staffs, rosters and days first.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            if options["clear"]:
+                with recordedDeletions(options["batch_size"]):
+                    deleteDays(Day.objects.all())
+                    Roster.objects.all().delete()
+                    Staff.objects.all().delete()
+            counts = seedDatabase(
+                options["staffs"],
+                options["rosters"],
+                options["start"],
+                seed=options["seed"],
+                numberOfGroups=options["groups"],
+                batchSize=options["batch_size"],
+            )
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary} in {elapsed:.2f}s."))
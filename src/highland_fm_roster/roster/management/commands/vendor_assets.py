@@ -0,0 +1,29 @@
+"""Management command for downloading the vendored front-end assets."""
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from roster.assets import VENDORASSETS, VENDORDIR
+
+
+class Command(BaseCommand):
+    help = "Downloads the third party front-end assets into roster/static/roster/vendor."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Download assets that exist already.")
+
+    def handle(self, *args, **options):
+        VENDORDIR.mkdir(parents=True, exist_ok=True)
+        for name, url in VENDORASSETS.items():
+            path = VENDORDIR / name
+            if path.exists() and not options["force"]:
+                self.stdout.write(f"{name} exists, skipped.")
+                continue
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    data = response.read()
+            except OSError as error:
+                raise CommandError(f"Cannot download {url}: {error}")
+            path.write_bytes(data)
+            self.stdout.write(f"{name}: {len(data)} bytes.")
+        self.stdout.write(self.style.SUCCESS(f"Vendored {len(VENDORASSETS)} assets."))
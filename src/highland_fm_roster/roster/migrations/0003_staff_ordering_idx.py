@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0002_day_roster_remove_staff_resumptiondate_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['firstName', 'middleName', 'lastName', 'id'], name='staff_ordering_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizeName(value):
+    """A copy of roster.models.normalizeName as it was when this migration was written."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(character for character in decomposed if character.isalnum()).casefold()
+
+
+def fillSearchNames(apps, schema_editor):
+    """Fills the search fields of existing staffs."""
+    Staff = apps.get_model('roster', 'Staff')
+    staffs = list(Staff.objects.all())
+    for staff in staffs:
+        staff.firstNameSearch = normalizeName(staff.firstName)
+        staff.middleNameSearch = normalizeName(staff.middleName)
+        staff.lastNameSearch = normalizeName(staff.lastName)
+    Staff.objects.bulk_update(staffs, ['firstNameSearch', 'middleNameSearch', 'lastNameSearch'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0003_staff_ordering_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staff',
+            name='firstNameSearch',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='lastNameSearch',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='middleNameSearch',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(fillSearchNames, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['firstNameSearch'], name='staff_first_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['middleNameSearch'], name='staff_middle_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['lastNameSearch'], name='staff_last_search_idx'),
+        ),
+    ]
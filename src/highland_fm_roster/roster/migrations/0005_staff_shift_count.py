@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def fillShiftCounts(apps, schema_editor):
+    """Counts the shifts of each staff in each roster.
+    A month's shifts are counted in its roster with the lowest id, like
+    `roster.counters.linkCounts` does. Any counts there are replaced.
+    """
+    Roster = apps.get_model('roster', 'Roster')
+    Shift = apps.get_model('roster', 'Shift')
+    StaffShiftCount = apps.get_model('roster', 'StaffShiftCount')
+    rosters = {}
+    for rosterId, date in Roster.objects.order_by('id').values_list('id', 'date'):
+        rosters.setdefault((date.year, date.month), rosterId)
+    rows = (
+        Shift.staffs.through.objects.values(
+            'staff_id', 'shift__shiftType', year=ExtractYear('shift__day__date'), month=ExtractMonth('shift__day__date')
+        )
+        .annotate(count=Count('id'))
+        .order_by()
+        .values_list('staff_id', 'shift__shiftType', 'year', 'month', 'count')
+    )
+    counts = [
+        StaffShiftCount(staff_id=staffId, roster_id=rosters[(year, month)], shiftType=shiftType, count=count)
+        for staffId, shiftType, year, month, count in rows
+        if (year, month) in rosters
+    ]
+    StaffShiftCount.objects.all().delete()
+    StaffShiftCount.objects.bulk_create(counts, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0004_staff_search_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffShiftCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shiftType', models.CharField(choices=[('ms', 'Morning shift'), ('as', 'Afternoon shift')], help_text='Shift type', max_length=32)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of shifts')),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+                ('roster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shiftCounts', to='roster.roster')),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shiftCounts', to='roster.staff')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('roster', 'staff', 'shiftType'), name='staff_shift_count_unique')],
+            },
+        ),
+        migrations.RunPython(fillShiftCounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0005_staff_shift_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='day',
+            index=models.Index(fields=['updatedAt', 'id'], name='day_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roster',
+            index=models.Index(fields=['updatedAt', 'id'], name='roster_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['updatedAt', 'id'], name='shift_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['updatedAt', 'id'], name='staff_updated_idx'),
+        ),
+    ]
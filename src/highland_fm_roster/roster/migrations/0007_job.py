@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0006_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('generate', 'Generate roster'), ('clone', 'Copy roster'), ('export', 'Export roster')], help_text='Job kind', max_length=32)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', help_text='Status', max_length=16)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent done')),
+                ('message', models.CharField(blank=True, help_text='Message', max_length=255)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('output', models.FileField(blank=True, max_length=255, upload_to='jobs/%Y/%m/')),
+                ('outputName', models.CharField(blank=True, max_length=100)),
+                ('outputType', models.CharField(blank=True, max_length=100)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('heartbeatAt', models.DateTimeField(blank=True, null=True)),
+                ('startedAt', models.DateTimeField(blank=True, null=True)),
+                ('finishedAt', models.DateTimeField(blank=True, null=True)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'createdAt', 'id'], name='job_status_idx')],
+            },
+        ),
+    ]
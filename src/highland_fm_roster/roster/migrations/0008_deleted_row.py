@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0007_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('staffs', 'Staff'), ('rosters', 'Roster'), ('days', 'Day'), ('shifts', 'Shift')], help_text='Resource', max_length=32)),
+                ('rowId', models.PositiveBigIntegerField(help_text='Id of the deleted row')),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updatedAt', 'id'], name='deleted_row_updated_idx')],
+            },
+        ),
+    ]
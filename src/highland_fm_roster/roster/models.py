@@ -1,26 +1,58 @@
 """Models for the roster app."""
+import unicodedata
+
 from django.core.validators import MinValueValidator
 from django.db import models
 
 
+def normalizeName(value: str) -> str:
+    """Normalizes a name or a search query for prefix matching.
+    Accents, punctuation and case are dropped, so "Ọlá-Dèjì" becomes "oladeji".
+    Parameters:
+    - value: The text to normalize.
+    Returns:
+    - str: The normalized text.
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(character for character in decomposed if character.isalnum()).casefold()
+
+
 class Staff(models.Model):
     """Represents a staff of highland FM
     Attributes:
     - firstName: First name of the staff.
     - middleName: Middle name of the staff.
     - lastName: Last name or surname of the staff.
+    - firstNameSearch: Normalized first name, for indexed prefix search.
+    - middleNameSearch: Normalized middle name, for indexed prefix search.
+    - lastNameSearch: Normalized last name, for indexed prefix search.
     - createdAt: Time of creation.
     - updatedAt: Time of last update.
     """
 
+    NAMEFIELDS = ("firstName", "middleName", "lastName")
+    SEARCHFIELDS = ("firstNameSearch", "middleNameSearch", "lastNameSearch")
+
     firstName = models.CharField(max_length=50, blank=False, null=False, help_text="First name")
     middleName = models.CharField(max_length=50, blank=True, null=False, help_text="Middle name")
     lastName = models.CharField(max_length=50, blank=False, null=False, help_text="Last name (Surname)")
+    firstNameSearch = models.CharField(max_length=100, blank=True, null=False, editable=False)
+    middleNameSearch = models.CharField(max_length=100, blank=True, null=False, editable=False)
+    lastNameSearch = models.CharField(max_length=100, blank=True, null=False, editable=False)
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["firstName", "middleName", "lastName"]
+        indexes = [
+            # Matches the ordering plus the id tiebreaker used by keyset pagination.
+            models.Index(fields=["firstName", "middleName", "lastName", "id"], name="staff_ordering_idx"),
+            models.Index(fields=["firstNameSearch"], name="staff_first_search_idx"),
+            models.Index(fields=["middleNameSearch"], name="staff_middle_search_idx"),
+            models.Index(fields=["lastNameSearch"], name="staff_last_search_idx"),
+            # Delta sync reads the rows changed since a time, see `roster.api`.
+            models.Index(fields=["updatedAt", "id"], name="staff_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         """Returns a string representation of staff."""
@@ -28,6 +60,21 @@ class Staff(models.Model):
             return f"{self.firstName} {self.middleName} {self.lastName}"
         return f"{self.firstName} {self.lastName}"
 
+    def setSearchNames(self) -> None:
+        """Fills the search fields from the name fields.
+        `save` calls this; call it yourself before `bulk_create` or `bulk_update`.
+        """
+        for nameField, searchField in zip(self.NAMEFIELDS, self.SEARCHFIELDS):
+            setattr(self, searchField, normalizeName(getattr(self, nameField)))
+
+    def save(self, *args, **kwargs):
+        """Saves the staff after refreshing its search fields."""
+        self.setSearchNames()
+        updateFields = kwargs.get("update_fields")
+        if updateFields is not None and set(updateFields) & set(self.NAMEFIELDS):
+            kwargs["update_fields"] = {*updateFields, *self.SEARCHFIELDS}
+        super().save(*args, **kwargs)
+
 
 class Roster(models.Model):
     """Represents a monthly roster.
@@ -47,6 +94,9 @@ class Roster(models.Model):
 
     class Meta:
         ordering = ["date"]
+        indexes = [
+            models.Index(fields=["updatedAt", "id"], name="roster_updated_idx"),
+        ]
 
 
 class StaffRosterAssignment(models.Model):
@@ -70,6 +120,17 @@ class StaffRosterAssignment(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Loads an assignment and remembers its active window as `loadedWindow`.
+        `roster.signals` compares it with the window on save to patch the
+        generated shifts of the days whose activity changed.
+        """
+        instance = super().from_db(db, field_names, values)
+        if {"active", "vacationDate", "resumptionDate"} <= set(field_names):
+            instance.loadedWindow = cls.activeWindow(instance.active, instance.vacationDate, instance.resumptionDate)
+        return instance
+
     def clean(self):
         """Model level validation for vacation and resumption dates."""
         # A staff cannot resume and go on vacation in the same month
@@ -78,16 +139,28 @@ class StaffRosterAssignment(models.Model):
             raise ValidationError("Only one of resumptionDate and vacationDate can be set.")
         super().clean()
 
+    @staticmethod
+    def activeWindow(active, vacationDate, resumptionDate):
+        """Returns the window of dates in which an assignment is active.
+        Parameters:
+        - active: The active field of the assignment.
+        - vacationDate: The vacationDate field of the assignment.
+        - resumptionDate: The resumptionDate field of the assignment.
+        Returns:
+        - tuple: (start, end) where the staff is active for start <= date < end.
+          Either bound is None when it is open. None if the staff is never active.
+        """
+        if not active:
+            return None
+        return (resumptionDate, vacationDate)
+
     def isActive(self, date):
         """Checks if a staff is active on a given day."""
-        if not self.active:
-            return False
-        elif self.vacationDate and self.vacationDate <= date:
-            return False
-        elif self.resumptionDate and self.resumptionDate > date:
+        window = self.activeWindow(self.active, self.vacationDate, self.resumptionDate)
+        if window is None:
             return False
-        else:
-            return True
+        start, end = window
+        return (start is None or start <= date) and (end is None or date < end)
 
 
 class Day(models.Model):
@@ -101,6 +174,11 @@ class Day(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["updatedAt", "id"], name="day_updated_idx"),
+        ]
+
     def __str__(self) -> str:
         """Returns a string representation of the day."""
         return self.date.strftime("%A %B %d %Y")  # EX: Sunday October 27 2024
@@ -130,6 +208,11 @@ class Shift(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["updatedAt", "id"], name="shift_updated_idx"),
+        ]
+
     def __str__(self) -> str:
         """Returns a string representation of a shift."""
         # The simplest approach is to return just the shift type.
@@ -138,3 +221,135 @@ class Shift(models.Model):
     def isMorningShift(self) -> bool:
         """Checks if the shift is a morning shift."""
         return True if self.shiftType == self.MORNINGSHIFT else False
+
+
+class StaffShiftCount(models.Model):
+    """The number of shifts of a type that a staff works in a roster.
+    The counts are kept up to date by `roster.counters`, so fairness reports
+    read one row per staff, roster and shift type instead of aggregating the
+    `Shift.staffs` through table.
+    Attributes:
+    - staff: A staff id.
+    - roster: A roster id.
+    - shiftType: The shift type.
+    - count: The number of shifts.
+    - createdAt: Time of creation.
+    - updatedAt: Time of last update.
+    """
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name="shiftCounts")
+    roster = models.ForeignKey(Roster, on_delete=models.CASCADE, related_name="shiftCounts")
+    shiftType = models.CharField(max_length=32, choices=Shift.SHIFTTYPES, help_text="Shift type")
+    count = models.PositiveIntegerField(default=0, help_text="Number of shifts")
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["roster", "staff", "shiftType"], name="staff_shift_count_unique"),
+        ]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the count."""
+        return f"{self.staff}: {self.count} {Shift.SHIFTTYPES[self.shiftType].lower()}s in {self.roster}"
+
+
+class Job(models.Model):
+    """A background job, run off the request path by `roster.jobs`.
+    Attributes:
+    - GENERATE, CLONE, EXPORT: The job kinds.
+    - QUEUED, RUNNING, DONE, FAILED: The job statuses.
+    - kind: What the job does.
+    - params: The JSON parameters of the job.
+    - status: Where the job is in its life.
+    - progress: Percent done.
+    - message: What the job is doing, or why it failed.
+    - result: A JSON summary of what the job did.
+    - output: The file the job made, if any, kept in the default storage.
+    - outputName: The file name of the output.
+    - outputType: The content type of the output.
+    - attempts: How many times the job was started.
+    - heartbeatAt: When the runner last showed it was still running the job.
+    - startedAt: When the job last started.
+    - finishedAt: When the job finished.
+    - createdAt: Time of creation.
+    - updatedAt: Time of last update.
+    """
+    GENERATE = "generate"
+    CLONE = "clone"
+    EXPORT = "export"
+    KINDS: dict[str, str] = {
+        GENERATE: "Generate roster",
+        CLONE: "Copy roster",
+        EXPORT: "Export roster",
+    }
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES: dict[str, str] = {
+        QUEUED: "Queued",
+        RUNNING: "Running",
+        DONE: "Done",
+        FAILED: "Failed",
+    }
+    kind = models.CharField(max_length=32, choices=KINDS, help_text="Job kind")
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED, help_text="Status")
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent done")
+    message = models.CharField(max_length=255, blank=True, help_text="Message")
+    result = models.JSONField(default=dict, blank=True)
+    output = models.FileField(upload_to="jobs/%Y/%m/", max_length=255, blank=True)
+    outputName = models.CharField(max_length=100, blank=True)
+    outputType = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    heartbeatAt = models.DateTimeField(null=True, blank=True)
+    startedAt = models.DateTimeField(null=True, blank=True)
+    finishedAt = models.DateTimeField(null=True, blank=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The runners claim the oldest queued job and look for stale running ones.
+            models.Index(fields=["status", "createdAt", "id"], name="job_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the job."""
+        return f"{self.KINDS[self.kind]} #{self.id}"
+
+    def isFinished(self) -> bool:
+        """Checks if the job is done or failed."""
+        return self.status in (self.DONE, self.FAILED)
+
+
+class DeletedRow(models.Model):
+    """A tombstone of a deleted staff, roster, day or shift.
+    The API lists these rows as the `deleted` resource, so pollers that sync
+    with `since` learn which rows to drop, see `roster.tombstones`.
+    Attributes:
+    - RESOURCES: A dictionary that maps an API resource to a human readable text.
+    - resource: The API resource of the deleted row.
+    - rowId: The id the deleted row had.
+    - createdAt: Time of creation.
+    - updatedAt: Time of last update, the time of the deletion.
+    """
+    RESOURCES: dict[str, str] = {
+        "staffs": "Staff",
+        "rosters": "Roster",
+        "days": "Day",
+        "shifts": "Shift",
+    }
+    resource = models.CharField(max_length=32, choices=RESOURCES, help_text="Resource")
+    rowId = models.PositiveBigIntegerField(help_text="Id of the deleted row")
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updatedAt", "id"], name="deleted_row_updated_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the tombstone."""
+        return f"Deleted {self.RESOURCES[self.resource].lower()} #{self.rowId}"
@@ -0,0 +1,105 @@
+"""Parallel local search optimizer for rosters.
+The group rotation of `roster.scheduler` is used as a starting point. Several
+independent simulated annealing restarts from `roster.annealing` then run in
+a `ProcessPoolExecutor`, each on a compact snapshot of the roster, and the
+best scoring schedule is kept.
+"""
+import datetime
+import math
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+from .activity import ActivityMatrix
+from .annealing import Problem, anneal
+from .generation import writeSchedules
+from .models import Day, Roster, Shift
+from .scheduler import Schedule, rotationSchedule
+
+
+def snapshot(matrix: ActivityMatrix, schedule: Schedule) -> Problem:
+    """Builds a compact problem from a matrix and a starting schedule.
+    Parameters:
+    - matrix: The activity matrix of the roster.
+    - schedule: The schedule to start searching from.
+    Returns:
+    - Problem: The snapshot the annealing workers search.
+    """
+    rowOf = {staffId: index for index, staffId in enumerate(matrix.staffIds)}
+    initial = [0] * len(matrix.staffIds)
+    for day, date in enumerate(matrix.dates):
+        for staffId in schedule.get((date, Shift.AFTERNOONSHIFT), ()):
+            initial[rowOf[staffId]] |= 1 << day
+    return Problem(len(matrix.dates), list(matrix.groups), list(matrix.rows), initial)
+
+
+def toSchedule(matrix: ActivityMatrix, afternoons: list[int]) -> dict[tuple[datetime.date, str], list[int]]:
+    """Converts afternoon bitsets back into a schedule.
+    Parameters:
+    - matrix: The activity matrix of the roster.
+    - afternoons: The afternoon bitset of each row of the matrix.
+    Returns:
+    - Schedule: The staff ids for each day and shift type.
+    """
+    schedule: dict[tuple[datetime.date, str], list[int]] = {}
+    for day, date in enumerate(matrix.dates):
+        for index in matrix.activeRows(day):
+            shiftType = Shift.AFTERNOONSHIFT if afternoons[index] >> day & 1 else Shift.MORNINGSHIFT
+            schedule.setdefault((date, shiftType), []).append(matrix.staffIds[index])
+    return schedule
+
+
+def optimizeMatrix(
+    matrix: ActivityMatrix,
+    timeBudget: float | None = 1.0,
+    workers: int | None = None,
+    restarts: int | None = None,
+    iterations: int | None = None,
+    seed: int = 0,
+) -> tuple[int, Schedule]:
+    """Searches for the best schedule of a roster.
+    Parameters:
+    - matrix: The activity matrix of the roster.
+    - timeBudget: Wall clock budget in seconds for all restarts, or None to only use `iterations`.
+    - workers: Number of worker processes. Defaults to the number of CPUs. 1 runs in process.
+    - restarts: Number of independent restarts. Defaults to `workers`.
+    - iterations: Optional number of moves per restart.
+    - seed: Seed of the first restart; restart `i` uses `seed + i`.
+    Returns:
+    - tuple: (score, schedule) of the best restart.
+    """
+    workers = workers or os.cpu_count() or 1
+    restarts = restarts or workers
+    problem = snapshot(matrix, rotationSchedule([matrix])[0])
+    # Restarts run in waves of `workers`, so each wave gets its share of the budget.
+    budget = None if timeBudget is None else timeBudget / math.ceil(restarts / workers)
+    seeds = [seed + restart for restart in range(restarts)]
+    if workers == 1:
+        results = [anneal(problem, restartSeed, budget, iterations) for restartSeed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(anneal, problem, restartSeed, budget, iterations) for restartSeed in seeds]
+            results = [future.result() for future in futures]
+    score, afternoons = min(results, key=lambda result: result[0])
+    return score, toSchedule(matrix, afternoons)
+
+
+def optimizeRosters(
+    rosters: Iterable[Roster],
+    timeBudget: float = 1.0,
+    workers: int | None = None,
+    batchSize: int | None = None,
+) -> list[Day]:
+    """Optimizes the schedules of several rosters and writes them in one transaction.
+    Parameters:
+    - rosters: The rosters to generate.
+    - timeBudget: Wall clock budget in seconds shared by all rosters.
+    - workers: Number of worker processes. Defaults to the number of CPUs.
+    - batchSize: Optional batch size for the `bulk_create` calls.
+    Returns:
+    - list: The created `Day` objects.
+    """
+    rosters = sorted(rosters, key=lambda roster: roster.date)
+    matrices = ActivityMatrix.forRosters(rosters)
+    schedules = [optimizeMatrix(matrix, timeBudget / max(len(rosters), 1), workers)[1] for matrix in matrices]
+    return writeSchedules(list(zip(rosters, schedules)), batchSize)
@@ -0,0 +1,128 @@
+"""Keyset (cursor) pagination for querysets.
+Offset pagination makes the database walk every skipped row. Keyset
+pagination instead remembers the ordering values of the last row of a page
+and asks for the rows that sort after it, which an index on the ordering
+fields answers with a range scan no matter how deep the page is.
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """A JSON encoder that keeps the microseconds of datetimes.
+    `DjangoJSONEncoder` cuts them to milliseconds, which would make a cursor
+    on a datetime skip or repeat rows.
+    """
+
+    def default(self, o):
+        """Encodes datetimes with their microseconds."""
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    """A page of rows.
+    Attributes:
+    - rows: The rows of the page.
+    - nextCursor: The cursor of the next page, or None on the last page.
+    """
+
+    def __init__(self, rows: list, nextCursor: str | None):
+        self.rows = rows
+        self.nextCursor = nextCursor
+
+
+def encodeCursor(values: Sequence) -> str:
+    """Encodes the ordering values of a row into an opaque url safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(values), cls=CursorJSONEncoder).encode()).decode()
+
+
+def decodeCursor(cursor: str) -> list:
+    """Decodes a cursor made by `encodeCursor`.
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as error:
+        raise ValueError("Malformed cursor.") from error
+    if not isinstance(values, list):
+        raise ValueError("Malformed cursor.")
+    return values
+
+
+def keysetFilter(ordering: Sequence[str], values: Sequence) -> Q:
+    """Builds a filter for the rows that sort after the given ordering values.
+    Parameters:
+    - ordering: The ordering fields; a `-` prefix means descending.
+    - values: The values of the ordering fields of the last seen row.
+    Returns:
+    - Q: (f1 > v1) | (f1 = v1 & f2 > v2) | ... with `<` for descending fields.
+    """
+    if len(values) != len(ordering):
+        raise ValueError("Cursor does not match the ordering.")
+    fields = [field.lstrip("-") for field in ordering]
+    after = Q()
+    for index, field in enumerate(fields):
+        lookup = "lt" if ordering[index].startswith("-") else "gt"
+        equal = {fields[position]: values[position] for position in range(index)}
+        after |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+    # Bounding the first field lets the database start with an index range scan.
+    firstLookup = "lte" if ordering[0].startswith("-") else "gte"
+    return Q(**{f"{fields[0]}__{firstLookup}": values[0]}) & after
+
+
+def keyOf(row, ordering: Sequence[str]) -> list:
+    """Returns the ordering values of a model instance or a `values()` dict."""
+    fields = [field.lstrip("-") for field in ordering]
+    if isinstance(row, dict):
+        return [row[field] for field in fields]
+    return [getattr(row, field) for field in fields]
+
+
+def pageQueryset(queryset: QuerySet, ordering: Sequence[str], cursor: str | None, pageSize: int) -> QuerySet:
+    """Returns the query for the page of a queryset that follows a cursor.
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keysetFilter(ordering, decodeCursor(cursor)))
+    # One extra row tells whether there is a next page without a COUNT query.
+    return queryset[: pageSize + 1]
+
+
+def pageOf(rows: list, ordering: Sequence[str], pageSize: int) -> KeysetPage:
+    """Makes a page of the rows fetched by `pageQueryset`."""
+    if len(rows) <= pageSize:
+        return KeysetPage(rows, None)
+    rows = rows[:pageSize]
+    return KeysetPage(rows, encodeCursor(keyOf(rows[-1], ordering)))
+
+
+def keysetPage(queryset: QuerySet, ordering: Sequence[str], cursor: str | None, pageSize: int) -> KeysetPage:
+    """Fetches the page of a queryset that follows a cursor.
+    Parameters:
+    - queryset: The rows to paginate.
+    - ordering: The ordering fields. The last one must be unique, like `id`.
+    - cursor: The cursor of the page, or None for the first page.
+    - pageSize: The number of rows in a page.
+    Returns:
+    - KeysetPage: The rows of the page and the cursor of the next page.
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    return pageOf(list(pageQueryset(queryset, ordering, cursor, pageSize)), ordering, pageSize)
+
+
+async def akeysetPage(queryset: QuerySet, ordering: Sequence[str], cursor: str | None, pageSize: int) -> KeysetPage:
+    """Asynchronous version of `keysetPage`."""
+    rows = [row async for row in pageQueryset(queryset, ordering, cursor, pageSize)]
+    return pageOf(rows, ordering, pageSize)
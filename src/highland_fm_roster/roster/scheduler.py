@@ -0,0 +1,85 @@
+"""Group rotation scheduler for rosters.
+Each day the active members of a group work the same shift. Groups rotate
+between the morning and afternoon shifts, and the groups whose members have
+worked the fewest mornings so far are put on the morning shift first, so
+morning and afternoon counts stay balanced even when staffs go on vacation or
+resume mid month. Balances carry over from one roster to the next, which makes
+scheduling a whole year as fair as scheduling a single month.
+
+The scheduler works on `ActivityMatrix` objects only and never touches the
+database; `roster.generation` loads the matrices and writes the schedules.
+"""
+import datetime
+from collections.abc import Iterable, Mapping, Sequence
+
+from .activity import ActivityMatrix
+from .models import Shift
+
+# Maps a (date, shiftType) pair to the ids of the staffs on that shift.
+Schedule = Mapping[tuple[datetime.date, str], Iterable[int]]
+
+
+def splitGroups(ranked: list[tuple[float, int, list[int]]]) -> tuple[list[int], list[int]]:
+    """Splits the active groups of a day between the morning and afternoon shifts.
+    Groups are taken in rank order and put on the morning shift until it holds
+    half of the active staffs. A group that would straddle the half way mark
+    goes to the shift its members have worked the least.
+    Parameters:
+    - ranked: (balance, rotation, staffIds) for each group, sorted.
+    Returns:
+    - tuple: The staff ids for the morning and the afternoon shift.
+    """
+    half = sum(len(staffIds) for _, _, staffIds in ranked) / 2
+    morning: list[int] = []
+    afternoon: list[int] = []
+    for balance, _, staffIds in ranked:
+        if len(morning) + len(staffIds) <= half:
+            morning.extend(staffIds)
+        elif len(morning) >= half:
+            afternoon.extend(staffIds)
+        elif balance <= 0:
+            morning.extend(staffIds)
+        else:
+            afternoon.extend(staffIds)
+    return morning, afternoon
+
+
+def rotationSchedule(matrices: Sequence[ActivityMatrix]) -> list[Schedule]:
+    """Schedules consecutive rosters by rotating groups between shifts.
+    Runs in O(staffs * days) plus a sort of the groups on each day.
+    Parameters:
+    - matrices: The activity matrices of the rosters in date order.
+    Returns:
+    - list: A schedule for each matrix mapping (date, shiftType) to staff ids.
+    """
+    # Mornings minus afternoons worked by each staff so far.
+    balances: dict[int, int] = {}
+    schedules = []
+    dayNumber = 0
+    for matrix in matrices:
+        members: dict[int, list[int]] = {}
+        for index, group in enumerate(matrix.groups):
+            members.setdefault(group, []).append(index)
+        groups = sorted(members)
+        schedule: dict[tuple[datetime.date, str], list[int]] = {}
+        for day, date in enumerate(matrix.dates):
+            ranked = []
+            for position, group in enumerate(groups):
+                staffIds = [matrix.staffIds[index] for index in members[group] if matrix.rows[index] >> day & 1]
+                if not staffIds:
+                    continue
+                balance = sum(balances.get(staffId, 0) for staffId in staffIds) / len(staffIds)
+                ranked.append((balance, (position + dayNumber) % len(groups), staffIds))
+            ranked.sort(key=lambda item: item[:2])
+            morning, afternoon = splitGroups(ranked)
+            for staffId in morning:
+                balances[staffId] = balances.get(staffId, 0) + 1
+            for staffId in afternoon:
+                balances[staffId] = balances.get(staffId, 0) - 1
+            if morning:
+                schedule[(date, Shift.MORNINGSHIFT)] = morning
+            if afternoon:
+                schedule[(date, Shift.AFTERNOONSHIFT)] = afternoon
+            dayNumber += 1
+        schedules.append(schedule)
+    return schedules
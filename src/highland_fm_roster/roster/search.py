@@ -0,0 +1,36 @@
+"""Prefix search over staff names.
+Every name part of a staff is stored normalized in an indexed search field
+(see `Staff.setSearchNames`). A prefix is matched with a `>= prefix AND <
+successor` range instead of `LIKE`, so each lookup is an index range scan.
+"""
+from django.db.models import Q
+
+from .models import Staff, normalizeName
+
+
+def searchTerms(query: str) -> list[str]:
+    """Splits a search query into normalized terms."""
+    return [term for term in (normalizeName(word) for word in query.split()) if term]
+
+
+def prefixRange(field: str, prefix: str) -> Q:
+    """Builds a filter for the values of a field that start with a prefix."""
+    successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": successor})
+
+
+def searchStaffs(terms: list[str], limit: int):
+    """Returns the staffs that have a name part starting with every term.
+    Parameters:
+    - terms: Normalized search terms, see `searchTerms`.
+    - limit: The most staffs to return.
+    Returns:
+    - QuerySet: The matching staffs in name order.
+    """
+    queryset = Staff.objects.all()
+    for term in terms:
+        anyPart = Q()
+        for field in Staff.SEARCHFIELDS:
+            anyPart |= prefixRange(field, term)
+        queryset = queryset.filter(anyPart)
+    return queryset.order_by("firstName", "middleName", "lastName", "id")[:limit]
@@ -0,0 +1,87 @@
+"""Deterministic synthetic data for development and benchmarks.
+The same arguments always produce the same staffs, assignments and shifts,
+so timings taken on two seeded databases can be compared.
+"""
+import datetime
+import random
+
+from .activity import monthDates
+from .caching import bumpStaffListVersion
+from .generation import SHIFTORDER, generateRosters
+from .models import Roster, Shift, Staff, StaffRosterAssignment
+
+SYLLABLES = ["a", "ba", "da", "di", "fa", "ha", "ja", "ka", "la", "ma", "mu", "na", "ra", "sa", "ta", "u", "ya", "zi"]
+
+
+def syntheticName(randomizer: random.Random) -> str:
+    """Returns a pronounceable made up name."""
+    return "".join(randomizer.choice(SYLLABLES) for _ in range(randomizer.randint(2, 4))).capitalize()
+
+
+def addMonths(date: datetime.date, months: int) -> datetime.date:
+    """Returns the first day of the month `months` after the month of a date."""
+    year, month = divmod(date.month - 1 + months, 12)
+    return datetime.date(year=date.year + year, month=month + 1, day=1)
+
+
+def seedDatabase(
+    numberOfStaffs: int,
+    numberOfRosters: int,
+    firstMonth: datetime.date,
+    seed: int = 0,
+    numberOfGroups: int = 4,
+    batchSize: int | None = 2000,
+) -> dict[str, int]:
+    """Bulk creates staffs, monthly rosters, assignments and generated shifts.
+    Parameters:
+    - numberOfStaffs: How many staffs to create.
+    - numberOfRosters: How many consecutive monthly rosters to create.
+    - firstMonth: A date in the month of the first roster.
+    - seed: Seed of the random number generator.
+    - numberOfGroups: How many groups the staffs are spread over.
+    - batchSize: Batch size for the `bulk_create` calls.
+    Returns:
+    - dict: The number of rows created for each model.
+    """
+    randomizer = random.Random(seed)
+    staffs = []
+    for _ in range(numberOfStaffs):
+        staff = Staff(
+            firstName=syntheticName(randomizer),
+            middleName=syntheticName(randomizer) if randomizer.random() < 0.4 else "",
+            lastName=syntheticName(randomizer),
+        )
+        staff.setSearchNames()
+        staffs.append(staff)
+    staffs = Staff.objects.bulk_create(staffs, batch_size=batchSize)
+    bumpStaffListVersion()
+    rosters = Roster.objects.bulk_create(
+        [Roster(date=addMonths(firstMonth, month)) for month in range(numberOfRosters)], batch_size=batchSize
+    )
+    groups = [randomizer.randint(1, numberOfGroups) for _ in staffs]
+    assignments = []
+    for roster in rosters:
+        dates = monthDates(roster)
+        for staff, group in zip(staffs, groups):
+            chance = randomizer.random()
+            assignments.append(
+                StaffRosterAssignment(
+                    staff=staff,
+                    roster=roster,
+                    group=group,
+                    active=chance >= 0.03,
+                    vacationDate=randomizer.choice(dates) if 0.03 <= chance < 0.13 else None,
+                    resumptionDate=randomizer.choice(dates) if 0.13 <= chance < 0.23 else None,
+                )
+            )
+    StaffRosterAssignment.objects.bulk_create(assignments, batch_size=batchSize)
+    days = generateRosters(rosters, batchSize=batchSize)
+    dateRange = (days[0].date, days[-1].date) if days else (firstMonth, firstMonth)
+    return {
+        "staffs": len(staffs),
+        "rosters": len(rosters),
+        "assignments": len(assignments),
+        "days": len(days),
+        "shifts": len(days) * len(SHIFTORDER),
+        "shiftStaffs": Shift.staffs.through.objects.filter(shift__day__date__range=dateRange).count(),
+    }
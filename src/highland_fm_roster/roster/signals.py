@@ -0,0 +1,119 @@
+"""Signal receivers of the roster app."""
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bumpFeedVersions, bumpStaffListVersion, invalidateFeeds
+from .counters import adjustShiftCounts
+from .database import applyPragmas
+from .generation import patchAssignment
+from .models import Day, Roster, Shift, Staff, StaffRosterAssignment
+from .timing import installQueryTimer
+from .tombstones import recordDeletion
+
+
+@receiver(post_save, sender=Staff)
+@receiver(post_delete, sender=Staff)
+def invalidateStaffList(sender, instance, using, **kwargs):
+    """Bumps the staff list version and the staff's feed version when a staff changes.
+    The versions are bumped again on commit, as a page rendered by another
+    request before the commit may have been cached under the first bump.
+    """
+    # A deleted instance has no pk by the time the transaction commits.
+    staffId = instance.pk
+
+    def bump():
+        bumpStaffListVersion()
+        bumpFeedVersions([staffId])
+
+    bump()
+    transaction.on_commit(bump, using=using)
+
+
+@receiver(post_save, sender=Day)
+@receiver(post_delete, sender=Day)
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def invalidateShiftFeeds(sender, using, **kwargs):
+    """Invalidates every feed when a day or shift changes."""
+    invalidateFeeds(using=using)
+
+
+@receiver(m2m_changed, sender=Shift.staffs.through)
+def invalidateShiftStaffFeeds(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Invalidates the feeds of staffs added to or removed from shifts.
+    Clearing a shift's staffs does not name them, so every feed is invalidated.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        invalidateFeeds([instance.pk], using)
+    else:
+        invalidateFeeds(pk_set, using)
+
+
+@receiver(m2m_changed, sender=Shift.staffs.through)
+def touchShifts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Sets the `updatedAt` of shifts whose staffs change, so API pollers see the change."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if action != "pre_clear" and not pk_set:
+        return
+    if not reverse:
+        shifts = Shift.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        shifts = Shift.objects.filter(staffs=instance)
+    else:
+        shifts = Shift.objects.filter(pk__in=pk_set)
+    shifts.update(updatedAt=timezone.now())
+
+
+@receiver(m2m_changed, sender=Shift.staffs.through)
+def countShiftStaffs(sender, instance, action, reverse, pk_set, **kwargs):
+    """Adjusts the shift counts when staffs are added to or removed from shifts.
+    Removals are counted before the rows go, from the rows that exist, as
+    `pk_set` may name staffs that were never on the shift.
+    """
+    if action not in ("post_add", "pre_remove", "pre_clear"):
+        return
+    links = sender.objects.filter(staff=instance) if reverse else sender.objects.filter(shift=instance)
+    if action != "pre_clear":
+        if not pk_set:
+            return
+        links = links.filter(shift__in=pk_set) if reverse else links.filter(staff__in=pk_set)
+    adjustShiftCounts(links, 1 if action == "post_add" else -1)
+
+
+@receiver(post_delete, sender=Staff)
+@receiver(post_delete, sender=Roster)
+@receiver(post_delete, sender=Day)
+@receiver(post_delete, sender=Shift)
+def recordDeletedRow(sender, instance, **kwargs):
+    """Leaves a tombstone of a deleted row for API pollers."""
+    recordDeletion(sender, instance.pk)
+
+
+@receiver(pre_delete, sender=Shift)
+def uncountShift(sender, instance, **kwargs):
+    """Removes the staffs of a deleted shift from the shift counts."""
+    adjustShiftCounts(Shift.staffs.through.objects.filter(shift=instance), -1)
+
+
+@receiver(post_save, sender=StaffRosterAssignment)
+def patchAssignmentShifts(sender, instance, created, raw, **kwargs):
+    """Patches the generated shifts when a saved assignment's active window changes."""
+    window = instance.activeWindow(instance.active, instance.vacationDate, instance.resumptionDate)
+    if not created and not raw and hasattr(instance, "loadedWindow") and window != instance.loadedWindow:
+        patchAssignment(instance, instance.loadedWindow)
+    instance.loadedWindow = window
+
+
+@receiver(connection_created)
+def tuneConnection(sender, connection, **kwargs):
+    """Applies the `SQLITE_PRAGMAS` setting to new SQLite connections and times their queries."""
+    applyPragmas(connection, getattr(settings, "SQLITE_PRAGMAS", None))
+    if getattr(settings, "SERVER_TIMING", False):
+        installQueryTimer(connection)
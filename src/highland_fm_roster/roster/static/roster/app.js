@@ -1,3 +1,9 @@
+// Show the form again when an edit conflicts with someone else's, and why a
+// job could not be queued.
+htmx.config.responseHandling.unshift({code: '409', swap: true});
+// Show the errors of an invalid form, such as a batch action without staffs.
+htmx.config.responseHandling.unshift({code: '422', swap: true});
+
 document.addEventListener('DOMContentLoaded', function() {
   console.log('DOM fully loaded and parsed');
   M.AutoInit();
@@ -5,7 +11,9 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('Event listener for htmx:load event.');
     console.log(evt.detail.elt);
     if (evt.detail.elt.classList.contains('modal')) {
-      M.Modal.init([evt.detail.elt]);
+      // Remove closed modals, so that a modal opened again for the same staff
+      // is the only element with its ids and its Done button submits its form.
+      M.Modal.init([evt.detail.elt], {onCloseEnd: function(modal) { modal.remove(); }});
       const instance = M.Modal.getInstance(evt.detail.elt);
       instance.open();
       console.log(`Modal <${evt.detail.elt.id}> opened`);
@@ -0,0 +1,69 @@
+"""A harness for view tests that pin query counts and render times.
+Subclass `QueryBudgetTestCase` and wrap each request in `assertBudget`. The
+class seeds staffs, rosters, assignments and generated shifts once, so a view
+that starts touching related rows one staff at a time fails its budget.
+"""
+import datetime
+import time
+from contextlib import contextmanager
+
+from django.test import TestCase
+
+from roster.caching import bumpFeedVersions, bumpStaffListVersion
+from roster.generation import generateRosters
+from roster.models import Roster, Staff, StaffRosterAssignment
+
+
+class QueryBudgetTestCase(TestCase):
+    """Base class for query budget tests.
+    Attributes:
+    - numberOfStaffs: How many staffs are seeded.
+    - numberOfRosters: How many consecutive monthly rosters are seeded.
+    - firstMonth: The date of the first roster.
+    - defaultSeconds: The render time bound when a test does not give one.
+    """
+
+    numberOfStaffs = 200
+    numberOfRosters = 2
+    firstMonth = datetime.date(year=2024, month=1, day=1)
+    defaultSeconds = 0.5
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seeds staffs assigned to generated rosters."""
+        staffs = [
+            Staff(firstName=f"Staff{index:04}", middleName="Budget" if index % 2 else "", lastName=f"Test{index % 9}")
+            for index in range(cls.numberOfStaffs)
+        ]
+        for staff in staffs:
+            staff.setSearchNames()
+        cls.staffs = Staff.objects.bulk_create(staffs)
+        cls.rosters = []
+        for month in range(cls.numberOfRosters):
+            year, monthIndex = divmod(cls.firstMonth.month - 1 + month, 12)
+            date = cls.firstMonth.replace(year=cls.firstMonth.year + year, month=monthIndex + 1)
+            cls.rosters.append(Roster.objects.create(date=date))
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(staff=staff, roster=roster, group=index % 4 + 1)
+                for roster in cls.rosters
+                for index, staff in enumerate(cls.staffs)
+            ]
+        )
+        generateRosters(cls.rosters)
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        # Test transactions roll back the staffs but not the cached list pages and feeds.
+        bumpStaffListVersion()
+        bumpFeedVersions()
+
+    @contextmanager
+    def assertBudget(self, queries: int, seconds: float | None = None):
+        """Asserts that the block runs exactly `queries` queries within `seconds`."""
+        seconds = self.defaultSeconds if seconds is None else seconds
+        start = time.perf_counter()
+        with self.assertNumQueries(queries):
+            yield
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, seconds, f"Took {elapsed:.3f}s, the budget is {seconds}s.")
@@ -0,0 +1,114 @@
+"""Unittest for the roster activity matrix."""
+
+import datetime
+import random
+
+from django.test import TestCase
+
+from roster.activity import ActivityMatrix, monthDates, windowBits
+from roster.models import Roster, Staff, StaffRosterAssignment
+
+
+class TestWindowBits(TestCase):
+    """Test cases for windowBits."""
+
+    first = datetime.date(year=2024, month=1, day=1)
+
+    def test_open_window(self):
+        """Test that an open window sets every bit."""
+        self.assertEqual(windowBits((None, None), self.first, 5), 0b11111)
+
+    def test_inactive(self):
+        """Test that an inactive assignment sets no bit."""
+        self.assertEqual(windowBits(None, self.first, 5), 0)
+
+    def test_bounds(self):
+        """Test that the window start is inclusive and its end exclusive."""
+        start = datetime.date(year=2024, month=1, day=2)
+        end = datetime.date(year=2024, month=1, day=4)
+        self.assertEqual(windowBits((start, None), self.first, 5), 0b11110)
+        self.assertEqual(windowBits((None, end), self.first, 5), 0b00111)
+        self.assertEqual(windowBits((start, end), self.first, 5), 0b00110)
+
+    def test_out_of_range(self):
+        """Test windows that start or end outside the days."""
+        before = datetime.date(year=2023, month=12, day=1)
+        after = datetime.date(year=2024, month=2, day=1)
+        self.assertEqual(windowBits((after, None), self.first, 5), 0)
+        self.assertEqual(windowBits((None, before), self.first, 5), 0)
+        self.assertEqual(windowBits((before, after), self.first, 5), 0b11111)
+
+
+class TestActivityMatrix(TestCase):
+    """Test cases for ActivityMatrix.
+    Attributes:
+    - testDate: Date to use throughout the test case.
+    """
+
+    testDate = datetime.date(year=2024, month=2, day=1)
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=self.testDate)
+        randomizer = random.Random(2024)
+        dates = monthDates(self.roster)
+        candidates = [None, dates[0] - datetime.timedelta(days=3), dates[-1] + datetime.timedelta(days=3), *dates]
+        staffs = Staff.objects.bulk_create(
+            [Staff(firstName=f"Staff{index}", lastName="Test") for index in range(60)]
+        )
+        assignments = []
+        for staff in staffs:
+            vacationDate = resumptionDate = None
+            # Only one of vacationDate and resumptionDate can be set.
+            if randomizer.random() < 0.5:
+                vacationDate = randomizer.choice(candidates)
+            else:
+                resumptionDate = randomizer.choice(candidates)
+            assignments.append(
+                StaffRosterAssignment(
+                    staff=staff,
+                    roster=self.roster,
+                    active=randomizer.random() < 0.8,
+                    vacationDate=vacationDate,
+                    resumptionDate=resumptionDate,
+                    group=randomizer.randint(1, 4),
+                )
+            )
+        StaffRosterAssignment.objects.bulk_create(assignments)
+
+    def test_single_query(self):
+        """Test that the matrix is loaded with one query."""
+        with self.assertNumQueries(1):
+            ActivityMatrix.forRoster(self.roster)
+
+    def test_matches_isActive(self):
+        """Test that the matrix agrees with StaffRosterAssignment.isActive on random data."""
+        matrix = ActivityMatrix.forRoster(self.roster)
+        dates = monthDates(self.roster)
+        for assignment in StaffRosterAssignment.objects.filter(roster=self.roster):
+            for date in dates:
+                self.assertEqual(
+                    matrix.isActive(assignment.staff_id, date),
+                    assignment.isActive(date),
+                    f"{assignment.staff_id} on {date}",
+                )
+            self.assertEqual(
+                matrix.activeDays(assignment.staff_id),
+                sum(assignment.isActive(date) for date in dates),
+            )
+
+    def test_activeStaffs(self):
+        """Test activeStaffs against StaffRosterAssignment.isActive."""
+        matrix = ActivityMatrix.forRoster(self.roster)
+        assignments = list(StaffRosterAssignment.objects.filter(roster=self.roster).order_by("id"))
+        for date in monthDates(self.roster):
+            expected = [assignment.staff_id for assignment in assignments if assignment.isActive(date)]
+            self.assertEqual(matrix.activeStaffs(date), expected)
+
+    def test_outside_month(self):
+        """Test dates outside the roster's month and unknown staffs."""
+        matrix = ActivityMatrix.forRoster(self.roster)
+        outside = datetime.date(year=2024, month=3, day=1)
+        self.assertEqual(matrix.activeStaffs(outside), [])
+        self.assertFalse(matrix.isActive(matrix.staffIds[0], outside))
+        self.assertFalse(matrix.isActive(-1, self.testDate))
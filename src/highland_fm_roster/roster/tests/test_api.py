@@ -0,0 +1,150 @@
+"""Unittest for the read only JSON API."""
+
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from roster.api import SINCEOVERLAP, parseSince
+from roster.generation import generateRoster
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment
+
+
+class TestParseSince(TestCase):
+    """Test cases for parsing the since parameter."""
+
+    def test_parseSince(self):
+        """Test that aware, naive, url decoded and malformed datetimes are handled."""
+        self.assertIsNone(parseSince(""))
+        aware = parseSince("2024-01-02T03:04:05.123456+01:00")
+        self.assertEqual(aware.utcoffset(), datetime.timedelta(hours=1))
+        self.assertEqual(aware.microsecond, 123456)
+        # A "+" that was not url encoded arrives as a space.
+        self.assertEqual(parseSince("2024-01-02T03:04:05 01:00"), aware.replace(microsecond=0))
+        self.assertTrue(timezone.is_aware(parseSince("2024-01-02T03:04:05")))
+        with self.assertRaises(ValueError):
+            parseSince("yesterday")
+
+
+class TestApiListView(TestCase):
+    """Test cases for ApiListView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Api") for index in range(5)])
+        self.roster = Roster.objects.create(date=datetime.date(year=2024, month=1, day=1))
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.roster, group=index % 2 + 1) for index, staff in enumerate(self.staffs)]
+        )
+        generateRoster(self.roster)
+        # Written a day ago, well before the overlap of any since in the tests.
+        self.written = timezone.now() - datetime.timedelta(days=1)
+        for model in (Staff, Roster, Day, Shift):
+            model.objects.update(updatedAt=self.written)
+
+    def get(self, resource: str, **params):
+        """Requests a resource and returns the decoded response."""
+        response = self.client.get(reverse("roster:apiList", args=[resource]), params)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return response.json()
+
+    def walk(self, resource: str, **params) -> list[dict]:
+        """Follows the cursors of a resource and returns every row."""
+        rows = []
+        cursor = None
+        while True:
+            page = self.get(resource, **params, **({"cursor": cursor} if cursor else {}))
+            rows += page["results"]
+            cursor = page["next"]
+            if cursor is None:
+                return rows
+
+    def test_resources(self):
+        """Test that every resource lists all of its rows with all fields by default."""
+        staffs = self.get("staffs")["results"]
+        self.assertEqual({row["id"] for row in staffs}, {staff.id for staff in self.staffs})
+        self.assertEqual(set(staffs[0]), {"id", "firstName", "middleName", "lastName", "createdAt", "updatedAt"})
+        self.assertEqual(self.get("rosters")["results"][0]["date"], "2024-01-01")
+        self.assertEqual(len(self.walk("days", limit=10)), 31)
+        shift = self.get("shifts", limit=1)["results"][0]
+        expected = Shift.objects.select_related("day").get(id=shift["id"])
+        self.assertEqual(shift["date"], expected.day.date.isoformat())
+        self.assertEqual(shift["day"], expected.day_id)
+        self.assertEqual(shift["shiftType"], expected.shiftType)
+        self.assertEqual(shift["staffs"], sorted(expected.staffs.values_list("id", flat=True)))
+
+    def test_cursor_pagination(self):
+        """Test that following the cursors returns every row once, in updatedAt order."""
+        rows = self.walk("shifts", limit=7)
+        self.assertEqual(len(rows), 62)
+        self.assertEqual(len({row["id"] for row in rows}), 62)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (row["updatedAt"], row["id"])))
+
+    def test_sparse_fields(self):
+        """Test that only the asked fields are sent, with the ordering fields."""
+        rows = self.get("shifts", fields="date,shiftType")["results"]
+        self.assertEqual(set(rows[0]), {"id", "updatedAt", "date", "shiftType"})
+        self.assertEqual(self.get("shifts", fields="x,date")["error"], "Unknown fields: x.")
+
+    def test_since(self):
+        """Test that since returns only the rows changed since it, including staff changes."""
+        since = (self.written + 2 * SINCEOVERLAP).isoformat()
+        self.assertEqual(self.get("shifts", since=since)["results"], [])
+        shift = Shift.objects.exclude(staffs=self.staffs[0]).first()
+        shift.staffs.add(self.staffs[0])
+        changed = self.get("shifts", since=since)["results"]
+        self.assertEqual([row["id"] for row in changed], [shift.id])
+        self.assertIn(self.staffs[0].id, changed[0]["staffs"])
+        self.staffs[1].firstName = "Renamed"
+        self.staffs[1].save()
+        changed = self.get("staffs", since=since, fields="firstName")["results"]
+        self.assertEqual(changed, [{"id": self.staffs[1].id, "updatedAt": changed[0]["updatedAt"], "firstName": "Renamed"}])
+
+    def test_since_overlap(self):
+        """Test that since also returns rows at it and rows committed late within the overlap before it."""
+        self.assertEqual(len(self.walk("days", since=self.written.isoformat(), limit=100)), 31)
+        days = list(Day.objects.order_by("id")[:2])
+        # A transaction that took a little less and one that took more than the overlap to commit.
+        since = timezone.now()
+        Day.objects.filter(id=days[0].id).update(updatedAt=since - SINCEOVERLAP / 2)
+        Day.objects.filter(id=days[1].id).update(updatedAt=since - SINCEOVERLAP * 2)
+        self.assertEqual([row["id"] for row in self.get("days", since=since.isoformat())["results"]], [days[0].id])
+
+    def test_reverse_staff_changes_touch_shifts(self):
+        """Test that removing and clearing a staff's shifts from the staff side touches the shifts."""
+        since = timezone.now()
+        shifts = list(self.staffs[0].shifts.all())
+        self.staffs[0].shifts.remove(shifts[0])
+        self.assertEqual([row["id"] for row in self.get("shifts", since=since.isoformat())["results"]], [shifts[0].id])
+        self.staffs[0].shifts.clear()
+        changed = {row["id"] for row in self.walk("shifts", since=since.isoformat())}
+        self.assertEqual(changed, {shift.id for shift in shifts})
+
+    def test_deleted(self):
+        """Test that deleted staffs and regenerated days and shifts are listed as tombstones."""
+        since = timezone.now().isoformat()
+        days = set(Day.objects.values_list("id", flat=True))
+        shifts = set(Shift.objects.values_list("id", flat=True))
+        staffId = self.staffs[0].id
+        self.staffs[0].delete()
+        generateRoster(self.roster)
+        rows = self.walk("deleted", since=since, limit=50)
+        deleted = {resource: {row["rowId"] for row in rows if row["resource"] == resource} for resource in ("staffs", "days", "shifts")}
+        self.assertEqual(deleted, {"staffs": {staffId}, "days": days, "shifts": shifts})
+        self.assertEqual(set(rows[0]), {"id", "resource", "rowId", "createdAt", "updatedAt"})
+
+    def test_errors(self):
+        """Test that unknown resources and bad parameters are reported as JSON."""
+        response = self.client.get(reverse("roster:apiList", args=["assignments"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("error", response.json())
+        for params in ({"since": "yesterday"}, {"limit": "many"}, {"cursor": "not a cursor"}):
+            response = self.client.get(reverse("roster:apiList", args=["days"]), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+
+    def test_limit_is_bounded(self):
+        """Test that the page size is kept between 1 and the maximum."""
+        self.assertEqual(len(self.get("days", limit=0)["results"]), 1)
+        self.assertEqual(len(self.get("days", limit=100000)["results"]), Day.objects.count())
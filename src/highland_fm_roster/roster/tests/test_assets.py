@@ -0,0 +1,164 @@
+"""Unittest for the self hosted, fingerprinted and precompressed static files."""
+
+import gzip
+import re
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from roster.assets import IMMUTABLE, VENDORASSETS, StaticAssetsMiddleware, acceptedEncodings, checkVendorAssets
+
+# A scheme or protocol relative url in an attribute, a CSS url() or an @import.
+EXTERNALORIGIN = re.compile(r"""(?:https?:)?//[\w.-]+\.[a-z]{2,}|(?:src|href|action)\s*=\s*["']?//""", re.I)
+
+
+class TestNoExternalOrigins(TestCase):
+    """Test that pages load no assets from other origins."""
+
+    def test_templates(self):
+        """Test that no template references an external origin."""
+        directories = [Path(apps.get_app_config("roster").path) / "templates"]
+        for engine in settings.TEMPLATES:
+            directories.extend(Path(directory) for directory in engine["DIRS"])
+        templates = [path for directory in directories for path in directory.rglob("*.html")]
+        self.assertTrue(templates)
+        for path in templates:
+            for number, line in enumerate(path.read_text().splitlines(), 1):
+                self.assertIsNone(EXTERNALORIGIN.search(line), f"{path.name}:{number}: {line.strip()}")
+
+    def test_rendered_pages(self):
+        """Test that the rendered pages, whatever their tags output, reference no external origin."""
+        for url in [
+            reverse("roster:home"),
+            reverse("roster:staffsList"),
+            reverse("roster:newStaff"),
+            reverse("roster:rosterMonth", args=[2024, 2]),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            for number, line in enumerate(response.content.decode().splitlines(), 1):
+                self.assertIsNone(EXTERNALORIGIN.search(line), f"{url}:{number}: {line.strip()}")
+
+
+class TestCompressedManifestStorage(SimpleTestCase):
+    """Test cases for collectstatic with the fingerprinting storage."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source = Path(directory.name) / "source"
+        self.root = Path(directory.name) / "root"
+        (self.source / "fonts").mkdir(parents=True)
+        (self.source / "fonts" / "icons.woff2").write_bytes(b"\x00" * 512)
+        (self.source / "app.css").write_text('@font-face { src: url("fonts/icons.woff2"); }\n' * 50)
+        (self.source / "tiny.js").write_text("1")
+
+    def collect(self):
+        """Runs collectstatic on the source directory."""
+        storages = {**settings.STORAGES, "staticfiles": {"BACKEND": "roster.assets.CompressedManifestStaticFilesStorage"}}
+        with override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STORAGES=storages,
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            return staticfiles_storage.stored_name("app.css"), staticfiles_storage.stored_name("fonts/icons.woff2")
+
+    def test_fingerprints_and_copies(self):
+        """Test that text files get hashed names and gzip copies, and urls are rewritten."""
+        css, font = self.collect()
+        self.assertRegex(css, r"^app\.[0-9a-f]{12}\.css$")
+        content = (self.root / css).read_bytes()
+        self.assertIn(Path(font).name.encode(), content)
+        self.assertEqual(gzip.decompress((self.root / f"{css}.gz").read_bytes()), content)
+        self.assertFalse((self.root / f"{font}.gz").exists())
+        # A copy that would not be smaller is not written.
+        self.assertFalse(list(self.root.glob("tiny.*.js.gz")))
+
+
+class TestVendorAssets(SimpleTestCase):
+    """Test cases for the check of the vendored assets."""
+
+    def test_missing(self):
+        """Test that every asset missing from the vendor directory is a deploy error."""
+        with tempfile.TemporaryDirectory() as directory, mock.patch("roster.assets.VENDORDIR", Path(directory)):
+            (Path(directory) / "htmx.min.js").write_text("htmx")
+            errors = checkVendorAssets(None)
+            self.assertEqual({error.id for error in errors}, {"roster.E001"})
+            self.assertEqual(len(errors), len(VENDORASSETS) - 1)
+            self.assertNotIn("htmx.min.js", "".join(error.msg for error in errors))
+            for name in VENDORASSETS:
+                (Path(directory) / name).write_bytes(b"asset")
+            self.assertEqual(checkVendorAssets(None), [])
+
+
+class TestCollectStatic(TestCase):
+    """Test collectstatic and page rendering with the app's own static files."""
+
+    def test_manifest(self):
+        """Test that the app's static files collect with the fingerprinting storage and pages render with them."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        storages = {**settings.STORAGES, "staticfiles": {"BACKEND": "roster.assets.CompressedManifestStaticFilesStorage"}}
+        with override_settings(STATIC_ROOT=Path(directory.name), STORAGES=storages, DEBUG=False):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            response = self.client.get(reverse("roster:home"))
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, staticfiles_storage.url("roster/icons.css"))
+            self.assertRegex(staticfiles_storage.stored_name("roster/app.js"), r"^roster/app\.[0-9a-f]{12}\.js$")
+
+
+class TestStaticAssetsMiddleware(SimpleTestCase):
+    """Test cases for serving collected static files."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.hashed = "app.0123456789ab.js"
+        (self.root / self.hashed).write_text("plain")
+        (self.root / f"{self.hashed}.gz").write_bytes(b"gzipped")
+        (self.root / "robots.txt").write_text("User-agent: *")
+        with override_settings(STATIC_ROOT=self.root, STATIC_URL="static/"):
+            self.middleware = StaticAssetsMiddleware(lambda request: HttpResponse("view"))
+        self.factory = RequestFactory()
+
+    def test_fingerprinted(self):
+        """Test the immutable, precompressed response of a fingerprinted file."""
+        response = self.middleware(self.factory.get(f"/static/{self.hashed}", headers={"Accept-Encoding": "gzip, br"}))
+        self.assertEqual(response.content, b"gzipped")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        response = self.middleware(self.factory.get(f"/static/{self.hashed}"))
+        self.assertEqual(response.content, b"plain")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_unfingerprinted(self):
+        """Test that files without a hash are revalidated."""
+        response = self.middleware(self.factory.get("/static/robots.txt"))
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        response = self.middleware(self.factory.get("/static/robots.txt", headers={"If-Modified-Since": response["Last-Modified"]}))
+        self.assertEqual(response.status_code, 304)
+
+    def test_passes_on(self):
+        """Test that other paths, missing files and escapes reach the view."""
+        for path in ["/staffs/", "/static/missing.js", "/static/../secret.txt"]:
+            self.assertEqual(self.middleware(self.factory.get(path)).content, b"view", path)
+
+    def test_accepted_encodings(self):
+        """Test parsing Accept-Encoding."""
+        request = self.factory.get("/", headers={"Accept-Encoding": "br;q=0, gzip;q=0.5, deflate"})
+        self.assertEqual(acceptedEncodings(request), {"gzip", "deflate"})
@@ -0,0 +1,72 @@
+"""Unittest for the async read views."""
+
+import datetime
+
+from asgiref.sync import iscoroutinefunction
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from roster import views
+from roster.models import Roster, Staff
+
+
+class TestAsyncViews(TestCase):
+    """Test cases for the async views under the async test client."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+        Roster.objects.create(date=datetime.date(year=2024, month=2, day=1))
+
+    def test_views_are_async(self):
+        """Test that the read views are coroutine functions."""
+        for view in [views.StaffListView, views.StaffActionsView, views.StaffSearchView, views.RosterMonthView]:
+            self.assertTrue(iscoroutinefunction(view.as_view()), view.__name__)
+
+    async def test_staff_list(self):
+        """Test the staff list and its 304 under ASGI."""
+        response = await self.async_client.get(reverse("roster:staffsList"))
+        self.assertContains(response, "John Doe")
+        response = await self.async_client.get(reverse("roster:staffsList"), headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_staff_actions(self):
+        """Test reading, editing and deleting a staff under ASGI."""
+        url = reverse("roster:staffActions", args=[self.staff.id])
+        self.assertContains(await self.async_client.get(url), "Edit Staff")
+        response = await self.async_client.put(
+            url, urlencode({"firstName": "Jane", "lastName": "Doe", "updatedAt": self.staff.updatedAt.isoformat()})
+        )
+        self.assertContains(response, "Jane Doe")
+        self.assertEqual((await Staff.objects.aget(id=self.staff.id)).firstNameSearch, "jane")
+        await self.async_client.delete(url)
+        self.assertFalse(await Staff.objects.filter(id=self.staff.id).aexists())
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+
+    async def test_search_and_calendar(self):
+        """Test the search and the calendar under ASGI."""
+        self.assertContains(await self.async_client.get(reverse("roster:searchStaffs"), {"q": "jo"}), "John Doe")
+        response = await self.async_client.get(reverse("roster:rosterMonth", args=[2024, 2]))
+        self.assertContains(response, "February 2024")
+
+    async def test_staff_feed(self):
+        """Test the calendar feed of a staff and its cached copy under ASGI."""
+        url = reverse("roster:staffCalendar", args=[self.staff.id])
+        response = await self.async_client.get(url)
+        self.assertContains(response, "BEGIN:VCALENDAR")
+        response = await self.async_client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "roster_test_cache"}}
+)
+class TestAsyncViewsDatabaseCache(TestAsyncViews):
+    """The async view test cases with the database cache, which cannot be used from the event loop."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates the cache table."""
+        call_command("createcachetable", verbosity=0)
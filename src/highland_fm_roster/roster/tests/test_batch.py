@@ -0,0 +1,94 @@
+"""Unittest for the batch staff actions."""
+
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from roster.batch import deleteStaffs, editStaffs
+from roster.caching import staffListVersion
+from roster.forms import StaffBatchForm
+from roster.models import Staff
+
+
+def swappedErrorCodes() -> list[str]:
+    """Returns the error status codes whose responses `app.js` has htmx swap in."""
+    script = (Path(apps.get_app_config("roster").path) / "static" / "roster" / "app.js").read_text()
+    return re.findall(r"responseHandling\.unshift\(\{code: '(\d+)', swap: true\}\)", script)
+
+
+class TestBatchActions(TestCase):
+    """Test cases for deleteStaffs and editStaffs."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staffs = [Staff.objects.create(firstName=f"Staff{index}", lastName="Batch") for index in range(5)]
+        self.ids = [staff.id for staff in self.staffs[:3]]
+
+    def test_delete(self):
+        """Test that the ticked staffs are deleted and the others kept."""
+        self.assertEqual(deleteStaffs(self.ids + [0]), 3)
+        self.assertEqual(Staff.objects.count(), 2)
+
+    def test_edit(self):
+        """Test that names, search names and updatedAt are set."""
+        version = staffListVersion()
+        staffs = editStaffs(self.ids, {"lastName": "Ọlá-Dèjì"})
+        self.assertEqual([staff.id for staff in staffs], self.ids)
+        for staff in staffs:
+            self.assertEqual(staff.lastName, "Ọlá-Dèjì")
+            self.assertEqual(staff.lastNameSearch, "oladeji")
+            self.assertGreater(staff.updatedAt, self.staffs[0].updatedAt)
+        self.assertEqual(Staff.objects.get(id=self.staffs[3].id).lastName, "Batch")
+        self.assertNotEqual(staffListVersion(), version)
+
+    def test_form(self):
+        """Test the batch form validation."""
+        form = StaffBatchForm({"ids": ["1", "2"], "action": "edit", "middleName": "Ade"})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["ids"], {1, 2})
+        self.assertEqual(form.names(), {"middleName": "Ade"})
+        self.assertFalse(StaffBatchForm({"ids": ["1"], "action": "edit"}).is_valid())
+        self.assertFalse(StaffBatchForm({"ids": ["x"], "action": "delete"}).is_valid())
+        self.assertFalse(StaffBatchForm({"action": "delete"}).is_valid())
+
+
+class TestStaffBatchView(TestCase):
+    """Test cases for the batch endpoint and its out of band swaps."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        cache.clear()
+        self.staffs = [Staff.objects.create(firstName=f"Staff{index}", lastName="Batch") for index in range(4)]
+        self.url = reverse("roster:batchStaffs")
+
+    def test_delete(self):
+        """Test that every deleted staff is removed out of band."""
+        ids = [staff.id for staff in self.staffs[:2]]
+        response = self.client.post(self.url, {"ids": ids, "action": "delete"})
+        self.assertContains(response, "2 staffs deleted.")
+        for id in ids:
+            self.assertContains(response, f'<li id="staff-{id}" hx-swap-oob="delete"></li>', html=True)
+        self.assertEqual(Staff.objects.count(), 2)
+
+    def test_edit(self):
+        """Test that every edited staff is replaced out of band."""
+        ids = [staff.id for staff in self.staffs[:3]]
+        # Cache the list items first, the swaps must not reuse them.
+        self.client.get(reverse("roster:staffsList"))
+        response = self.client.post(self.url, {"ids": ids, "action": "edit", "firstName": "Jane"})
+        self.assertContains(response, "3 staffs updated.")
+        self.assertContains(response, 'hx-swap-oob="true"', count=6)
+        # Each item names its staff in the checkbox label, the text and the delete prompt.
+        self.assertContains(response, "Jane Batch", count=3 * 3)
+        self.assertContains(self.client.get(reverse("roster:staffsList")), "Jane Batch", count=3 * 3)
+
+    def test_invalid(self):
+        """Test that an empty selection is refused with errors that htmx swaps into the status."""
+        response = self.client.post(self.url, {"action": "delete"}, headers={"HX-Request": "true"})
+        self.assertContains(response, "Select at least one staff.", status_code=422)
+        self.assertFalse(response.has_header("HX-Reswap"))
+        self.assertIn(str(response.status_code), swappedErrorCodes())
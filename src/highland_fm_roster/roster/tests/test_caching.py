@@ -0,0 +1,57 @@
+"""Unittest for the cached staff list fragments."""
+
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from roster.caching import bumpStaffListVersion, staffListVersion
+from roster.models import Staff
+
+
+class TestStaffListCache(TestCase):
+    """Test cases for the staff list fragment cache and its invalidation."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+
+    def test_signals_bump_version(self):
+        """Test that saving and deleting a staff bump the list version."""
+        version = staffListVersion()
+        self.staff.save()
+        self.assertGreater(staffListVersion(), version)
+        version = staffListVersion()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.staff.delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(staffListVersion(), version + 2)
+
+    def test_version_survives_eviction(self):
+        """Test that a version is created when the cache has none."""
+        bumpStaffListVersion()
+        self.assertIsInstance(staffListVersion(), int)
+
+    def test_item_fragment_is_reused(self):
+        """Test that an item renders from the cache until updatedAt changes."""
+        first = render_to_string("roster/staff_list_item.html", {"staff": self.staff})
+        self.staff.firstName = "Jane"
+        self.assertEqual(render_to_string("roster/staff_list_item.html", {"staff": self.staff}), first)
+        self.staff.save()
+        self.assertIn("Jane Doe", render_to_string("roster/staff_list_item.html", {"staff": self.staff}))
+
+    def test_list_after_edit_and_delete(self):
+        """Test that the list shows edits and deletions made through the views."""
+        other = Staff.objects.create(firstName="Musa", lastName="Bello")
+        self.assertContains(self.client.get(reverse("roster:staffsList")), "John Doe")
+        response = self.client.put(
+            reverse("roster:staffActions", args=[self.staff.id]),
+            urlencode({"firstName": "Jane", "middleName": "", "lastName": "Doe", "updatedAt": self.staff.updatedAt.isoformat()}),
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertContains(response, "Jane Doe")
+        listed = self.client.get(reverse("roster:staffsList"))
+        self.assertContains(listed, "Jane Doe")
+        self.assertNotContains(listed, "John Doe")
+        self.client.delete(reverse("roster:staffActions", args=[other.id]))
+        self.assertNotContains(self.client.get(reverse("roster:staffsList")), "Musa Bello")
@@ -0,0 +1,107 @@
+"""Unittest for the roster month calendar."""
+
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+
+from roster.calendars import monthWeeks
+from roster.generation import generateRoster
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment
+
+
+class TestRosterMonthView(TestCase):
+    """Test cases for RosterMonthView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=datetime.date(year=2024, month=2, day=1))
+        self.url = reverse("roster:rosterMonth", args=[2024, 2])
+
+    def addStaffs(self, count: int):
+        """Assigns new staffs to the roster and regenerates it."""
+        start = Staff.objects.count()
+        staffs = Staff.objects.bulk_create(
+            [Staff(firstName=f"Staff{start + index}", lastName="Test") for index in range(count)]
+        )
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.roster, group=index % 2 + 1) for index, staff in enumerate(staffs)]
+        )
+        generateRoster(self.roster)
+
+    def test_month_weeks(self):
+        """Test that weeks start on Monday and blank out other months."""
+        day = Day(date=datetime.date(2024, 2, 1))
+        weeks = monthWeeks(2024, 2, [day])
+        self.assertEqual(len(weeks), 5)
+        self.assertEqual(weeks[0][:3], [None, None, None])
+        self.assertIs(weeks[0][3], day)
+        self.assertEqual(weeks[-1][3], datetime.date(2024, 2, 29))
+        self.assertIsNone(weeks[-1][4])
+
+    def test_renders_shifts(self):
+        """Test that the calendar lists every day's shifts and staffs."""
+        self.addStaffs(4)
+        response = self.client.get(self.url)
+        self.assertContains(response, "February 2024")
+        self.assertContains(response, "Morning shift", count=29)
+        self.assertContains(response, "Staff0 Test")
+        self.assertTemplateUsed(response, "_base.html")
+
+    def test_constant_queries(self):
+        """Test that the query count does not grow with the number of staffs."""
+        self.addStaffs(3)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        self.addStaffs(30)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Staff32 Test")
+
+    def test_empty_month(self):
+        """Test a month with no generated shifts."""
+        response = self.client.get(reverse("roster:rosterMonth", args=[2023, 12]))
+        self.assertContains(response, "No shifts have been generated")
+        self.assertContains(response, reverse("roster:rosterMonth", args=[2024, 1]))
+
+    def test_invalid_month(self):
+        """Test that months out of range are not found."""
+        self.assertEqual(self.client.get(reverse("roster:rosterMonth", args=[2024, 13])).status_code, 404)
+
+    def test_htmx_month_switch(self):
+        """Test that htmx gets the calendar alone."""
+        self.addStaffs(2)
+        response = self.client.get(self.url, HTTP_HX_REQUEST="true")
+        self.assertTemplateUsed(response, "roster/roster_month_calendar.html")
+        self.assertTemplateNotUsed(response, "roster/roster_month.html")
+        self.assertNotContains(response, "<title>")
+        restore = self.client.get(self.url, HTTP_HX_REQUEST="true", HTTP_HX_HISTORY_RESTORE_REQUEST="true")
+        self.assertTemplateUsed(restore, "_base.html")
+
+    def test_staffing_changes(self):
+        """Test that changing the staffs of shifts changes the ETag of the month."""
+        self.addStaffs(4)
+        etag = self.client.get(self.url)["ETag"]
+        shift = Shift.objects.filter(day__date__month=2).exclude(staffs=None).first()
+        shift.staffs.remove(shift.staffs.first())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        assignment = StaffRosterAssignment.objects.filter(roster=self.roster).first()
+        assignment.vacationDate = datetime.date(year=2024, month=2, day=10)
+        assignment.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_not_modified(self):
+        """Test that an unchanged month costs one query and regenerating it changes the ETag."""
+        self.addStaffs(2)
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        generateRoster(self.roster)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.client.get(self.url)["ETag"]
+        staff = Staff.objects.first()
+        staff.lastName = "Renamed"
+        staff.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
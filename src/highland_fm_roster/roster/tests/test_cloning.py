@@ -0,0 +1,203 @@
+"""Unittest for cloning rosters into other months."""
+
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from roster.cloning import cloneRoster, shiftMonths
+from roster.counters import rebuildShiftCounts
+from roster.generation import generateRoster
+from roster.jobs import runPendingJobs
+from roster.models import Day, Job, Roster, Shift, Staff, StaffRosterAssignment, StaffShiftCount
+
+
+def monthShifts(year: int, month: int) -> dict[tuple[int, str], set[int]]:
+    """Returns {(day of the month, shift type): staff ids} of a month."""
+    shifts: dict[tuple[int, str], set[int]] = {}
+    rows = Shift.staffs.through.objects.filter(shift__day__date__year=year, shift__day__date__month=month)
+    for date, shiftType, staffId in rows.values_list("shift__day__date", "shift__shiftType", "staff_id"):
+        shifts.setdefault((date.day, shiftType), set()).add(staffId)
+    return shifts
+
+
+class TestShiftMonths(TestCase):
+    """Test cases for moving dates by months."""
+
+    def test_shiftMonths(self):
+        """Test that days are kept, clamped to the month's length and None passes through."""
+        self.assertEqual(shiftMonths(datetime.date(2024, 1, 15), 1), datetime.date(2024, 2, 15))
+        self.assertEqual(shiftMonths(datetime.date(2024, 1, 31), 1), datetime.date(2024, 2, 29))
+        self.assertEqual(shiftMonths(datetime.date(2024, 11, 30), 3), datetime.date(2025, 2, 28))
+        self.assertEqual(shiftMonths(datetime.date(2024, 1, 10), -1), datetime.date(2023, 12, 10))
+        self.assertIsNone(shiftMonths(None, 1))
+
+
+class TestCloneRoster(TestCase):
+    """Test cases for cloneRoster."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Clone") for index in range(6)])
+        self.source = Roster.objects.create(date=datetime.date(year=2024, month=1, day=1))
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(staff=staff, roster=self.source, group=index % 3 + 1)
+                for index, staff in enumerate(self.staffs)
+            ]
+        )
+        StaffRosterAssignment.objects.filter(staff=self.staffs[0]).update(
+            vacationDate=datetime.date(2024, 1, 10), resumptionDate=datetime.date(2024, 1, 31)
+        )
+        generateRoster(self.source)
+
+    def test_copies_shifts(self):
+        """Test that every shift and shift staff lands on the same day of the target month."""
+        roster = cloneRoster(self.source, datetime.date(year=2024, month=3, day=20))
+        self.assertEqual(roster.date, datetime.date(year=2024, month=3, day=1))
+        self.assertEqual(monthShifts(2024, 3), monthShifts(2024, 1))
+        self.assertEqual(Day.objects.filter(date__year=2024, date__month=3).count(), 31)
+        self.assertEqual(Shift.objects.filter(day__date__year=2024, day__date__month=3).count(), 62)
+
+    def test_shorter_month(self):
+        """Test that days the target month does not have are dropped."""
+        cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        expected = {key: staffIds for key, staffIds in monthShifts(2024, 1).items() if key[0] <= 29}
+        self.assertEqual(monthShifts(2024, 2), expected)
+        self.assertEqual(Day.objects.filter(date__year=2024, date__month=2).count(), 29)
+
+    def test_longer_month(self):
+        """Test that days the source month does not have stay empty."""
+        february = cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        cloneRoster(february, datetime.date(year=2024, month=5, day=1))
+        self.assertEqual(monthShifts(2024, 5), monthShifts(2024, 2))
+        self.assertFalse(Day.objects.filter(date__gt=datetime.date(2024, 5, 29)).exists())
+
+    def test_assignments(self):
+        """Test that assignments are copied with their dates moved into the target month."""
+        roster = cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        copied = {
+            assignment.staff_id: assignment for assignment in StaffRosterAssignment.objects.filter(roster=roster)
+        }
+        self.assertEqual(set(copied), {staff.id for staff in self.staffs})
+        self.assertEqual(copied[self.staffs[0].id].vacationDate, datetime.date(2024, 2, 10))
+        self.assertEqual(copied[self.staffs[0].id].resumptionDate, datetime.date(2024, 2, 29))
+        self.assertEqual(copied[self.staffs[1].id].group, 2)
+        self.assertEqual(StaffRosterAssignment.objects.filter(roster=self.source).count(), len(self.staffs))
+
+    def test_shift_counts(self):
+        """Test that the new roster's shift counts match its copied shifts."""
+        roster = cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        counts = set(StaffShiftCount.objects.filter(roster=roster).values_list("staff_id", "shiftType", "count"))
+        self.assertTrue(counts)
+        rebuildShiftCounts([roster])
+        self.assertEqual(
+            set(StaffShiftCount.objects.filter(roster=roster).values_list("staff_id", "shiftType", "count")), counts
+        )
+
+    def test_replaces_target_days(self):
+        """Test that days already in the target month are replaced."""
+        Day.objects.create(date=datetime.date(year=2024, month=3, day=5))
+        cloneRoster(self.source, datetime.date(year=2024, month=3, day=1))
+        self.assertEqual(Day.objects.filter(date=datetime.date(year=2024, month=3, day=5)).count(), 1)
+        self.assertEqual(monthShifts(2024, 3), monthShifts(2024, 1))
+
+    def test_existing_roster(self):
+        """Test that a month that has a roster is not cloned into."""
+        Roster.objects.create(date=datetime.date(year=2024, month=2, day=1))
+        with self.assertRaises(ValueError):
+            cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        self.assertFalse(Day.objects.filter(date__year=2024, date__month=2).exists())
+
+    def test_constant_queries(self):
+        """Test that the number of queries does not grow with the number of staffs."""
+        with CaptureQueriesContext(connection) as small:
+            cloneRoster(self.source, datetime.date(year=2024, month=2, day=1))
+        staffs = Staff.objects.bulk_create([Staff(firstName=f"More{index}", lastName="Clone") for index in range(30)])
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.source, group=index % 3 + 1) for index, staff in enumerate(staffs)]
+        )
+        generateRoster(self.source)
+        with CaptureQueriesContext(connection) as large:
+            cloneRoster(self.source, datetime.date(year=2024, month=3, day=1))
+        self.assertEqual(len(large), len(small))
+
+
+class TestCloneRosterCommand(TestCase):
+    """Test cases for the clone_roster management command."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        staff = Staff.objects.create(firstName="Command", lastName="Clone")
+        self.source = Roster.objects.create(date=datetime.date(year=2024, month=1, day=1))
+        StaffRosterAssignment.objects.create(staff=staff, roster=self.source, group=1)
+        generateRoster(self.source)
+
+    def test_command(self):
+        """Test that the command clones the roster into the month."""
+        out = StringIO()
+        call_command("clone_roster", self.source.id, "2024-02", stdout=out)
+        self.assertIn("February 2024", out.getvalue())
+        self.assertEqual(monthShifts(2024, 2), {key: ids for key, ids in monthShifts(2024, 1).items() if key[0] <= 29})
+
+    def test_errors(self):
+        """Test that unknown rosters, malformed months and taken months are reported."""
+        with self.assertRaises(CommandError):
+            call_command("clone_roster", self.source.id + 1, "2024-02", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("clone_roster", self.source.id, "2024-13", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("clone_roster", self.source.id, "2024-01", stdout=StringIO())
+
+
+class TestCloneRosterView(TestCase):
+    """Test cases for CloneRosterView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        staff = Staff.objects.create(firstName="View", lastName="Clone")
+        self.source = Roster.objects.create(date=datetime.date(year=2024, month=1, day=1))
+        StaffRosterAssignment.objects.create(staff=staff, roster=self.source, group=1)
+        generateRoster(self.source)
+        self.url = reverse("roster:cloneRoster", args=[2024, 2])
+
+    def test_button(self):
+        """Test that months without shifts offer to copy the previous month."""
+        response = self.client.get(reverse("roster:rosterMonth", args=[2024, 2]))
+        self.assertContains(response, self.url)
+        self.assertContains(response, "Copy January 2024")
+
+    def test_htmx_clone(self):
+        """Test that htmx requests queue the clone and get its polling status."""
+        response = self.client.post(self.url, headers={"HX-Request": "true"})
+        job = Job.objects.get()
+        self.assertContains(response, reverse("roster:jobStatus", args=[job.id]), status_code=202)
+        self.assertEqual((job.kind, job.params), (Job.CLONE, {"source": self.source.id, "month": "2024-02"}))
+        self.assertFalse(Roster.objects.filter(date=datetime.date(year=2024, month=2, day=1)).exists())
+        runPendingJobs()
+        self.assertTrue(Roster.objects.filter(date=datetime.date(year=2024, month=2, day=1)).exists())
+
+    def test_clone(self):
+        """Test that plain requests are redirected to the job, and a source month can be given."""
+        response = self.client.post(reverse("roster:cloneRoster", args=[2024, 4]), {"source": "2024-01"})
+        self.assertRedirects(response, reverse("roster:jobStatus", args=[Job.objects.get().id]))
+        runPendingJobs()
+        self.assertEqual(monthShifts(2024, 4), {key: ids for key, ids in monthShifts(2024, 1).items() if key[0] <= 30})
+
+    def test_conflicts(self):
+        """Test that missing sources and taken months answer 409 with the reason."""
+        response = self.client.post(reverse("roster:cloneRoster", args=[2024, 6]), headers={"HX-Request": "true"})
+        self.assertContains(response, "May 2024 has no roster to copy.", status_code=409)
+        self.client.post(self.url)
+        runPendingJobs()
+        response = self.client.post(self.url, headers={"HX-Request": "true"})
+        self.assertContains(response, "February 2024 already has a roster.", status_code=409)
+
+    def test_invalid(self):
+        """Test that malformed source months and invalid url months are rejected."""
+        self.assertEqual(self.client.post(self.url, {"source": "January"}).status_code, 400)
+        self.assertEqual(self.client.post(reverse("roster:cloneRoster", args=[2024, 13])).status_code, 404)
@@ -0,0 +1,66 @@
+"""Unittest for conditional GET of the staff list."""
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from roster.models import Staff
+
+
+class TestStaffListConditionalGet(TestCase):
+    """Test cases for the ETag and Last-Modified validators of StaffListView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+        self.url = reverse("roster:staffsList")
+
+    def test_validators(self):
+        """Test that responses carry validators and vary on HX-Request."""
+        response = self.client.get(self.url)
+        self.assertTrue(response.has_header("ETag"))
+        self.assertEqual(response["Last-Modified"], http_date(int(self.staff.updatedAt.timestamp())))
+        self.assertIn("HX-Request", response["Vary"])
+
+    def test_unchanged(self):
+        """Test that an unchanged list is not modified and renders no template."""
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("HX-Request", response["Vary"])
+
+    def test_if_modified_since(self):
+        """Test the Last-Modified validator on its own."""
+        lastModified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=lastModified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes(self):
+        """Test that adding, editing and deleting staffs change the ETag."""
+        first = self.client.get(self.url)["ETag"]
+        other = Staff.objects.create(firstName="Musa", lastName="Bello")
+        added = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(added, first)
+        self.staff.delete()
+        self.assertNotEqual(self.client.get(self.url)["ETag"], added)
+        other.lastName = "Smith"
+        other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=added)
+        self.assertEqual(response.status_code, 200)
+
+    def test_revert(self):
+        """Test that deleting a new staff restores the list and its ETag."""
+        first = self.client.get(self.url)["ETag"]
+        Staff.objects.create(firstName="Musa", lastName="Bello").delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first).status_code, 304)
+
+    def test_representations(self):
+        """Test that the htmx partial and the full page have different ETags."""
+        full = self.client.get(self.url)
+        partial = self.client.get(self.url, HTTP_HX_REQUEST="true")
+        self.assertNotEqual(full["ETag"], partial["ETag"])
+        response = self.client.get(self.url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=full["ETag"])
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,195 @@
+"""Unittest for the materialized per staff shift counts."""
+
+import datetime
+from collections import Counter
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from roster.counters import applyShiftCountDeltas, deleteDays, rebuildShiftCounts
+from roster.generation import generateRosters
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment, StaffShiftCount
+
+
+class TestShiftCounts(TestCase):
+    """Test cases for keeping StaffShiftCount in step with the shifts."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Count") for index in range(4)])
+        self.rosters = [Roster.objects.create(date=datetime.date(year=2024, month=month, day=1)) for month in (1, 2)]
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(staff=staff, roster=roster, group=index % 2 + 1)
+                for roster in self.rosters
+                for index, staff in enumerate(self.staffs)
+            ]
+        )
+        generateRosters(self.rosters)
+        self.shift = Shift.objects.filter(day__date=datetime.date(year=2024, month=1, day=10)).first()
+
+    def counts(self) -> dict[tuple[int, int, str], int]:
+        """Returns the materialized counts, leaving out zeros."""
+        return {
+            (count.staff_id, count.roster_id, count.shiftType): count.count
+            for count in StaffShiftCount.objects.all()
+            if count.count
+        }
+
+    def expected(self) -> dict[tuple[int, int, str], int]:
+        """Returns the counts aggregated from the through table, in the lowest roster id of each month."""
+        rosters: dict[tuple[int, int], int] = {}
+        for roster in Roster.objects.order_by("id"):
+            rosters.setdefault((roster.date.year, roster.date.month), roster.id)
+        rows = (
+            Shift.staffs.through.objects.values("staff_id", "shift__shiftType", "shift__day__date")
+            .order_by()
+            .values_list("staff_id", "shift__shiftType", "shift__day__date")
+        )
+        counts: dict[tuple[int, int, str], int] = {}
+        for staffId, shiftType, date in rows:
+            key = (staffId, rosters[(date.year, date.month)], shiftType)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def test_generation(self):
+        """Test that generation writes the counts of its rosters."""
+        self.assertTrue(self.counts())
+        self.assertEqual(self.counts(), self.expected())
+        generateRosters(self.rosters[:1])
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_add_and_remove(self):
+        """Test that adding and removing staffs from either side adjusts the counts."""
+        outsider = Staff.objects.create(firstName="New", lastName="Staff")
+        self.shift.staffs.add(outsider)
+        self.assertEqual(self.counts(), self.expected())
+        self.shift.staffs.remove(outsider, self.staffs[0])
+        self.assertEqual(self.counts(), self.expected())
+        outsider.shifts.add(*Shift.objects.filter(day__date__month=2)[:3])
+        self.assertEqual(self.counts(), self.expected())
+        outsider.shifts.remove(self.shift)
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_clear_and_set(self):
+        """Test that clearing and setting staffs adjusts the counts."""
+        self.shift.staffs.clear()
+        self.assertEqual(self.counts(), self.expected())
+        self.shift.staffs.set(self.staffs[:2])
+        self.assertEqual(self.counts(), self.expected())
+        self.staffs[3].shifts.clear()
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_deletes(self):
+        """Test that deleting shifts and days removes their staffs from the counts."""
+        self.shift.delete()
+        self.assertEqual(self.counts(), self.expected())
+        Day.objects.filter(date__month=2, date__day__lte=7).delete()
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_deleteDays(self):
+        """Test that deleting many days subtracts their staffs with a few queries, not a few per shift."""
+        with CaptureQueriesContext(connection) as queries:
+            deleted = deleteDays(Day.objects.filter(date__month=2))
+        self.assertEqual(deleted, 29)
+        self.assertLess(len(queries), 20)
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_grouped_deltas(self):
+        """Test that equal changes of many staffs are one UPDATE, and missing counts one INSERT."""
+        outsider = Staff.objects.create(firstName="New", lastName="Staff")
+        roster = self.rosters[0].id
+        deltas = Counter({(staff.id, roster, Shift.MORNINGSHIFT): 2 for staff in self.staffs})
+        deltas[(outsider.id, roster, Shift.MORNINGSHIFT)] = 2
+        before = self.counts()
+        # A savepoint, one UPDATE, the existing counts, one INSERT and the release.
+        with self.assertNumQueries(5):
+            applyShiftCountDeltas(deltas)
+        for staff in [*self.staffs, outsider]:
+            key = (staff.id, roster, Shift.MORNINGSHIFT)
+            self.assertEqual(self.counts()[key], before.get(key, 0) + 2)
+
+    def test_two_rosters_in_a_month(self):
+        """Test that generation, the signals and a rebuild count a month shared by two rosters in one roster."""
+        second = Roster.objects.create(date=datetime.date(year=2024, month=1, day=15))
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=second, group=1) for staff in self.staffs]
+        )
+        generateRosters([second])
+        self.assertEqual(self.counts(), self.expected())
+        self.assertFalse(StaffShiftCount.objects.filter(roster=second).exclude(count=0).exists())
+        generateRosters([self.rosters[0], second])
+        self.assertEqual(self.counts(), self.expected())
+        shift = Shift.objects.filter(day__date=datetime.date(year=2024, month=1, day=20)).first()
+        shift.staffs.clear()
+        shift.staffs.add(*self.staffs)
+        self.assertEqual(self.counts(), self.expected())
+        incremental = self.counts()
+        rebuildShiftCounts([second])
+        self.assertEqual(self.counts(), incremental)
+        rebuildShiftCounts()
+        self.assertEqual(self.counts(), incremental)
+        deleteDays(Day.objects.filter(date__month=1, date__day__lte=7))
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_migration_fills_counts(self):
+        """Test that the data migration counts the shifts generated before the counts existed."""
+        StaffShiftCount.objects.all().delete()
+        migration = import_module("roster.migrations.0005_staff_shift_count")
+        migration.fillShiftCounts(apps, None)
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_rebuild(self):
+        """Test that a rebuild repairs the counts of some or all rosters."""
+        StaffShiftCount.objects.update(count=99)
+        StaffShiftCount.objects.filter(roster=self.rosters[1]).first().delete()
+        rebuildShiftCounts(self.rosters[:1])
+        self.assertEqual(
+            {key: count for key, count in self.counts().items() if key[1] == self.rosters[0].id},
+            {key: count for key, count in self.expected().items() if key[1] == self.rosters[0].id},
+        )
+        out = StringIO()
+        call_command("rebuild_shift_counts", stdout=out)
+        self.assertIn(f"Wrote {len(self.expected())} shift counts.", out.getvalue())
+        self.assertEqual(self.counts(), self.expected())
+
+
+class TestFairnessReportView(TestCase):
+    """Test cases for the fairness report."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+        self.months = 24
+        rosters = Roster.objects.bulk_create(
+            [Roster(date=datetime.date(year=2023 + month // 12, month=month % 12 + 1, day=1)) for month in range(self.months)]
+        )
+        StaffShiftCount.objects.bulk_create(
+            [
+                StaffShiftCount(staff=self.staff, roster=roster, shiftType=shiftType, count=count)
+                for roster in rosters
+                for shiftType, count in ((Shift.MORNINGSHIFT, 10), (Shift.AFTERNOONSHIFT, 5))
+            ]
+        )
+
+    def test_year(self):
+        """Test the totals of a year in one query."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("roster:fairnessReport", args=[2024]))
+        self.assertContains(response, "<td>120</td><td>60</td><td>180</td>", html=True)
+
+    def test_month(self):
+        """Test the totals of a month."""
+        response = self.client.get(reverse("roster:fairnessMonthReport", args=[2023, 5]))
+        self.assertContains(response, "May 2023")
+        self.assertContains(response, "<td>10</td><td>5</td><td>15</td>", html=True)
+
+    def test_invalid(self):
+        """Test that invalid months are 404."""
+        self.assertEqual(self.client.get(reverse("roster:fairnessMonthReport", args=[2024, 13])).status_code, 404)
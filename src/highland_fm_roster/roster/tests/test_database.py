@@ -0,0 +1,99 @@
+"""Unittest for the SQLite tuning and the production settings."""
+
+import importlib
+import os
+import sys
+import tempfile
+from unittest import mock, skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.test import SimpleTestCase, override_settings
+
+from roster.database import WALPRAGMAS
+
+
+@skipUnless(connection.vendor == "sqlite", "The pragmas are SQLite specific.")
+class TestSqlitePragmas(SimpleTestCase):
+    """Test cases for the connection_created hook."""
+
+    def connect(self, path: str):
+        """Opens a new connection to a SQLite file."""
+        wrapper = type(connections["default"])({**connection.settings_dict, "NAME": path}, alias="pragmas")
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name: str):
+        """Returns the value of a pragma."""
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_wal_profile(self):
+        """Test that new connections get the configured pragmas."""
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=WALPRAGMAS):
+            wrapper = self.connect(os.path.join(directory, "wal.sqlite3"))
+            self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+            self.assertEqual(self.pragma(wrapper, "synchronous"), 1)
+            self.assertEqual(self.pragma(wrapper, "busy_timeout"), WALPRAGMAS["busy_timeout"])
+            wrapper.close()
+
+    def test_default_profile(self):
+        """Test that connections are left alone without the setting."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, "default.sqlite3"))
+            self.assertEqual(self.pragma(wrapper, "journal_mode"), "delete")
+            wrapper.close()
+
+
+class TestProductionSettings(SimpleTestCase):
+    """Test cases for the environment driven production settings."""
+
+    def load(self, **environment):
+        """Imports the production settings under an environment."""
+        sys.modules.pop("highland_fm_roster.production", None)
+        self.addCleanup(sys.modules.pop, "highland_fm_roster.production", None)
+        with mock.patch.dict(os.environ, environment, clear=True):
+            return importlib.import_module("highland_fm_roster.production")
+
+    def test_sqlite(self):
+        """Test the default SQLite profile."""
+        production = self.load(SECRET_KEY="secret", ALLOWED_HOSTS="roster.example.com, localhost", SQLITE_PATH="/srv/roster.sqlite3")
+        self.assertFalse(production.DEBUG)
+        self.assertEqual(production.ALLOWED_HOSTS, ["roster.example.com", "localhost"])
+        database = production.DATABASES["default"]
+        self.assertEqual(database["NAME"], "/srv/roster.sqlite3")
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(production.SQLITE_PRAGMAS["journal_mode"], "WAL")
+        self.assertEqual(production.MIDDLEWARE[1], "roster.assets.StaticAssetsMiddleware")
+        self.assertEqual(production.STORAGES["staticfiles"]["BACKEND"], "roster.assets.CompressedManifestStaticFilesStorage")
+
+    def test_postgresql(self):
+        """Test the pooled PostgreSQL profile."""
+        production = self.load(SECRET_KEY="secret", DATABASE_ENGINE="postgresql", POSTGRES_POOL_SIZE="4")
+        database = production.DATABASES["default"]
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["OPTIONS"]["pool"]["max_size"], 4)
+
+    def test_cache(self):
+        """Test that the cache is shared between processes, in files by default."""
+        production = self.load(SECRET_KEY="secret", CACHE_LOCATION="/srv/cache")
+        cache = production.CACHES["default"]
+        self.assertEqual(cache["BACKEND"], "django.core.cache.backends.filebased.FileBasedCache")
+        self.assertEqual(cache["LOCATION"], "/srv/cache")
+        production = self.load(SECRET_KEY="secret", CACHE_BACKEND="database")
+        self.assertEqual(production.CACHES["default"]["LOCATION"], "roster_cache")
+        production = self.load(SECRET_KEY="secret", CACHE_BACKEND="redis", CACHE_LOCATION="redis://cache:6379/1")
+        self.assertEqual(production.CACHES["default"]["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+
+    def test_required(self):
+        """Test that a missing secret key or an unknown engine or cache is refused."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.load()
+        with self.assertRaises(ImproperlyConfigured):
+            self.load(SECRET_KEY="secret", DATABASE_ENGINE="mysql")
+        with self.assertRaises(ImproperlyConfigured):
+            self.load(SECRET_KEY="secret", CACHE_BACKEND="locmem")
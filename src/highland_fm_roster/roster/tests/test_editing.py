@@ -0,0 +1,127 @@
+"""Unittest for conditional staff edits."""
+
+import re
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from roster.editing import aupdateStaff
+from roster.forms import StaffEditForm
+from roster.models import Staff
+
+
+class TestStaffEditForm(TestCase):
+    """Test cases for StaffEditForm."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+
+    def data(self, **names) -> dict[str, str]:
+        """Returns the data of the rendered form with some names changed."""
+        data = {"updatedAt": self.staff.updatedAt.isoformat()}
+        for name in Staff.NAMEFIELDS:
+            data[f"initial-{name}"] = getattr(self.staff, name)
+            data[name] = names.get(name, getattr(self.staff, name))
+        return data
+
+    def test_renders_versions(self):
+        """Test that the form carries the names and updatedAt it was rendered with."""
+        html = StaffEditForm.forStaff(self.staff).as_p()
+        self.assertIn('name="initial-firstName" value="John"', html)
+        self.assertIn(f'name="updatedAt" value="{self.staff.updatedAt.isoformat()}"', html)
+
+    def test_changed_fields_only(self):
+        """Test that only the changed names are validated and returned."""
+        form = StaffEditForm(self.data(middleName="Ade"))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.names(), {"middleName": "Ade"})
+        self.assertEqual(form.renderedNames, {"firstName": "John", "middleName": "", "lastName": "Doe"})
+        self.assertEqual(form.cleaned_data["updatedAt"], self.staff.updatedAt)
+        self.assertFalse(StaffEditForm(self.data(lastName="")).is_valid())
+        self.assertFalse(StaffEditForm({**self.data(), "updatedAt": "yesterday"}).is_valid())
+
+
+class TestConditionalUpdate(TestCase):
+    """Test cases for aupdateStaff and the edit view."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.staff = Staff.objects.create(firstName="John", lastName="Doe")
+        self.url = reverse("roster:staffActions", args=[self.staff.id])
+
+    def rendered(self) -> dict[str, str]:
+        """Returns the names of the staff as an editor is shown them."""
+        return {name: getattr(self.staff, name) for name in Staff.NAMEFIELDS}
+
+    def test_update(self):
+        """Test that a current edit is applied with its search names, and returns the saved staff without a read."""
+        with self.assertNumQueries(1):
+            saved = async_to_sync(aupdateStaff)(self.staff.id, self.staff.updatedAt, {"firstName": "Jané"}, self.rendered())
+        staff = Staff.objects.get(id=self.staff.id)
+        self.assertEqual((staff.firstName, staff.firstNameSearch, staff.updatedAt), ("Jané", "jane", saved.updatedAt))
+        self.assertEqual((saved.firstName, saved.lastName, saved.firstNameSearch), ("Jané", "Doe", "jane"))
+
+    def test_stale_update(self):
+        """Test that an edit of an outdated staff changes nothing."""
+        rendered = self.rendered()
+        async_to_sync(aupdateStaff)(self.staff.id, self.staff.updatedAt, {"firstName": "Jane"}, rendered)
+        self.assertIsNone(async_to_sync(aupdateStaff)(self.staff.id, self.staff.updatedAt, {"firstName": "Musa"}, rendered))
+        self.assertEqual(Staff.objects.get(id=self.staff.id).firstName, "Jane")
+
+    def edit(self, form: StaffEditForm | str, **names):
+        """Submits a rendered edit form, or the form in a rendered modal, with some names changed."""
+        html = form if isinstance(form, str) else form.as_p()
+        data = {match[1]: match[2] for match in re.finditer(r'name="([\w-]+)" value="([^"]*)"', html)}
+        return self.client.put(self.url, urlencode({**data, **names}), headers={"HX-Request": "true"})
+
+    def test_two_editors(self):
+        """Test that the second of two editors gets a conflict instead of overwriting."""
+        first = StaffEditForm.forStaff(self.staff)
+        second = StaffEditForm.forStaff(self.staff)
+        response = self.edit(first, firstName="Jane")
+        self.assertContains(response, "Jane Doe")
+        response = self.edit(second, lastName="Bello")
+        self.assertContains(response, "was changed by someone else", status_code=409)
+        self.assertEqual(response["HX-Retarget"], "#modal-container")
+        # The conflict form carries the current version, so it can be submitted.
+        self.assertContains(response, 'value="Jane"', status_code=409)
+        staff = Staff.objects.get(id=self.staff.id)
+        self.assertEqual(str(staff), "Jane Doe")
+        response = self.edit(StaffEditForm.forStaff(staff), lastName="Bello")
+        self.assertContains(response, "Jane Bello")
+
+    def test_resubmit_after_conflict(self):
+        """Test that the form of a conflict modal is added as a new modal and can be submitted as it is."""
+        stale = StaffEditForm.forStaff(self.staff)
+        self.edit(StaffEditForm.forStaff(self.staff), firstName="Jane")
+        response = self.edit(stale, lastName="Bello")
+        self.assertEqual((response.status_code, response["HX-Reswap"]), (409, "beforeend"))
+        modal = response.content.decode()
+        self.assertEqual(modal.count(f'id="staff-{self.staff.id}-edit-form"'), 1)
+        response = self.edit(modal, lastName="Bello")
+        self.assertContains(response, "Jane Bello")
+        self.assertEqual(str(Staff.objects.get(id=self.staff.id)), "Jane Bello")
+
+    def test_invalid(self):
+        """Test that an invalid edit opens the modal again with the errors."""
+        response = self.edit(StaffEditForm.forStaff(self.staff), firstName="")
+        self.assertContains(response, "This field is required.")
+        self.assertEqual((response["HX-Retarget"], response["HX-Reswap"]), ("#modal-container", "beforeend"))
+
+    def test_forged_names(self):
+        """Test that forged rendered names match no row, so the edit is a conflict showing the saved names."""
+        form = StaffEditForm.forStaff(self.staff)
+        data = {match[1]: match[2] for match in re.finditer(r'name="([\w-]+)" value="([^"]*)"', form.as_p())}
+        data.update({"initial-lastName": "Forged", "lastName": "Forged", "firstName": "Jane"})
+        response = self.client.put(self.url, urlencode(data), headers={"HX-Request": "true"})
+        self.assertContains(response, 'value="Doe"', status_code=409)
+        self.assertEqual(str(Staff.objects.get(id=self.staff.id)), "John Doe")
+
+    def test_deleted(self):
+        """Test that editing a deleted staff is a 404."""
+        form = StaffEditForm.forStaff(self.staff)
+        self.staff.delete()
+        self.assertEqual(self.edit(form, firstName="Jane").status_code, 404)
@@ -0,0 +1,126 @@
+"""Unittest for the streaming roster exports."""
+
+import csv
+import datetime
+import io
+import tracemalloc
+import warnings
+import zipfile
+from xml.etree import ElementTree
+
+from django.test import TestCase
+from django.urls import reverse
+
+from roster.export import EXPORTHEADER, exportRows
+from roster.generation import generateRoster
+from roster.models import Roster, Staff, StaffRosterAssignment
+from roster.seeding import seedDatabase
+
+SHEETNAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class TestRosterExport(TestCase):
+    """Test cases for exportRows and RosterExportView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=datetime.date(year=2024, month=2, day=1))
+        staffs = Staff.objects.bulk_create(
+            [Staff(firstName="John", lastName="Doe"), Staff(firstName="Jane", middleName="A", lastName="Smith")]
+        )
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.roster, group=index + 1) for index, staff in enumerate(staffs)]
+        )
+        generateRoster(self.roster)
+
+    def test_rows(self):
+        """Test that there is one row per shift with its staffs."""
+        rows = list(exportRows(datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)))
+        self.assertEqual(len(rows), 29 * 2)
+        self.assertEqual(rows[0][:3], ("2024-02-01", "Thursday", "Morning shift"))
+        self.assertEqual(sorted(row[3] for row in rows[:2]), ["Jane A Smith", "John Doe"])
+
+    def test_empty_shift(self):
+        """Test that shifts without staffs are exported."""
+        StaffRosterAssignment.objects.update(active=False)
+        generateRoster(self.roster)
+        rows = list(exportRows(datetime.date(2024, 2, 1), datetime.date(2024, 2, 1)))
+        self.assertEqual([row[3] for row in rows], ["", ""])
+
+    def test_csv(self):
+        """Test the CSV export of a month."""
+        response = self.client.get(reverse("roster:exportRoster", args=["csv"]), {"start": "2024-02"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="roster-2024-02-2024-02.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(tuple(rows[0]), EXPORTHEADER)
+        self.assertEqual(len(rows), 1 + 29 * 2)
+
+    def test_xlsx(self):
+        """Test that the XLSX export is a workbook with one row per shift."""
+        response = self.client.get(
+            reverse("roster:exportRoster", args=["xlsx"]), {"start": "2024-01", "end": "2024-03"}
+        )
+        workbook = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+        rows = sheet.findall(f"{SHEETNAMESPACE}sheetData/{SHEETNAMESPACE}row")
+        self.assertEqual(len(rows), 1 + 29 * 2)
+        self.assertEqual(rows[1].find(f".//{SHEETNAMESPACE}t").text, "2024-02-01")
+
+    async def test_asgi(self):
+        """Test that under ASGI the export streams from an async iterator, without being read into a list."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            response = await self.async_client.get(reverse("roster:exportRoster", args=["csv"]), {"start": "2024-02"})
+            self.assertTrue(response.is_async)
+            content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(len(rows), 1 + 29 * 2)
+
+    def test_invalid_parameters(self):
+        """Test that bad formats are not found and bad months are bad requests."""
+        self.assertEqual(self.client.get(reverse("roster:exportRoster", args=["pdf"]), {"start": "2024-02"}).status_code, 404)
+        url = reverse("roster:exportRoster", args=["csv"])
+        self.assertEqual(self.client.get(url, {"start": "February"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"start": "2024-02", "end": "2024-01"}).status_code, 400)
+
+
+class TestRosterExportMemory(TestCase):
+    """Test that exports stream in memory that does not grow with the number of months."""
+
+    peakBytes = 4 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seeds five years of rosters."""
+        seedDatabase(60, 60, datetime.date(year=2020, month=1, day=1), batchSize=2000)
+
+    def export(self, format: str, end: str) -> tuple[int, int]:
+        """Returns the peak traced memory and the size of an export from January 2020."""
+        response = self.client.get(reverse("roster:exportRoster", args=[format]), {"start": "2020-01", "end": end})
+        size = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                size += len(chunk)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peak, size
+
+    def assertFlat(self, format: str):
+        """Asserts that exporting five years takes no more memory than one year."""
+        yearPeak, yearSize = self.export(format, "2020-12")
+        peak, size = self.export(format, "2024-12")
+        self.assertGreater(size, 3 * yearSize)
+        self.assertLess(peak, self.peakBytes)
+        self.assertLess(peak, 1.25 * yearPeak)
+
+    def test_csv(self):
+        """Test the CSV export of five years."""
+        self.assertFlat("csv")
+
+    def test_xlsx(self):
+        """Test the XLSX export of five years."""
+        self.assertFlat("xlsx")
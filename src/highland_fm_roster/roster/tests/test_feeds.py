@@ -0,0 +1,130 @@
+"""Unittest for the staff iCalendar feeds."""
+
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from roster.caching import bumpFeedVersions
+from roster.feeds import FEEDPASTDAYS, escapeText, foldLine
+from roster.generation import generateRoster
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment
+
+
+class TestFeedFormat(TestCase):
+    """Test cases for the iCalendar text helpers."""
+
+    def test_escapeText(self):
+        """Test that backslashes, separators and newlines are escaped."""
+        self.assertEqual(escapeText("a,b;c\\d\ne"), "a\\,b\\;c\\\\d\\ne")
+
+    def test_foldLine(self):
+        """Test that long lines are folded into lines of at most 75 octets."""
+        self.assertEqual(foldLine("SUMMARY:short"), "SUMMARY:short")
+        line = "X-WR-CALNAME:" + "é" * 100
+        folded = foldLine(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", ""), line)
+
+
+class TestStaffCalendarView(TestCase):
+    """Test cases for StaffCalendarView and the invalidation of cached feeds."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        # Test transactions roll back the shifts but not the cached feeds.
+        bumpFeedVersions()
+        self.staffs = [
+            Staff.objects.create(firstName="Ada", lastName="Feed"),
+            Staff.objects.create(firstName="Bola", lastName="Feed"),
+        ]
+        self.roster = Roster.objects.create(date=timezone.localdate().replace(day=1))
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.roster, group=index + 1) for index, staff in enumerate(self.staffs)]
+        )
+        generateRoster(self.roster)
+        self.url = reverse("roster:staffCalendar", args=[self.staffs[0].id])
+
+    def events(self, response) -> int:
+        """Returns the number of events in a feed response."""
+        return response.content.decode().count("BEGIN:VEVENT")
+
+    def test_feed(self):
+        """Test that the feed has one all day event per shift of the staff."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        content = response.content.decode()
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(content.endswith("END:VCALENDAR\r\n"))
+        self.assertIn("X-WR-CALNAME:Highland FM shifts of Ada Feed", content)
+        shift = Shift.objects.filter(staffs=self.staffs[0]).select_related("day").first()
+        self.assertIn(f"DTSTART;VALUE=DATE:{shift.day.date:%Y%m%d}", content)
+        self.assertIn(f"SUMMARY:{shift}", content)
+        self.assertEqual(self.events(response), Shift.objects.filter(staffs=self.staffs[0]).count())
+
+    def test_old_shifts(self):
+        """Test that shifts older than the feed's window are left out."""
+        old = Day.objects.create(date=timezone.localdate() - datetime.timedelta(days=FEEDPASTDAYS + 1))
+        Shift.objects.create(day=old, shiftType=Shift.MORNINGSHIFT).staffs.add(self.staffs[0])
+        self.assertEqual(self.events(self.client.get(self.url)), Shift.objects.filter(staffs=self.staffs[0]).count() - 1)
+
+    def test_unknown_staff(self):
+        """Test that unknown staffs are not found."""
+        response = self.client.get(reverse("roster:staffCalendar", args=[self.staffs[-1].id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag(self):
+        """Test that an unchanged feed is answered 304 Not Modified."""
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_warm_poll(self):
+        """Test that a poll of a cached feed makes no queries."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_shift_staffs_invalidate(self):
+        """Test that adding or removing the staff from shifts changes its feed."""
+        events = self.events(self.client.get(self.url))
+        shift = Shift.objects.exclude(staffs=self.staffs[0]).first()
+        shift.staffs.add(self.staffs[0])
+        self.assertEqual(self.events(self.client.get(self.url)), events + 1)
+        self.staffs[0].shifts.remove(shift)
+        self.assertEqual(self.events(self.client.get(self.url)), events)
+        shift = Shift.objects.filter(staffs=self.staffs[0]).first()
+        shift.staffs.clear()
+        self.assertEqual(self.events(self.client.get(self.url)), events - 1)
+
+    def test_days_and_shifts_invalidate(self):
+        """Test that saving or deleting days and shifts changes the feed."""
+        first = self.client.get(self.url)["ETag"]
+        shift = Shift.objects.filter(staffs=self.staffs[0]).first()
+        shift.shiftType = Shift.AFTERNOONSHIFT if shift.isMorningShift() else Shift.MORNINGSHIFT
+        shift.save()
+        second = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(second, first)
+        shift.day.delete()
+        self.assertNotEqual(self.client.get(self.url)["ETag"], second)
+
+    def test_bulk_writes_invalidate(self):
+        """Test that generation and staff renames change the feed."""
+        first = self.client.get(self.url)["ETag"]
+        StaffRosterAssignment.objects.filter(staff=self.staffs[0]).update(active=False)
+        generateRoster(self.roster)
+        response = self.client.get(self.url)
+        self.assertNotEqual(response["ETag"], first)
+        self.assertEqual(self.events(response), 0)
+        self.staffs[0].firstName = "Adaeze"
+        self.staffs[0].save()
+        self.assertIn("Adaeze Feed", self.client.get(self.url).content.decode())
+
+    def test_deleted_staff(self):
+        """Test that the feed of a deleted staff is gone."""
+        self.client.get(self.url)
+        self.staffs[0].delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,214 @@
+"""Unittest for roster generation."""
+
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from roster.activity import monthDates
+from roster.counters import rebuildShiftCounts
+from roster.generation import generateRoster, generateRosters, rosterDays
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment, StaffShiftCount
+
+
+class TestGenerateRoster(TestCase):
+    """Test cases for generateRoster.
+    Attributes:
+    - testDate: Date to use throughout the test case.
+    """
+
+    testDate = datetime.date(year=2024, month=1, day=15)
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=self.testDate)
+        self.john = Staff.objects.create(firstName="John", lastName="Doe")
+        self.abdul = Staff.objects.create(firstName="Abdulqadir", middleName="Abubakar", lastName="Ahmad")
+        self.jane = Staff.objects.create(firstName="Jane", lastName="Doe")
+        StaffRosterAssignment.objects.create(staff=self.john, roster=self.roster, group=1)
+        StaffRosterAssignment.objects.create(staff=self.abdul, roster=self.roster, group=2)
+        StaffRosterAssignment.objects.create(
+            staff=self.jane, roster=self.roster, group=1, vacationDate=datetime.date(year=2024, month=1, day=11)
+        )
+
+    def test_monthDates(self):
+        """Test that monthDates covers the whole month of the roster."""
+        dates = monthDates(self.roster)
+        self.assertEqual(len(dates), 31)
+        self.assertEqual(dates[0], datetime.date(year=2024, month=1, day=1))
+        self.assertEqual(dates[-1], datetime.date(year=2024, month=1, day=31))
+
+    def test_creates_days_and_shifts(self):
+        """Test that every day gets a morning and an afternoon shift."""
+        days = generateRoster(self.roster)
+        self.assertEqual(len(days), 31)
+        self.assertEqual(rosterDays(self.roster).count(), 31)
+        self.assertEqual(Shift.objects.filter(shiftType=Shift.MORNINGSHIFT).count(), 31)
+        self.assertEqual(Shift.objects.filter(shiftType=Shift.AFTERNOONSHIFT).count(), 31)
+
+    def test_staffs_follow_groups_and_activity(self):
+        """Test that staffs work one shift a day with their group while active."""
+        generateRoster(self.roster)
+        self.assertEqual(self.john.shifts.count(), 31)
+        self.assertEqual(self.abdul.shifts.count(), 31)
+        self.assertEqual(self.jane.shifts.count(), 10)
+        self.assertFalse(self.jane.shifts.filter(day__date__gte=datetime.date(year=2024, month=1, day=11)).exists())
+        for shift in self.jane.shifts.all():
+            self.assertIn(self.john, shift.staffs.all())
+
+    def test_regenerate_replaces_days(self):
+        """Test that generating twice does not duplicate rows."""
+        Day.objects.create(date=datetime.date(year=2024, month=2, day=1))
+        generateRoster(self.roster)
+        generateRoster(self.roster)
+        self.assertEqual(rosterDays(self.roster).count(), 31)
+        self.assertEqual(Day.objects.count(), 32)
+        self.assertEqual(Shift.staffs.through.objects.count(), 31 * 2 + 10)
+
+    def test_query_count(self):
+        """Test that a fresh month costs a constant number of queries."""
+        # assignments, days delete lookup, days, shifts, shift staffs, the
+        # months' rosters, shift counts delete and insert, plus the savepoint
+        # and its release.
+        with self.assertNumQueries(10):
+            generateRoster(self.roster)
+
+    def test_command(self):
+        """Test the generate_roster management command."""
+        out = StringIO()
+        call_command("generate_roster", self.roster.id, stdout=out)
+        self.assertIn("Generated 31 days", out.getvalue())
+        self.assertEqual(rosterDays(self.roster).count(), 31)
+
+    def test_command_missing_roster(self):
+        """Test that the command fails for unknown rosters."""
+        with self.assertRaises(CommandError):
+            call_command("generate_roster", self.roster.id + 1, stdout=StringIO())
+
+
+class TestGenerateRosters(TestCase):
+    """Test cases for generateRosters."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Test") for index in range(4)])
+        self.rosters = [Roster.objects.create(date=datetime.date(year=2024, month=month, day=1)) for month in (3, 1, 2)]
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(staff=staff, roster=roster, group=index % 2 + 1)
+                for roster in self.rosters
+                for index, staff in enumerate(staffs)
+            ]
+        )
+
+    def test_query_count_is_constant(self):
+        """Test that three months cost as many queries as one."""
+        with self.assertNumQueries(10):
+            days = generateRosters(self.rosters)
+        self.assertEqual(len(days), 31 + 29 + 31)
+        self.assertEqual(Shift.staffs.through.objects.count(), 4 * len(days))
+
+    def test_balanced_across_months(self):
+        """Test that mornings and afternoons are balanced over the months."""
+        generateRosters(self.rosters)
+        for staff in Staff.objects.all():
+            mornings = staff.shifts.filter(shiftType=Shift.MORNINGSHIFT).count()
+            afternoons = staff.shifts.filter(shiftType=Shift.AFTERNOONSHIFT).count()
+            self.assertLessEqual(abs(mornings - afternoons), 1)
+
+
+class TestPatchAssignment(TestCase):
+    """Test cases for patching generated shifts when an assignment's window changes."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=datetime.date(year=2024, month=1, day=1))
+        staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Patch") for index in range(6)])
+        StaffRosterAssignment.objects.bulk_create(
+            [StaffRosterAssignment(staff=staff, roster=self.roster, group=index % 3 + 1) for index, staff in enumerate(staffs)]
+        )
+        generateRoster(self.roster)
+        self.staff = staffs[0]
+        self.assignment = StaffRosterAssignment.objects.get(staff=self.staff)
+
+    def links(self) -> set[tuple[datetime.date, str, int]]:
+        """Returns every (date, shift type, staff id) link."""
+        return set(Shift.staffs.through.objects.values_list("shift__day__date", "shift__shiftType", "staff_id"))
+
+    def counts(self) -> dict[tuple[int, str], int]:
+        """Returns the materialized shift counts of the roster."""
+        return {
+            (count.staff_id, count.shiftType): count.count
+            for count in StaffShiftCount.objects.filter(roster=self.roster)
+            if count.count
+        }
+
+    def assertCountsMatch(self):
+        """Asserts that the materialized counts match the shifts."""
+        counts = self.counts()
+        rebuildShiftCounts([self.roster])
+        self.assertEqual(counts, self.counts())
+
+    def test_one_day_vacation(self):
+        """Test that going on vacation on the last day only drops that day's link."""
+        before = self.links()
+        self.assignment.vacationDate = datetime.date(year=2024, month=1, day=31)
+        self.assignment.save()
+        removed = before - self.links()
+        self.assertEqual({(date, staffId) for date, _, staffId in removed}, {(datetime.date(year=2024, month=1, day=31), self.staff.id)})
+        self.assertEqual(self.links() - before, set())
+        self.assertCountsMatch()
+
+    def test_resumption_joins_group(self):
+        """Test that resuming earlier joins the group's shift on the new days."""
+        self.assignment.resumptionDate = datetime.date(year=2024, month=1, day=11)
+        self.assignment.save()
+        self.assertEqual(self.staff.shifts.count(), 21)
+        self.assignment.resumptionDate = datetime.date(year=2024, month=1, day=6)
+        self.assignment.save()
+        self.assertEqual(self.staff.shifts.count(), 26)
+        mate = StaffRosterAssignment.objects.exclude(staff=self.staff).filter(group=self.assignment.group).get().staff
+        for shift in self.staff.shifts.filter(day__date__lt=datetime.date(year=2024, month=1, day=11)):
+            self.assertIn(mate, shift.staffs.all())
+        self.assertCountsMatch()
+
+    def test_hand_edits_survive(self):
+        """Test that links on untouched days are left alone."""
+        shift = Shift.objects.get(day__date=datetime.date(year=2024, month=1, day=3), shiftType=Shift.MORNINGSHIFT)
+        if self.staff in shift.staffs.all():
+            shift = Shift.objects.get(day__date=shift.day.date, shiftType=Shift.AFTERNOONSHIFT)
+        shift.staffs.add(self.staff)
+        self.assignment.vacationDate = datetime.date(year=2024, month=1, day=20)
+        self.assignment.save()
+        self.assertEqual(self.staff.shifts.filter(day__date=datetime.date(year=2024, month=1, day=3)).count(), 2)
+        self.assertFalse(self.staff.shifts.filter(day__date__gte=datetime.date(year=2024, month=1, day=20)).exists())
+        self.assertCountsMatch()
+
+    def test_query_count_is_constant(self):
+        """Test that a one day change and a whole month change cost the same queries."""
+        # update, removed links, delete or group shifts, insert, one shift count
+        # update per shift type, the shifts' updatedAt, plus the transaction and
+        # a savepoint.
+        changes = [
+            {"vacationDate": datetime.date(year=2024, month=1, day=31)},
+            {"vacationDate": None},
+            {"active": False},
+            {"active": True},
+        ]
+        for change in changes:
+            assignment = StaffRosterAssignment.objects.select_related("roster").get(id=self.assignment.id)
+            for field, value in change.items():
+                setattr(assignment, field, value)
+            with CaptureQueriesContext(connection) as queries:
+                assignment.save()
+            self.assertLessEqual(len(queries), 10, change)
+        self.assertEqual(self.staff.shifts.count(), 31)
+        self.assertCountsMatch()
+
+    def test_unchanged_window(self):
+        """Test that saving other fields does not touch the shifts."""
+        with self.assertNumQueries(1):
+            self.assignment.save()
@@ -0,0 +1,93 @@
+"""Unittest for the bulk staff import."""
+
+import os
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from roster.imports import importStaffs, readStaffRows
+from roster.models import Staff
+
+CSVTEXT = """First Name,Middle Name,Last Name
+John,,Doe
+Jane,A,Smith
+ ,,Nobody
+jóhn,,DOE
+Musa,,Bello
+Jane,A,Smith
+,,
+Abdulqadir,Abubakar,{long}
+""".format(long="x" * 60)
+
+
+class TestImportStaffs(TestCase):
+    """Test cases for readStaffRows and importStaffs."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        Staff.objects.create(firstName="Musa", lastName="Bello")
+
+    def test_summary(self):
+        """Test that valid new rows are inserted and the others reported by line."""
+        summary = importStaffs(readStaffRows(StringIO(CSVTEXT)))
+        self.assertEqual(summary.inserted, 2)
+        self.assertEqual(summary.skipped, [5, 6, 7])
+        self.assertEqual([line for line, _ in summary.invalid], [4, 9])
+        self.assertIn("firstName", summary.invalid[0][1])
+        self.assertIn("lastName", summary.invalid[1][1])
+        self.assertEqual(
+            sorted(str(staff) for staff in Staff.objects.all()), ["Jane A Smith", "John Doe", "Musa Bello"]
+        )
+        self.assertEqual(Staff.objects.get(lastName="Smith").middleNameSearch, "a")
+
+    def test_query_count(self):
+        """Test that an import costs one lookup and one insert, not a query per row."""
+        lines = ["firstName,lastName"] + [f"Staff{index},Import" for index in range(100)]
+        with CaptureQueriesContext(connection) as queries:
+            summary = importStaffs(readStaffRows(lines))
+        statements = [query["sql"].split()[0] for query in queries]
+        self.assertEqual(statements.count("SELECT"), 1)
+        self.assertEqual(statements.count("INSERT"), 1)
+        self.assertEqual(summary.inserted, 100)
+
+    def test_header(self):
+        """Test that a header without a lastName column is rejected."""
+        with self.assertRaises(ValueError):
+            list(readStaffRows(["firstName,surname", "John,Doe"]))
+
+    def test_view(self):
+        """Test that the upload returns the summary partial."""
+        self.assertContains(self.client.get(reverse("roster:importStaffs")), "Import Staffs")
+        upload = SimpleUploadedFile("staffs.csv", CSVTEXT.encode("utf-8-sig"), content_type="text/csv")
+        response = self.client.post(reverse("roster:importStaffs"), {"file": upload}, HTTP_HX_REQUEST="true")
+        self.assertTemplateUsed(response, "roster/import_summary.html")
+        self.assertContains(response, "2 staffs imported.")
+        self.assertContains(response, "3 rows skipped")
+        self.assertContains(response, "Line 9: lastName")
+
+    def test_view_bad_file(self):
+        """Test that a file that is not UTF-8 CSV is reported."""
+        upload = SimpleUploadedFile("staffs.csv", b"\xff\xfe\x00bad", content_type="text/csv")
+        response = self.client.post(reverse("roster:importStaffs"), {"file": upload})
+        self.assertContains(response, "not UTF-8")
+        self.assertEqual(Staff.objects.count(), 1)
+
+    def test_command(self):
+        """Test the import_staffs command."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "staffs.csv")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(CSVTEXT)
+            output, errors = StringIO(), StringIO()
+            call_command("import_staffs", path, stdout=output, stderr=errors)
+        self.assertIn("Imported 2 staffs, skipped 3 existing, 2 invalid.", output.getvalue())
+        self.assertIn("Line 4: firstName", errors.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("import_staffs", "/nonexistent.csv")
@@ -0,0 +1,216 @@
+"""Unittest for the background jobs."""
+
+import datetime
+import os
+import tempfile
+import time
+import warnings
+
+from asgiref.sync import sync_to_async
+from django.core.files.base import ContentFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from roster.generation import generateRoster
+from roster.jobs import EXPORTTYPES, MAXATTEMPTS, JobRunner, claimJob, enqueueJob, recoverJobs, runPendingJobs
+from roster.models import Day, Job, Roster, Shift, Staff, StaffRosterAssignment
+
+
+def useTemporaryMedia(testCase) -> None:
+    """Keeps the files a test's jobs make in a temporary MEDIA_ROOT."""
+    directory = tempfile.TemporaryDirectory()
+    testCase.addCleanup(directory.cleanup)
+    settings = override_settings(MEDIA_ROOT=directory.name)
+    settings.enable()
+    testCase.addCleanup(settings.disable)
+
+
+def seedMonth(date: datetime.date) -> Roster:
+    """Creates a roster with two assigned staffs for the month of a date."""
+    roster = Roster.objects.create(date=date)
+    staffs = Staff.objects.bulk_create([Staff(firstName=f"Job{index}", lastName="Runner") for index in range(2)])
+    StaffRosterAssignment.objects.bulk_create(
+        [StaffRosterAssignment(staff=staff, roster=roster, group=index + 1) for index, staff in enumerate(staffs)]
+    )
+    return roster
+
+
+class TestJobs(TestCase):
+    """Test cases for queueing, claiming and running jobs."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        useTemporaryMedia(self)
+        self.roster = seedMonth(datetime.date(year=2024, month=1, day=1))
+
+    def test_generate(self):
+        """Test that a generate job makes the shifts of its rosters and reports the months."""
+        job = enqueueJob(Job.GENERATE, {"rosters": [self.roster.id]})
+        self.assertEqual((job.status, str(job)), (Job.QUEUED, f"Generate roster #{job.id}"))
+        self.assertEqual(runPendingJobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.attempts), (Job.DONE, 100, 1))
+        self.assertEqual(job.result, {"days": 31, "months": ["2024-01"]})
+        self.assertEqual(Shift.objects.filter(day__date__month=1).count(), 62)
+        self.assertIsNotNone(job.finishedAt)
+
+    def test_clone(self):
+        """Test that a clone job copies the roster into its month."""
+        generateRoster(self.roster)
+        job = enqueueJob(Job.CLONE, {"source": self.roster.id, "month": "2024-02"})
+        runPendingJobs()
+        job.refresh_from_db()
+        clone = Roster.objects.get(date=datetime.date(year=2024, month=2, day=1))
+        self.assertEqual(job.result, {"roster": clone.id, "month": "2024-02"})
+        self.assertEqual(Day.objects.filter(date__year=2024, date__month=2).count(), 29)
+
+    def test_export(self):
+        """Test that an export job saves the file to the storage and keeps its path, name and content type."""
+        generateRoster(self.roster)
+        job = enqueueJob(Job.EXPORT, {"format": "csv", "start": "2024-01", "end": "2024-01"})
+        runPendingJobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual((job.outputName, job.outputType), ("roster-2024-01-2024-01.csv", "text/csv"))
+        self.assertTrue(job.output.name.startswith("jobs/"))
+        with job.output.open("rb") as output:
+            lines = output.read().decode().splitlines()
+        self.assertEqual(lines[0], "Date,Day,Shift,Staffs")
+        self.assertEqual(len(lines), 63)
+        self.assertEqual(job.result, {"shifts": 62, "bytes": job.output.size})
+
+    def test_export_retry(self):
+        """Test that a retried export replaces the file of its earlier attempt."""
+        job = enqueueJob(Job.EXPORT, {"format": "xlsx", "start": "2024-01"})
+        runPendingJobs()
+        Job.objects.filter(id=job.id).update(status=Job.QUEUED)
+        runPendingJobs()
+        job.refresh_from_db()
+        directory, name = os.path.split(job.output.name)
+        self.assertEqual(job.output.storage.listdir(directory)[1], [name])
+
+    def test_failure(self):
+        """Test that a failing job ends failed with the reason, and the queue goes on."""
+        failing = enqueueJob(Job.CLONE, {"source": self.roster.id + 1, "month": "2024-02"})
+        later = enqueueJob(Job.GENERATE, {"rosters": [self.roster.id]})
+        with self.assertLogs("roster.jobs", "ERROR"):
+            self.assertEqual(runPendingJobs(), 2)
+        failing.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((failing.status, failing.message), (Job.FAILED, "The roster to copy no longer exists."))
+        self.assertEqual(later.status, Job.DONE)
+
+    def test_claim(self):
+        """Test that jobs are claimed oldest first and only once."""
+        first = enqueueJob(Job.GENERATE, {"rosters": [self.roster.id]})
+        second = enqueueJob(Job.GENERATE, {"rosters": [self.roster.id]})
+        self.assertEqual(claimJob().id, first.id)
+        claimed = claimJob()
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (second.id, Job.RUNNING, 1))
+        self.assertIsNone(claimJob())
+
+    def test_recover(self):
+        """Test that running jobs with a stale heartbeat are queued again, then failed."""
+        job = enqueueJob(Job.GENERATE, {"rosters": [self.roster.id]})
+        claimJob()
+        self.assertEqual(recoverJobs(timezone.now() - datetime.timedelta(minutes=1)), 0)
+        self.assertEqual(recoverJobs(timezone.now() + datetime.timedelta(seconds=1)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        Job.objects.filter(id=job.id).update(status=Job.RUNNING, attempts=MAXATTEMPTS)
+        recoverJobs(timezone.now() + datetime.timedelta(seconds=1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.message), (Job.FAILED, "The job was interrupted too many times."))
+
+
+class TestJobViews(TestCase):
+    """Test cases for queueing jobs from the roster month and following them."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        useTemporaryMedia(self)
+        self.roster = seedMonth(datetime.date(year=2024, month=3, day=1))
+
+    def test_buttons(self):
+        """Test that the month offers to generate its shifts and prepare its exports."""
+        response = self.client.get(reverse("roster:rosterMonth", args=[2024, 3]))
+        self.assertContains(response, reverse("roster:generateRoster", args=[2024, 3]))
+        self.assertContains(response, reverse("roster:exportRoster", args=["xlsx"]))
+        self.assertContains(response, 'id="roster-jobs"')
+
+    def test_generate(self):
+        """Test that generating queues a job whose status polls until it is done."""
+        url = reverse("roster:generateRoster", args=[2024, 3])
+        response = self.client.post(url, {"optimize": ""}, headers={"HX-Request": "true"})
+        job = Job.objects.get()
+        status = reverse("roster:jobStatus", args=[job.id])
+        self.assertContains(response, f'hx-get="{status}"', status_code=202)
+        self.assertEqual(job.params, {"rosters": [self.roster.id], "optimize": False})
+        runPendingJobs()
+        response = self.client.get(status, headers={"HX-Request": "true"})
+        self.assertNotContains(response, "hx-get")
+        self.assertContains(response, reverse("roster:rosterMonth", args=[2024, 3]))
+        self.assertContains(self.client.get(status), "<html", html=False)
+
+    def test_generate_without_roster(self):
+        """Test that months without a roster answer 409."""
+        response = self.client.post(reverse("roster:generateRoster", args=[2024, 4]), headers={"HX-Request": "true"})
+        self.assertContains(response, "April 2024 has no roster to generate.", status_code=409)
+        self.assertFalse(Job.objects.exists())
+
+    def test_export(self):
+        """Test that a posted export queues a job whose file is downloaded when it is done."""
+        generateRoster(self.roster)
+        response = self.client.post(reverse("roster:exportRoster", args=["xlsx"]), {"start": "2024-03"})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse("roster:jobStatus", args=[job.id]))
+        output = reverse("roster:jobOutput", args=[job.id])
+        self.assertEqual(self.client.get(output).status_code, 404)
+        runPendingJobs()
+        self.assertContains(self.client.get(reverse("roster:jobStatus", args=[job.id])), output)
+        response = self.client.get(output)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="roster-2024-03-2024-03.xlsx"')
+        self.assertEqual(response["Content-Type"], EXPORTTYPES["xlsx"])
+        self.assertTrue(response.getvalue().startswith(b"PK"))
+
+    async def test_export_asgi(self):
+        """Test that the file of an export is streamed from an async iterator under ASGI."""
+        job = await Job.objects.acreate(kind=Job.EXPORT, status=Job.DONE, outputName="roster.csv", outputType="text/csv")
+        await sync_to_async(job.output.save)("roster.csv", ContentFile(b"Date,Day,Shift,Staffs\r\n"))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            response = await self.async_client.get(reverse("roster:jobOutput", args=[job.id]))
+            self.assertTrue(response.is_async)
+            content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(content, b"Date,Day,Shift,Staffs\r\n")
+        self.assertEqual(response["Content-Length"], str(len(content)))
+
+    def test_invalid(self):
+        """Test that unknown jobs, formats and months are rejected."""
+        self.assertEqual(self.client.get(reverse("roster:jobStatus", args=[1])).status_code, 404)
+        self.assertEqual(self.client.post(reverse("roster:exportRoster", args=["pdf"]), {"start": "2024-03"}).status_code, 404)
+        self.assertEqual(self.client.post(reverse("roster:exportRoster", args=["csv"]), {"start": "March"}).status_code, 400)
+        self.assertEqual(self.client.post(reverse("roster:generateRoster", args=[2024, 13])).status_code, 404)
+        self.assertFalse(Job.objects.exists())
+
+
+class TestJobRunner(TransactionTestCase):
+    """Test cases for JobRunner, whose threads need committed jobs."""
+
+    def test_runner(self):
+        """Test that a started runner is woken by a queued job and runs it on its pool."""
+        roster = seedMonth(datetime.date(year=2024, month=5, day=1))
+        runner = JobRunner(workers=1, pollSeconds=60)
+        runner.start()
+        try:
+            job = enqueueJob(Job.GENERATE, {"rosters": [roster.id]})
+            runner.wake()
+            deadline = time.monotonic() + 10
+            while Job.objects.get(id=job.id).status != Job.DONE and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            runner.stop()
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.DONE)
+        self.assertEqual(Shift.objects.filter(day__date__month=5).count(), 62)
+        self.assertIsNone(runner.thread)
@@ -0,0 +1,169 @@
+"""Unittest for the roster optimizer and its annealing search."""
+
+import datetime
+import random
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from roster.activity import ActivityMatrix
+from roster.annealing import Problem, Search, anneal, scoreOf
+from roster.generation import rosterDays
+from roster.models import Roster, Shift, Staff, StaffRosterAssignment
+from roster.optimizer import optimizeMatrix, optimizeRosters, snapshot, toSchedule
+from roster.scheduler import rotationSchedule
+
+
+def randomProblem(seed: int, numberOfStaffs: int = 12, numberOfDays: int = 10) -> Problem:
+    """Builds a random problem with partly active staffs."""
+    randomizer = random.Random(seed)
+    full = (1 << numberOfDays) - 1
+    rows = [
+        full & ~(randomizer.getrandbits(numberOfDays) & randomizer.getrandbits(numberOfDays))
+        for _ in range(numberOfStaffs)
+    ]
+    groups = [randomizer.randint(1, 3) for _ in range(numberOfStaffs)]
+    initial = [randomizer.getrandbits(numberOfDays) for _ in range(numberOfStaffs)]
+    return Problem(numberOfDays, groups, rows, initial)
+
+
+class TestAnnealing(TestCase):
+    """Test cases for the annealing search."""
+
+    def test_scoreOf(self):
+        """Test the score of a small hand made schedule."""
+        # Two staffs in one group over three days: the first works
+        # afternoon, morning, morning and the second always mornings.
+        problem = Problem(3, [1, 1], [0b111, 0b111], [0b001, 0b000])
+        # fairness 1 + 9, one turnaround, one split, coverage 0 + 4 + 4.
+        self.assertEqual(scoreOf(problem, problem.initial), 10 + 4 * 1 + 2 * 1 + 8)
+
+    def test_delta_matches_score(self):
+        """Test that incremental deltas agree with the full score."""
+        problem = randomProblem(1)
+        search = Search(problem, problem.initial)
+        randomizer = random.Random(1)
+        for _ in range(200):
+            staff, day = randomizer.choice(search.cells)
+            search.flip(staff, day, search.delta(staff, day))
+            self.assertEqual(search.score, scoreOf(problem, search.afternoons()))
+
+    def test_anneal_never_worse(self):
+        """Test that a restart never returns a worse schedule than it started from."""
+        for seed in range(5):
+            problem = randomProblem(seed)
+            score, afternoons = anneal(problem, seed, iterations=2000)
+            self.assertLessEqual(score, scoreOf(problem, problem.initial))
+            self.assertEqual(score, scoreOf(problem, afternoons))
+
+    def test_anneal_returns_best(self):
+        """Test that a restart returns the best schedule it saw, not where its walk ended."""
+        searches = []
+
+        class RecordedSearch(Search):
+            """A Search that remembers itself, to compare the final state with the result."""
+
+            def __init__(self, *args):
+                super().__init__(*args)
+                searches.append(self)
+
+        problem = randomProblem(3)
+        # A hot walk accepts nearly every move, so it wanders off its best schedules.
+        with (
+            mock.patch("roster.annealing.Search", RecordedSearch),
+            mock.patch("roster.annealing.STARTTEMPERATURE", 1000.0),
+            mock.patch("roster.annealing.ENDTEMPERATURE", 1000.0),
+        ):
+            score, afternoons = anneal(problem, 3, iterations=500)
+        self.assertEqual(score, scoreOf(problem, afternoons))
+        self.assertLess(score, scoreOf(problem, problem.initial))
+        self.assertGreater(searches[0].score, score)
+
+    def test_anneal_iterations(self):
+        """Test that a restart makes exactly as many moves as its iterations."""
+        moves = []
+
+        class CountedSearch(Search):
+            """A Search that counts the moves, each of which looks for one partner."""
+
+            def partner(self, *args):
+                moves.append(args)
+                return super().partner(*args)
+
+        problem = randomProblem(1)
+        for iterations in (0, 3, 300):
+            moves.clear()
+            with mock.patch("roster.annealing.Search", CountedSearch):
+                anneal(problem, 1, iterations=iterations)
+            self.assertEqual(len(moves), iterations)
+
+    def test_anneal_requires_a_limit(self):
+        """Test that a restart needs a time budget or an iteration count."""
+        with self.assertRaises(ValueError):
+            anneal(randomProblem(0), 0)
+
+
+class TestOptimizer(TestCase):
+    """Test cases for the optimizer.
+    Attributes:
+    - testDate: Date to use throughout the test case.
+    """
+
+    testDate = datetime.date(year=2024, month=1, day=1)
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        self.roster = Roster.objects.create(date=self.testDate)
+        staffs = Staff.objects.bulk_create([Staff(firstName=f"Staff{index}", lastName="Test") for index in range(9)])
+        StaffRosterAssignment.objects.bulk_create(
+            [
+                StaffRosterAssignment(
+                    staff=staff,
+                    roster=self.roster,
+                    group=index % 3 + 1,
+                    vacationDate=self.testDate + datetime.timedelta(days=20) if index == 0 else None,
+                )
+                for index, staff in enumerate(staffs)
+            ]
+        )
+        self.matrix = ActivityMatrix.forRoster(self.roster)
+
+    def test_snapshot_round_trip(self):
+        """Test that a schedule survives a snapshot round trip."""
+        schedule = rotationSchedule([self.matrix])[0]
+        problem = snapshot(self.matrix, schedule)
+        roundTrip = toSchedule(self.matrix, problem.initial)
+        self.assertEqual(roundTrip.keys(), schedule.keys())
+        for key, staffIds in schedule.items():
+            self.assertEqual(sorted(roundTrip[key]), sorted(staffIds))
+
+    def test_improves_rotation(self):
+        """Test that the optimizer does no worse than the rotation."""
+        rotation = snapshot(self.matrix, rotationSchedule([self.matrix])[0])
+        score, schedule = optimizeMatrix(self.matrix, timeBudget=None, workers=1, restarts=2, iterations=3000)
+        self.assertLessEqual(score, scoreOf(rotation, rotation.initial))
+        for (date, _), staffIds in schedule.items():
+            for staffId in staffIds:
+                self.assertTrue(self.matrix.isActive(staffId, date))
+
+    def test_worker_processes(self):
+        """Test that restarts in worker processes agree with in process restarts."""
+        inProcess = optimizeMatrix(self.matrix, timeBudget=None, workers=1, restarts=2, iterations=500)
+        inWorkers = optimizeMatrix(self.matrix, timeBudget=None, workers=2, restarts=2, iterations=500)
+        self.assertEqual(inProcess, inWorkers)
+
+    def test_optimizeRosters(self):
+        """Test that optimized rosters are written to the database."""
+        optimizeRosters([self.roster], timeBudget=0.1, workers=1)
+        self.assertEqual(rosterDays(self.roster).count(), 31)
+        self.assertEqual(Shift.staffs.through.objects.count(), 8 * 31 + 20)
+
+    def test_command(self):
+        """Test the optimize mode of the generate_roster command."""
+        out = StringIO()
+        call_command(
+            "generate_roster", self.roster.id, "--optimize", "--time-budget", "0.1", "--workers", "1", stdout=out
+        )
+        self.assertIn("Generated 31 days", out.getvalue())
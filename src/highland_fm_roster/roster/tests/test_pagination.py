@@ -0,0 +1,90 @@
+"""Unittest for keyset pagination and the paginated staff list."""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from roster.caching import bumpStaffListVersion
+from roster.models import Staff
+from roster.pagination import decodeCursor, encodeCursor, keysetPage
+from roster.views import STAFFORDERING, StaffListView
+
+
+class TestKeysetPage(TestCase):
+    """Test cases for keysetPage."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        # Duplicate names make the id tiebreaker matter.
+        Staff.objects.bulk_create(
+            [Staff(firstName=f"Name{index % 7}", lastName=f"Last{index % 3}") for index in range(45)]
+        )
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the values it was made from."""
+        self.assertEqual(decodeCursor(encodeCursor(["John", "", "Doe", 3])), ["John", "", "Doe", 3])
+
+    def test_malformed_cursor(self):
+        """Test that malformed cursors raise ValueError."""
+        for cursor in ["%%%", encodeCursor(["John"])[:-3], "eyJhIjogMX0="]:
+            with self.assertRaises(ValueError):
+                keysetPage(Staff.objects.all(), STAFFORDERING, cursor, 10)
+
+    def test_pages_cover_every_row_once(self):
+        """Test that walking the pages returns every staff in order."""
+        seen = []
+        cursor = None
+        while True:
+            page = keysetPage(Staff.objects.all(), STAFFORDERING, cursor, 10)
+            seen.extend(page.rows)
+            cursor = page.nextCursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(Staff.objects.order_by(*STAFFORDERING)))
+
+    def test_descending(self):
+        """Test pagination on a descending field."""
+        first = keysetPage(Staff.objects.all(), ["-id"], None, 20)
+        second = keysetPage(Staff.objects.all(), ["-id"], first.nextCursor, 20)
+        ids = [staff.id for staff in first.rows + second.rows]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(set(ids)), 40)
+
+    def test_one_query_per_page(self):
+        """Test that a page costs one query."""
+        page = keysetPage(Staff.objects.all(), STAFFORDERING, None, 10)
+        with self.assertNumQueries(1):
+            keysetPage(Staff.objects.all(), STAFFORDERING, page.nextCursor, 10)
+
+
+class TestStaffListPagination(TestCase):
+    """Test cases for the paginated StaffListView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        Staff.objects.bulk_create(
+            [Staff(firstName=f"Staff{index:03}", lastName="Test") for index in range(StaffListView.pageSize + 5)]
+        )
+        bumpStaffListVersion()
+
+    def test_first_page(self):
+        """Test that the list renders one page and a load more item."""
+        response = self.client.get(reverse("roster:staffsList"))
+        self.assertEqual(len(response.context["staffs"]), StaffListView.pageSize)
+        self.assertContains(response, 'id="staff-list-more"')
+        self.assertTemplateUsed(response, "_base.html")
+
+    def test_next_page_fragment(self):
+        """Test that htmx gets only the next page of list items."""
+        cursor = self.client.get(reverse("roster:staffsList")).context["nextCursor"]
+        response = self.client.get(reverse("roster:staffsList"), {"cursor": cursor}, HTTP_HX_REQUEST="true")
+        self.assertEqual(len(response.context["staffs"]), 5)
+        self.assertTemplateUsed(response, "roster/staff_list_page.html")
+        self.assertTemplateUsed(response, "_partial.html")
+        self.assertTemplateNotUsed(response, "_base.html")
+        self.assertNotContains(response, 'id="staff-list-more"')
+        self.assertNotContains(response, "<h1>")
+
+    def test_invalid_cursor(self):
+        """Test that an invalid cursor is a bad request."""
+        response = self.client.get(reverse("roster:staffsList"), {"cursor": "nonsense"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+"""Unittest for the group rotation scheduler."""
+
+import datetime
+
+from django.test import TestCase
+
+from roster.activity import ActivityMatrix
+from roster.models import Shift
+from roster.scheduler import rotationSchedule, splitGroups
+
+
+def makeMatrix(first: datetime.date, numberOfDays: int, values: list[tuple]) -> ActivityMatrix:
+    """Builds a matrix from (staffId, active, vacationDate, resumptionDate, group) tuples."""
+    dates = [first + datetime.timedelta(days=offset) for offset in range(numberOfDays)]
+    return ActivityMatrix.fromValues(dates, values)
+
+
+def shiftCounts(schedules) -> dict[int, list[int]]:
+    """Returns [mornings, afternoons] worked by each staff in the schedules."""
+    counts: dict[int, list[int]] = {}
+    for schedule in schedules:
+        for (_, shiftType), staffIds in schedule.items():
+            for staffId in staffIds:
+                counts.setdefault(staffId, [0, 0])[shiftType == Shift.AFTERNOONSHIFT] += 1
+    return counts
+
+
+class TestSplitGroups(TestCase):
+    """Test cases for splitGroups."""
+
+    def test_even_split(self):
+        """Test that two equal groups fill both shifts."""
+        self.assertEqual(splitGroups([(0, 0, [1, 2]), (0, 1, [3, 4])]), ([1, 2], [3, 4]))
+
+    def test_single_group_follows_balance(self):
+        """Test that a lone group works the shift it has worked least."""
+        self.assertEqual(splitGroups([(0, 0, [1, 2])]), ([1, 2], []))
+        self.assertEqual(splitGroups([(1, 0, [1, 2])]), ([], [1, 2]))
+
+
+class TestRotationSchedule(TestCase):
+    """Test cases for rotationSchedule.
+    Attributes:
+    - first: First date of the test matrices.
+    """
+
+    first = datetime.date(year=2024, month=1, day=1)
+
+    def test_groups_rotate_daily(self):
+        """Test that two groups swap shifts every day."""
+        matrix = makeMatrix(self.first, 4, [(1, True, None, None, 1), (2, True, None, None, 2)])
+        schedule = rotationSchedule([matrix])[0]
+        shifts = [
+            (schedule.get((date, Shift.MORNINGSHIFT)), schedule.get((date, Shift.AFTERNOONSHIFT)))
+            for date in matrix.dates
+        ]
+        self.assertEqual(shifts, [([1], [2]), ([2], [1]), ([1], [2]), ([2], [1])])
+
+    def test_respects_active_window(self):
+        """Test that staffs are only scheduled while active."""
+        vacationDate = self.first + datetime.timedelta(days=3)
+        matrix = makeMatrix(
+            self.first,
+            10,
+            [(1, True, vacationDate, None, 1), (2, True, None, None, 2), (3, False, None, None, 1)],
+        )
+        schedule = rotationSchedule([matrix])[0]
+        for (date, _), staffIds in schedule.items():
+            for staffId in staffIds:
+                self.assertTrue(matrix.isActive(staffId, date))
+        counts = shiftCounts([schedule])
+        self.assertEqual(sum(counts[1]), 3)
+        self.assertEqual(sum(counts[2]), 10)
+        self.assertNotIn(3, counts)
+
+    def test_balances_uneven_activity(self):
+        """Test that counts stay balanced when groups are partly inactive."""
+        values = []
+        for staffId in range(60):
+            resumptionDate = self.first + datetime.timedelta(days=staffId % 7) if staffId % 3 == 0 else None
+            values.append((staffId, True, None, resumptionDate, staffId % 5 + 1))
+        matrices = [makeMatrix(self.first + datetime.timedelta(days=31 * month), 31, values) for month in range(3)]
+        for mornings, afternoons in shiftCounts(rotationSchedule(matrices)).values():
+            self.assertLessEqual(abs(mornings - afternoons), 2)
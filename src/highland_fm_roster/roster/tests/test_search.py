@@ -0,0 +1,112 @@
+"""Unittest for the staff search."""
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from roster.models import Staff, normalizeName
+from roster.search import searchStaffs, searchTerms
+from roster.views import StaffSearchView
+
+
+class TestSearchFields(TestCase):
+    """Test cases for the normalized search fields of Staff."""
+
+    def test_normalizeName(self):
+        """Test that accents, punctuation and case are dropped."""
+        self.assertEqual(normalizeName("Ọlá-Dèjì"), "oladeji")
+        self.assertEqual(normalizeName("O'Neil"), "oneil")
+        self.assertEqual(searchTerms("  Abdul  a.  "), ["abdul", "a"])
+
+    def test_save_sets_search_fields(self):
+        """Test that save keeps the search fields up to date."""
+        staff = Staff.objects.create(firstName="Abdulqadir", middleName="Abubakar", lastName="Ahmad")
+        self.assertEqual(
+            (staff.firstNameSearch, staff.middleNameSearch, staff.lastNameSearch),
+            ("abdulqadir", "abubakar", "ahmad"),
+        )
+        staff.lastName = "Bello"
+        staff.save(update_fields=["lastName"])
+        staff.refresh_from_db()
+        self.assertEqual(staff.lastNameSearch, "bello")
+
+
+class TestSearchStaffs(TestCase):
+    """Test cases for searchStaffs and StaffSearchView."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        Staff.objects.create(firstName="John", lastName="Doe")
+        Staff.objects.create(firstName="Abdulqadir", middleName="Abubakar", lastName="Ahmad")
+        Staff.objects.create(firstName="Jane", middleName="Johnson", lastName="Smith")
+
+    def test_prefix_of_any_name_part(self):
+        """Test that a term matches the start of any name part."""
+        names = [str(staff) for staff in searchStaffs(["jo"], 10)]
+        self.assertEqual(names, ["Jane Johnson Smith", "John Doe"])
+        self.assertEqual([str(staff) for staff in searchStaffs(["ah"], 10)], ["Abdulqadir Abubakar Ahmad"])
+        self.assertEqual(list(searchStaffs(["oh"], 10)), [])
+
+    def test_every_term_must_match(self):
+        """Test that several terms narrow the search."""
+        self.assertEqual([str(staff) for staff in searchStaffs(["jo", "d"], 10)], ["John Doe"])
+
+    def test_view_caps_results(self):
+        """Test that the view returns at most `limit` staffs."""
+        Staff.objects.bulk_create(
+            [Staff(firstName=f"Musa{index}", lastName="Test", firstNameSearch=f"musa{index}") for index in range(30)]
+        )
+        response = self.client.get(reverse("roster:searchStaffs"), {"q": "Musa"})
+        self.assertEqual(len(response.context["staffs"]), StaffSearchView.limit)
+
+    def test_view_repeated_search(self):
+        """Test that an htmx search with the terms the page already shows gets no content."""
+        url = reverse("roster:searchStaffs")
+        first = self.client.get(url, {"q": "jo", "shown": ""}, HTTP_HX_REQUEST="true")
+        self.assertContains(first, "John Doe")
+        self.assertContains(first, 'id="staff-search-shown" value="jo"')
+        with self.assertNumQueries(0):
+            repeated = self.client.get(url, {"q": "Jo ", "shown": "jo"}, HTTP_HX_REQUEST="true")
+        self.assertEqual(repeated.status_code, 204)
+        changed = self.client.get(url, {"q": "jan", "shown": "jo"}, HTTP_HX_REQUEST="true")
+        self.assertContains(changed, "Jane Johnson Smith")
+
+    def test_view_shared_address(self):
+        """Test that clients sharing an address each get the results of the same search."""
+        url = reverse("roster:searchStaffs")
+        for client in (self.client, self.client_class()):
+            response = client.get(url, {"q": "jo", "shown": ""}, HTTP_HX_REQUEST="true", REMOTE_ADDR="10.0.0.1")
+            self.assertContains(response, "John Doe")
+
+    def test_view_empty_query(self):
+        """Test that an empty query does not touch the database."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("roster:searchStaffs"), {"q": " "})
+        self.assertNotContains(response, "No staff found.")
+
+
+@skipUnless(connection.vendor == "sqlite", "The query plan assertions are written for SQLite.")
+class TestSearchQueryPlan(TestCase):
+    """Test that searches are index range scans on a large table."""
+
+    def setUp(self):
+        """Seeds 50k staffs."""
+        staffs = [
+            Staff(firstName=f"First{index}", middleName=f"Middle{index}", lastName=f"Last{index}")
+            for index in range(50_000)
+        ]
+        for staff in staffs:
+            staff.setSearchNames()
+        Staff.objects.bulk_create(staffs, batch_size=2000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_uses_search_indexes(self):
+        """Test that the query plan searches every name index and scans no table."""
+        plan = searchStaffs(searchTerms("last1234"), StaffSearchView.limit).explain()
+        for index in ["staff_first_search_idx", "staff_middle_search_idx", "staff_last_search_idx"]:
+            self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn("SCAN roster_staff", plan)
+        self.assertEqual(len(searchStaffs(["last1234"], 20)), 11)
@@ -0,0 +1,88 @@
+"""Unittest for the seed and bench management commands."""
+
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from roster.benchmarking import BENCHMARKS
+from roster.models import Day, Roster, Shift, Staff, StaffRosterAssignment
+from roster.seeding import addMonths, seedDatabase
+
+
+class TestSeedDatabase(TestCase):
+    """Test cases for seedDatabase and the seed command."""
+
+    def test_counts(self):
+        """Test that the reported counts match the created rows."""
+        counts = seedDatabase(40, 2, datetime.date(2024, 1, 15))
+        self.assertEqual(counts["staffs"], Staff.objects.count())
+        self.assertEqual(counts["rosters"], 2)
+        self.assertEqual(counts["assignments"], StaffRosterAssignment.objects.count())
+        self.assertEqual(counts["days"], 31 + 29)
+        self.assertEqual(counts["shifts"], Shift.objects.count())
+        self.assertEqual(counts["shiftStaffs"], Shift.staffs.through.objects.count())
+        self.assertEqual(list(Roster.objects.order_by("date").values_list("date", flat=True)), [
+            datetime.date(2024, 1, 1), datetime.date(2024, 2, 1),
+        ])
+
+    def test_deterministic(self):
+        """Test that the same seed produces the same data."""
+        def snapshot():
+            return (
+                list(Staff.objects.order_by("id").values_list("firstName", "middleName", "lastName")),
+                list(StaffRosterAssignment.objects.order_by("id").values_list("group", "active", "vacationDate")),
+            )
+
+        seedDatabase(30, 1, datetime.date(2024, 3, 1), seed=7)
+        first = snapshot()
+        Staff.objects.all().delete()
+        Roster.objects.all().delete()
+        Day.objects.all().delete()
+        seedDatabase(30, 1, datetime.date(2024, 3, 1), seed=7)
+        self.assertEqual(snapshot(), first)
+
+    def test_addMonths(self):
+        """Test that months roll over into the next year."""
+        self.assertEqual(addMonths(datetime.date(2024, 11, 20), 3), datetime.date(2025, 2, 1))
+
+    def test_command(self):
+        """Test the seed command and its --clear option."""
+        output = StringIO()
+        call_command("seed", "--staffs=10", "--rosters=1", "--start=2024-05", stdout=output)
+        call_command("seed", "--staffs=12", "--rosters=1", "--start=2024-05", "--clear", stdout=output)
+        self.assertIn("Seeded 12 staffs", output.getvalue())
+        self.assertEqual(Staff.objects.count(), 12)
+        self.assertEqual(Roster.objects.count(), 1)
+
+
+class TestBenchCommand(TestCase):
+    """Test cases for the bench command."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        seedDatabase(60, 1, datetime.date(2024, 1, 1))
+
+    def test_output_and_compare(self):
+        """Test that every benchmark runs and that a previous run can be compared."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            call_command("bench", repeat=1, output=path, stdout=StringIO())
+            with open(path) as file:
+                results = json.load(file)
+            self.assertEqual(set(results), set(BENCHMARKS))
+            self.assertEqual(results["staffList"]["queries"], 2)
+            output = StringIO()
+            call_command("bench", "staffSearch", repeat=1, compare=path, stdout=output)
+        self.assertIn("staffSearch", output.getvalue())
+        self.assertNotIn("staffList ", output.getvalue())
+
+    def test_unknown_benchmark(self):
+        """Test that unknown benchmark names are rejected."""
+        with self.assertRaises(CommandError):
+            call_command("bench", "nonsense", stdout=StringIO())
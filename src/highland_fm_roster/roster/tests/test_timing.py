@@ -0,0 +1,102 @@
+"""Unittest for the Server-Timing middleware and the timing stats."""
+
+import re
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from roster.models import Staff
+from roster.timing import RequestTiming, ServerTimingMiddleware, TimingLog, percentile, timingLog
+
+SERVERTIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+), total;dur=[\d.]+')
+
+
+class TestServerTiming(TestCase):
+    """Test cases for the Server-Timing header."""
+
+    def setUp(self):
+        """setUp method - runs before each test."""
+        Staff.objects.create(firstName="John", lastName="Doe")
+        timingLog.clear()
+
+    def serverTiming(self, response) -> tuple[int, float]:
+        """Returns the query count and the template time of a response."""
+        match = SERVERTIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        return int(match[1]), float(match[2])
+
+    def test_sync_view(self):
+        """Test the header of a sync view."""
+        queries, templateTime = self.serverTiming(self.client.get(reverse("roster:newStaff")))
+        self.assertEqual(queries, 0)
+        self.assertGreater(templateTime, 0)
+
+    def test_async_view(self):
+        """Test that the queries of an async view are counted."""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("roster:staffsList"))
+        self.assertEqual(self.serverTiming(response)[0], 2)
+
+    async def test_async_client(self):
+        """Test the header under ASGI."""
+        response = await self.async_client.get(reverse("roster:staffsList"))
+        self.assertEqual(self.serverTiming(response)[0], 2)
+
+    def test_log(self):
+        """Test that requests are logged per view."""
+        for _ in range(3):
+            self.client.get(reverse("roster:staffsList"))
+        self.client.get(reverse("roster:newStaff"))
+        counts = {row["view"]: row["count"] for row in timingLog.stats()}
+        self.assertEqual(counts, {"roster:staffsList": 3, "roster:newStaff": 1})
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        """Test that the middleware removes itself when disabled."""
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: HttpResponse())
+
+
+class TestTimingLog(TestCase):
+    """Test cases for the timing ring buffer."""
+
+    def test_percentile(self):
+        """Test nearest rank percentiles."""
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 90), 7)
+
+    def test_ring_buffer(self):
+        """Test that only the latest timings are kept."""
+        log = TimingLog(size=10)
+        timing = RequestTiming()
+        timing.queries = 2
+        for total in range(1, 21):
+            log.add("view", total / 1000, timing)
+        [row] = log.stats()
+        self.assertEqual(row["count"], 10)
+        self.assertAlmostEqual(row["p50"], 15)
+        self.assertAlmostEqual(row["p99"], 20)
+        self.assertEqual(row["queries"], 2)
+
+
+class TestTimingStatsView(TestCase):
+    """Test cases for the timing stats page."""
+
+    def test_staff_only(self):
+        """Test that the page is only shown to staff users."""
+        url = reverse("roster:timingStats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        user = User.objects.create_user("user", password="password")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        user.is_staff = True
+        user.save()
+        timingLog.clear()
+        self.client.get(reverse("roster:newStaff"))
+        response = self.client.get(url)
+        self.assertContains(response, "roster:newStaff")
@@ -0,0 +1,181 @@
+"""Query budget tests for the roster views."""
+
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from roster.models import Staff
+from roster.views import StaffListView
+
+from .budget import QueryBudgetTestCase
+
+
+class TestHomeBudget(QueryBudgetTestCase):
+    """Query budget for the home page."""
+
+    def test_get(self):
+        """The home page does not query the database."""
+        with self.assertBudget(0):
+            response = self.client.get(reverse("roster:home"))
+        self.assertEqual(response.status_code, 200)
+
+
+class TestStaffListViewBudget(QueryBudgetTestCase):
+    """Query budget for StaffListView."""
+
+    def test_first_page(self):
+        """The first page costs a validator query and a page query."""
+        with self.assertBudget(2):
+            response = self.client.get(reverse("roster:staffsList"))
+        self.assertEqual(len(response.context["staffs"]), StaffListView.pageSize)
+
+    def test_next_page(self):
+        """A later htmx page costs a validator query and a page query."""
+        cursor = self.client.get(reverse("roster:staffsList")).context["nextCursor"]
+        with self.assertBudget(2):
+            response = self.client.get(reverse("roster:staffsList"), {"cursor": cursor}, HTTP_HX_REQUEST="true")
+        self.assertEqual(len(response.context["staffs"]), StaffListView.pageSize)
+
+    def test_not_modified(self):
+        """An unchanged list costs the validator query and renders nothing."""
+        etag = self.client.get(reverse("roster:staffsList"))["ETag"]
+        with self.assertBudget(1):
+            response = self.client.get(reverse("roster:staffsList"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+
+class TestStaffCalendarViewBudget(QueryBudgetTestCase):
+    """Query budget for StaffCalendarView."""
+
+    def test_cold(self):
+        """A feed that is not cached costs a staff query and a shift query."""
+        with self.assertBudget(2):
+            response = self.client.get(reverse("roster:staffCalendar", args=[self.staffs[0].id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_warm(self):
+        """A cached feed does not query the database."""
+        url = reverse("roster:staffCalendar", args=[self.staffs[0].id])
+        etag = self.client.get(url)["ETag"]
+        with self.assertBudget(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertBudget(0):
+            response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+
+class TestStaffSearchViewBudget(QueryBudgetTestCase):
+    """Query budget for StaffSearchView."""
+
+    def test_search(self):
+        """A search costs one query."""
+        with self.assertBudget(1):
+            response = self.client.get(reverse("roster:searchStaffs"), {"q": "staff00"})
+        self.assertEqual(len(response.context["staffs"]), 20)
+
+
+class TestCreateStaffViewBudget(QueryBudgetTestCase):
+    """Query budget for CreateStaffView."""
+
+    def test_get(self):
+        """The empty form does not query the database."""
+        with self.assertBudget(0):
+            self.client.get(reverse("roster:newStaff"))
+
+    def test_post(self):
+        """Creating a staff costs one insert."""
+        with self.assertBudget(1):
+            response = self.client.post(reverse("roster:newStaff"), {"firstName": "John", "lastName": "Doe"})
+        self.assertRedirects(response, reverse("roster:staffsList"), fetch_redirect_response=False)
+
+
+class TestStaffActionsViewBudget(QueryBudgetTestCase):
+    """Query budget for each verb of StaffActionsView."""
+
+    def test_get(self):
+        """The edit form costs one query."""
+        with self.assertBudget(1):
+            response = self.client.get(reverse("roster:staffActions", args=[self.staffs[0].id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_put(self):
+        """An edit costs a single conditional write."""
+        staff = self.staffs[0]
+        data = {
+            "firstName": "Jane",
+            "initial-firstName": staff.firstName,
+            "middleName": staff.middleName,
+            "initial-middleName": staff.middleName,
+            "lastName": staff.lastName,
+            "initial-lastName": staff.lastName,
+            "updatedAt": staff.updatedAt.isoformat(),
+        }
+        with self.assertBudget(1):
+            response = self.client.put(
+                reverse("roster:staffActions", args=[staff.id]),
+                urlencode(data),
+                content_type="application/x-www-form-urlencoded",
+            )
+        self.assertEqual(response["HX-Retarget"], f"#staff-{staff.id}")
+
+    def test_delete(self):
+        """A delete costs a read plus the cascade, however many shifts the staff has."""
+        staff = self.staffs[0]
+        self.assertGreater(staff.shifts.count(), 0)
+        # Read, then one fast delete each for assignments, shift counts, shift links and the staff, and the tombstone.
+        with self.assertBudget(6):
+            self.client.delete(reverse("roster:staffActions", args=[staff.id]))
+        self.assertFalse(Staff.objects.filter(id=staff.id).exists())
+
+
+class TestStaffBatchViewBudget(QueryBudgetTestCase):
+    """Query budget for the batch staff actions, which must not grow with the selection."""
+
+    def test_delete(self):
+        """Deleting many staffs costs the same as deleting one."""
+        ids = [staff.id for staff in self.staffs[:100]]
+        # Read, then one delete each for assignments, shift counts, shift links and the staffs,
+        # and one insert of their tombstones, in a savepoint.
+        with self.assertBudget(8):
+            response = self.client.post(reverse("roster:batchStaffs"), {"ids": ids, "action": "delete"})
+        self.assertContains(response, "100 staffs deleted.")
+
+    def test_edit(self):
+        """Renaming many staffs costs an update and a read."""
+        ids = [staff.id for staff in self.staffs[:100]]
+        with self.assertBudget(4):
+            response = self.client.post(reverse("roster:batchStaffs"), {"ids": ids, "action": "edit", "lastName": "Doe"})
+        self.assertContains(response, "100 staffs updated.")
+
+
+class TestRosterMonthViewBudget(QueryBudgetTestCase):
+    """Query budget for RosterMonthView."""
+
+    def test_get(self):
+        """A month costs a validator query and one query per level of days, shifts and staffs."""
+        month = self.rosters[0].date
+        with self.assertBudget(4):
+            response = self.client.get(reverse("roster:rosterMonth", args=[month.year, month.month]))
+        self.assertEqual(len(response.context["days"]), 31)
+
+
+class TestApiListViewBudget(QueryBudgetTestCase):
+    """Query budget for ApiListView."""
+
+    def test_staffs(self):
+        """A page of staffs is one query."""
+        with self.assertBudget(1):
+            response = self.client.get(reverse("roster:apiList", args=["staffs"]), {"limit": 100})
+        self.assertEqual(len(response.json()["results"]), 100)
+
+    def test_shifts(self):
+        """A page of shifts with their staffs is a shift query and a through table query."""
+        with self.assertBudget(2):
+            response = self.client.get(reverse("roster:apiList", args=["shifts"]), {"limit": 1000})
+        self.assertEqual(len(response.json()["results"]), 2 * (31 + 29))
+
+    def test_shifts_without_staffs(self):
+        """Leaving out the staffs leaves out the through table query."""
+        with self.assertBudget(1):
+            self.client.get(reverse("roster:apiList", args=["shifts"]), {"fields": "date,shiftType"})
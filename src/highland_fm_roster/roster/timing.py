@@ -0,0 +1,190 @@
+"""Request timing with `Server-Timing` headers and per view percentiles.
+`ServerTimingMiddleware` measures each request's total time, the count and
+time of its queries and the time spent rendering templates. It sends them in
+a `Server-Timing` header, which browser devtools show for htmx requests too,
+and keeps the latest timings of each view in `timingLog`.
+
+Async views run their queries on another thread's connection, so instead of
+wrapping the request's connection, `recordQuery` is added to the execute
+wrappers of every connection when it is created. It records into the timing
+of the current request, which a context variable carries across threads.
+Set `SERVER_TIMING = False` to remove the middleware altogether.
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.backends.django import DjangoTemplates, Template
+
+RECORDSIZE = 500
+PERCENTILES = (50, 90, 99)
+
+
+class RequestTiming:
+    """The timings of one request.
+    Attributes:
+    - queries: The number of queries.
+    - queryTime: Seconds spent in queries.
+    - templateTime: Seconds spent rendering templates.
+    - rendering: Whether a template is being rendered, so nested renders are not counted twice.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.queryTime = 0.0
+        self.templateTime = 0.0
+        self.rendering = False
+
+
+currentTiming: ContextVar[RequestTiming | None] = ContextVar("currentTiming", default=None)
+
+
+def recordQuery(execute, sql, params, many, context):
+    """An execute wrapper that adds each query to the current request's timing."""
+    timing = currentTiming.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.queries += 1
+        timing.queryTime += time.perf_counter() - start
+
+
+def installQueryTimer(connection) -> None:
+    """Adds `recordQuery` to the execute wrappers of a connection."""
+    if recordQuery not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, recordQuery)
+
+
+class TimedTemplate(Template):
+    """A template that adds its render time to the current request's timing."""
+
+    def render(self, context=None, request=None):
+        """Renders the template."""
+        timing = currentTiming.get()
+        if timing is None or timing.rendering:
+            return super().render(context, request)
+        timing.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.rendering = False
+            timing.templateTime += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend with render timing."""
+
+    def from_string(self, template_code):
+        """Compiles a template from a string."""
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        """Loads a template by name."""
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def percentile(values: list[float], rank: int) -> float:
+    """Returns the nearest rank percentile of sorted values."""
+    index = max(0, -(-rank * len(values) // 100) - 1)
+    return values[index]
+
+
+class TimingLog:
+    """A ring buffer of the latest request timings of each view.
+    Attributes:
+    - size: How many timings are kept per view.
+    """
+
+    def __init__(self, size: int = RECORDSIZE):
+        self.size = size
+        self.records: dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def add(self, view: str, total: float, timing: RequestTiming) -> None:
+        """Records the timing of a request to a view."""
+        with self.lock:
+            records = self.records.setdefault(view, deque(maxlen=self.size))
+            records.append((total, timing.queries, timing.queryTime, timing.templateTime))
+
+    def clear(self) -> None:
+        """Forgets every timing."""
+        with self.lock:
+            self.records.clear()
+
+    def stats(self) -> list[dict]:
+        """Returns the percentiles of each view in milliseconds, slowest median first."""
+        with self.lock:
+            snapshot = {view: list(records) for view, records in self.records.items()}
+        rows = []
+        for view, records in snapshot.items():
+            totals = sorted(record[0] * 1000 for record in records)
+            row = {"view": view, "count": len(records)}
+            for rank in PERCENTILES:
+                row[f"p{rank}"] = percentile(totals, rank)
+            row["queries"] = sum(record[1] for record in records) / len(records)
+            row["queryMs"] = sum(record[2] for record in records) * 1000 / len(records)
+            row["templateMs"] = sum(record[3] for record in records) * 1000 / len(records)
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["p50"], reverse=True)
+
+
+timingLog = TimingLog()
+
+
+class ServerTimingMiddleware:
+    """Adds a `Server-Timing` header to responses and logs the timings per view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.isAsync = iscoroutinefunction(get_response)
+        if self.isAsync:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Times a request."""
+        if self.isAsync:
+            return self.acall(request)
+        timing = RequestTiming()
+        token = currentTiming.set(timing)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            currentTiming.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    async def acall(self, request):
+        """Times a request served asynchronously."""
+        timing = RequestTiming()
+        token = currentTiming.set(timing)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            currentTiming.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    def finish(self, request, response, timing: RequestTiming, total: float):
+        """Adds the header and logs the timing."""
+        response["Server-Timing"] = (
+            f'db;dur={timing.queryTime * 1000:.1f};desc="{timing.queries} queries", '
+            f"tpl;dur={timing.templateTime * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            timingLog.add(match.view_name, total, timing)
+        return response
@@ -0,0 +1,52 @@
+"""Tombstones of deleted rows, for API pollers.
+Delta sync with `since` only sees rows that still exist, so every deleted
+staff, roster, day and shift leaves a `DeletedRow` behind, written from the
+`post_delete` signal, see `roster.signals`. Bulk deletes of days and shifts
+would write one row per deleted row that way; inside `recordedDeletions`
+the tombstones are collected instead and inserted with one `bulk_create`.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .models import Day, DeletedRow, Roster, Shift, Staff
+
+MODELRESOURCES = {Staff: "staffs", Roster: "rosters", Day: "days", Shift: "shifts"}
+
+pendingTombstones: ContextVar[list[DeletedRow] | None] = ContextVar("pendingTombstones", default=None)
+
+
+@contextmanager
+def recordedDeletions(batchSize: int | None = None) -> Iterator[None]:
+    """Collects the tombstones of the rows deleted inside and inserts them at once on exit.
+    Use it inside the transaction that deletes the rows.
+    Parameters:
+    - batchSize: Optional batch size for the `bulk_create` call.
+    """
+    if pendingTombstones.get() is not None:
+        yield
+        return
+    tombstones: list[DeletedRow] = []
+    token = pendingTombstones.set(tombstones)
+    try:
+        yield
+    finally:
+        pendingTombstones.reset(token)
+    DeletedRow.objects.bulk_create(tombstones, batch_size=batchSize)
+
+
+def recordDeletion(model, rowId: int) -> None:
+    """Records the deletion of a row of a model exposed by the API.
+    Parameters:
+    - model: The model of the deleted row.
+    - rowId: The id of the deleted row.
+    """
+    resource = MODELRESOURCES.get(model)
+    if resource is None:
+        return
+    tombstone = DeletedRow(resource=resource, rowId=rowId)
+    tombstones = pendingTombstones.get()
+    if tombstones is None:
+        tombstone.save()
+    else:
+        tombstones.append(tombstone)
@@ -10,5 +10,19 @@ urlpatterns = [
     path('', TemplateView.as_view(template_name='roster/home.html'), name='home'),
     path('staffs/', views.StaffListView.as_view(), name='staffsList'),
     path('staffs/new/', views.CreateStaffView.as_view(), name='newStaff'),
-    path('staffs/<int:id>/', views.StaffActionsView.as_view(), name='staffActions')
+    path('staffs/import/', views.ImportStaffsView.as_view(), name='importStaffs'),
+    path('staffs/batch/', views.StaffBatchView.as_view(), name='batchStaffs'),
+    path('staffs/search/', views.StaffSearchView.as_view(), name='searchStaffs'),
+    path('staffs/<int:id>/', views.StaffActionsView.as_view(), name='staffActions'),
+    path('staffs/<int:id>/shifts.ics', views.StaffCalendarView.as_view(), name='staffCalendar'),
+    path('rosters/<int:year>/<int:month>/', views.RosterMonthView.as_view(), name='rosterMonth'),
+    path('rosters/<int:year>/<int:month>/clone/', views.CloneRosterView.as_view(), name='cloneRoster'),
+    path('rosters/<int:year>/<int:month>/generate/', views.GenerateRosterView.as_view(), name='generateRoster'),
+    path('rosters/fairness/<int:year>/', views.FairnessReportView.as_view(), name='fairnessReport'),
+    path('rosters/fairness/<int:year>/<int:month>/', views.FairnessReportView.as_view(), name='fairnessMonthReport'),
+    path('rosters/export.<str:format>', views.RosterExportView.as_view(), name='exportRoster'),
+    path('jobs/<int:id>/', views.JobStatusView.as_view(), name='jobStatus'),
+    path('jobs/<int:id>/output/', views.JobOutputView.as_view(), name='jobOutput'),
+    path('api/<str:resource>/', views.ApiListView.as_view(), name='apiList'),
+    path('stats/timing/', views.TimingStatsView.as_view(), name='timingStats'),
 ]
@@ -1,22 +1,86 @@
+import calendar
+import csv
+import datetime
+import io
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import BadRequest, ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.http import HttpRequest as HttpRequestBase
-from django.http import HttpResponse, QueryDict
-from django.shortcuts import get_object_or_404, redirect, render, reverse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render, reverse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
 from django.views import View
-from django.views.generic import ListView
+from django.views.generic import ListView, TemplateView
 from django_htmx.middleware import HtmxDetails
 
-from .forms import StaffForm
-from .models import Staff
+from .api import RESOURCES, apage, dumpPage, parsePageSize, parseSince
+from .batch import deleteStaffs, editStaffs
+from .caching import astaffListVersion
+from .calendars import calendarDays, monthRange, monthWeeks
+from .conditional import ConditionalGetMixin, isPartial
+from .counters import fairnessRows
+from .editing import aupdateStaff
+from .export import astream, exportRows, parseMonth, streamCsv, streamXlsx
+from .feeds import astaffFeed
+from .forms import StaffBatchForm, StaffEditForm, StaffForm, StaffImportForm
+from .imports import importStaffs, readStaffRows
+from .jobs import EXPORTTYPES, enqueueJob
+from .models import Day, Job, Roster, Shift, Staff
+from .pagination import akeysetPage
+from .search import searchStaffs, searchTerms
+from .timing import timingLog
+
+# Staff.Meta.ordering with the id as a tiebreaker, backed by staff_ordering_idx.
+STAFFORDERING = [*Staff._meta.ordering, "id"]
 
 
 class HttpRequest(HttpRequestBase):
     htmx: HtmxDetails
 
 
-class StaffListView(ListView):
+class StaffListView(ConditionalGetMixin, ListView):
+    """Lists staffs one keyset page at a time.
+    Requests with a `cursor` parameter return the next page of list items,
+    which htmx swaps in place of the "load more" item of the previous page.
+    The rendered items are cached, see `roster.caching`, and unchanged
+    staffs are answered with `304 Not Modified`. The view is async, so
+    under ASGI it waits for the database without holding a thread.
+    Attributes:
+    - pageSize: The number of staffs in a page.
+    - pageTemplateName: The template for pages after the first.
+    """
     model = Staff
     context_object_name = "staffs"
     template_name = "roster/staff_list.html"
+    pageTemplateName = "roster/staff_list_page.html"
+    pageSize = 50
+
+    async def get(self, request, *args, **kwargs):
+        """Returns the requested page of staffs."""
+        try:
+            self.page = await akeysetPage(Staff.objects.all(), STAFFORDERING, request.GET.get("cursor"), self.pageSize)
+        except ValueError:
+            raise BadRequest("Invalid cursor.")
+        self.object_list = self.page.rows
+        self.staffListVersion = await astaffListVersion()
+        return self.render_to_response(self.get_context_data())
+
+    def get_template_names(self):
+        """Returns the page template when a cursor is given."""
+        if "cursor" in self.request.GET:
+            return [self.pageTemplateName]
+        return [self.template_name]
+
+    def get_context_data(self, **kwargs):
+        """Adds the cursors and the staff list version to the context."""
+        context = super().get_context_data(**kwargs)
+        context["cursor"] = self.request.GET.get("cursor", "")
+        context["nextCursor"] = self.page.nextCursor
+        context["staffListVersion"] = self.staffListVersion
+        return context
 
 
 class CreateStaffView(View):
@@ -35,38 +99,56 @@ class CreateStaffView(View):
             return redirect(reverse("roster:staffsList"))
 
 
+class ImportStaffsView(View):
+    """A view for importing staffs from a CSV file."""
+
+    def get(self, request):
+        """Returns the upload form."""
+        return render(request, "roster/import_staffs.html", {"form": StaffImportForm()})
+
+    def post(self, request):
+        """Imports the uploaded file and returns a summary."""
+        form = StaffImportForm(request.POST, request.FILES)
+        summary = None
+        if form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data["file"].file, encoding="utf-8-sig", newline="")
+            try:
+                summary = importStaffs(readStaffRows(lines))
+            except UnicodeDecodeError:
+                form.add_error("file", "The file is not UTF-8 text.")
+            except (ValueError, csv.Error) as error:
+                form.add_error("file", str(error))
+        return render(request, "roster/import_summary.html", {"form": form, "summary": summary})
+
+
 class StaffActionsView(View):
-    """View for staff actions like editing and deleting."""
+    """View for staff actions like editing and deleting.
+    Django views must be all sync or all async, so the writes are async too.
+    """
 
-    def get(self, request, id):
+    async def get(self, request, id):
         """Returns a form for editing a Staff."""
-        staff = get_object_or_404(Staff, pk=id)
-        form = StaffForm(
-            initial=dict(
-                firstName=staff.firstName,
-                middleName=staff.middleName,
-                lastName=staff.lastName,
-            )
-        )
+        staff = await aget_object_or_404(Staff, pk=id)
         return render(
-            request, "roster/staff_edit_modal.html", {"form": form, "staff": staff}
+            request, "roster/staff_edit_modal.html", {"form": StaffEditForm.forStaff(staff), "staff": staff}
         )
 
-    def put(self, request, id):
-        """Edits a staff."""
-        staff = get_object_or_404(Staff, pk=id)
-        form = StaffForm(QueryDict(request.body.decode()), instance=staff)
+    async def put(self, request, id):
+        """Edits a staff if nobody else edited it since its form was rendered.
+        The edit is a single conditional UPDATE, and the row is rendered from
+        the names it matched and set. A conflicting edit gets the form again
+        with the current names and a `409 Conflict`.
+        """
+        form = StaffEditForm(QueryDict(request.body.decode()))
         if not form.is_valid():
-            return render(
-                request,
-                "roster/staff_edit_modal.html",
-                {
-                    "form": form,
-                    "staff": staff,
-                },
-            )
-        form.save()
-        response = render(
+            staff = await aget_object_or_404(Staff, pk=id)
+            return self.modal(request, {"form": form, "staff": staff})
+        staff = await aupdateStaff(id, form.cleaned_data["updatedAt"], form.names(), form.renderedNames)
+        if staff is None:
+            staff = await aget_object_or_404(Staff, pk=id)
+            return self.modal(request, {"form": StaffEditForm.forStaff(staff), "staff": staff, "conflict": True}, 409)
+        # The item is a cached fragment, whose cache calls must not run on the event loop.
+        response = await sync_to_async(render)(
             request,
             "roster/staff_list_item.html",
             {
@@ -77,11 +159,355 @@ class StaffActionsView(View):
         response['HX-Reswap'] = "outerHTML"
         return response
 
-    def delete(self, request, id):
+    def modal(self, request, context: dict, status: int = 200):
+        """Opens the edit modal again, with the form's errors or the current names.
+        The submitted modal closed and is removed, see `app.js`, so the new
+        one is added to the modal container rather than swapped into it.
+        """
+        response = render(request, "roster/staff_edit_modal.html", context, status=status)
+        response['HX-Retarget'] = "#modal-container"
+        response['HX-Reswap'] = "beforeend"
+        return response
+
+    async def delete(self, request, id):
         """Deletes a staff."""
-        staff = get_object_or_404(Staff, id=id)
-        staff.delete()
+        staff = await aget_object_or_404(Staff, id=id)
+        await staff.adelete()
         response = HttpResponse()
         response['hx-retarget'] = f"#staff-{id}"
         response['hx-reswap'] = 'delete'
         return response
+
+
+class StaffBatchView(View):
+    """Deletes or renames the staffs ticked on the staff list in one request.
+    The response updates the list with htmx out of band swaps: deleted
+    staffs are removed and edited ones replaced, whatever their number.
+    """
+
+    def post(self, request):
+        """Applies the batch action and returns the swaps."""
+        form = StaffBatchForm(request.POST)
+        if not form.is_valid():
+            # htmx swaps 422 responses, see app.js, so the errors are shown.
+            return render(request, "roster/staff_batch_result.html", {"form": form}, status=422)
+        ids = sorted(form.cleaned_data["ids"])
+        context = {"form": form}
+        if form.cleaned_data["action"] == StaffBatchForm.DELETE:
+            context["deleted"] = deleteStaffs(ids)
+            context["deletedIds"] = ids
+        else:
+            context["staffs"] = editStaffs(ids, form.names())
+        return render(request, "roster/staff_batch_result.html", context)
+
+
+class StaffCalendarView(View):
+    """A staff's shifts as an iCalendar feed for calendar apps.
+    Feeds are cached, see `roster.feeds`, so a poll of an unchanged feed
+    makes no queries and is answered `304 Not Modified` when the client
+    sends the feed's ETag.
+    """
+
+    async def get(self, request, id):
+        """Returns the feed of the staff."""
+        feed = await astaffFeed(id)
+        if feed is None:
+            raise Http404("No such staff.")
+        etag, content = feed
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type="text/calendar; charset=utf-8")
+            response["Content-Disposition"] = f'inline; filename="staff-{id}-shifts.ics"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class StaffSearchView(View):
+    """Search as you type for staffs by name prefix.
+    The page debounces keystrokes and sends the terms of the results it
+    shows as `shown`; the server answers an htmx search whose normalized
+    terms equal those, like typing a space or changing case, with
+    `204 No Content` so the results stay. The state lives in the page, so
+    clients behind one address never see each other's searches.
+    Attributes:
+    - limit: The most staffs returned.
+    """
+    limit = 20
+
+    async def get(self, request):
+        """Returns the staffs matching the `q` parameter."""
+        terms = searchTerms(request.GET.get("q", ""))
+        if request.htmx and "shown" in request.GET and searchTerms(request.GET["shown"]) == terms:
+            return HttpResponse(status=204)
+        staffs = [staff async for staff in searchStaffs(terms, self.limit)] if terms else []
+        return render(request, "roster/staff_search_results.html", {"staffs": staffs, "terms": terms})
+
+
+class RosterMonthView(ConditionalGetMixin, TemplateView):
+    """A month calendar of the generated shifts.
+    htmx requests for another month get just the calendar, which replaces
+    the current one. The view is async, like `StaffListView`.
+    Attributes:
+    - partialTemplateName: The template for htmx month switches.
+    """
+    template_name = "roster/roster_month.html"
+    partialTemplateName = "roster/roster_month_calendar.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        """Checks the month of the url."""
+        if not 1 <= kwargs["month"] <= 12 or not datetime.MINYEAR < kwargs["year"] < datetime.MAXYEAR:
+            raise Http404("Invalid month.")
+        return super().dispatch(request, *args, **kwargs)
+
+    def validatorQuerysets(self):
+        """Returns the days and shifts of the month and the staffs.
+        Changing the staffs of a shift sets the shift's `updatedAt`, see
+        `roster.signals.touchShifts` and `roster.generation.patchAssignment`.
+        """
+        first, last = monthRange(self.kwargs["year"], self.kwargs["month"])
+        return [
+            Day.objects.filter(date__range=(first, last)),
+            Shift.objects.filter(day__date__range=(first, last)),
+            Staff.objects.all(),
+        ]
+
+    async def get(self, request, *args, **kwargs):
+        """Returns the calendar of the month."""
+        self.days = [day async for day in calendarDays(self.kwargs["year"], self.kwargs["month"])]
+        return self.render_to_response(self.get_context_data(**kwargs))
+
+    def get_template_names(self):
+        """Returns the calendar alone for htmx month switches."""
+        if isPartial(self.request):
+            return [self.partialTemplateName]
+        return [self.template_name]
+
+    def get_context_data(self, **kwargs):
+        """Adds the month, its weeks and the neighbouring months to the context."""
+        context = super().get_context_data(**kwargs)
+        year, month = self.kwargs["year"], self.kwargs["month"]
+        first, last = monthRange(year, month)
+        context["month"] = first
+        context["days"] = self.days
+        context["weeks"] = monthWeeks(year, month, self.days)
+        context["weekdays"] = list(calendar.day_abbr)
+        context["previousMonth"] = first - datetime.timedelta(days=1)
+        context["nextMonth"] = last + datetime.timedelta(days=1)
+        return context
+
+
+def checkMonth(year: int, month: int) -> datetime.date:
+    """Returns the first date of the month of a url.
+    Raises:
+    - Http404: If the month is invalid.
+    """
+    if not 1 <= month <= 12 or not datetime.MINYEAR < year < datetime.MAXYEAR:
+        raise Http404("Invalid month.")
+    return datetime.date(year, month, 1)
+
+
+def jobResponse(request, job: Job):
+    """Answers a request that queued a job.
+    htmx requests get the job's status fragment, which polls until the job
+    is finished; other requests are sent to the job's page.
+    """
+    if not request.htmx:
+        return redirect(reverse("roster:jobStatus", args=[job.id]))
+    return render(request, "roster/job_status.html", jobContext(job), status=202)
+
+
+def jobConflict(request, error):
+    """Answers `409 Conflict` with the reason a job cannot be queued, which htmx swaps in."""
+    return render(request, "roster/job_error.html", {"error": error}, status=409)
+
+
+def jobContext(job: Job) -> dict:
+    """Returns the template context of a job's status."""
+    months = job.result.get("months") or ([job.result["month"]] if "month" in job.result else [])
+    return {"job": job, "months": [parseMonth(month) for month in months]}
+
+
+class CloneRosterView(View):
+    """Queues copying a roster into the month of the url.
+    The `source` parameter is the YYYY-MM month to copy and defaults to the
+    previous month. The copy runs as a background job, see `roster.jobs`.
+    """
+
+    def post(self, request, year, month):
+        """Checks the months and queues the clone."""
+        target = checkMonth(year, month)
+        try:
+            sourceMonth = parseMonth(request.POST.get("source") or f"{target - datetime.timedelta(days=1):%Y-%m}")
+        except ValueError:
+            raise BadRequest("Invalid source month, expected YYYY-MM.")
+        source = Roster.objects.filter(date__range=monthRange(sourceMonth.year, sourceMonth.month)).first()
+        if source is None:
+            return jobConflict(request, f"{sourceMonth:%B %Y} has no roster to copy.")
+        if Roster.objects.filter(date__range=monthRange(year, month)).exists():
+            return jobConflict(request, f"{target:%B %Y} already has a roster.")
+        return jobResponse(request, enqueueJob(Job.CLONE, {"source": source.id, "month": f"{target:%Y-%m}"}))
+
+
+class GenerateRosterView(View):
+    """Queues generating the shifts of the rosters of the month of the url.
+    The `optimize` parameter runs the optimizer of `roster.optimizer`.
+    """
+
+    def post(self, request, year, month):
+        """Queues the generation."""
+        target = checkMonth(year, month)
+        rosters = list(Roster.objects.filter(date__range=monthRange(year, month)).values_list("id", flat=True))
+        if not rosters:
+            return jobConflict(request, f"{target:%B %Y} has no roster to generate.")
+        params = {"rosters": rosters, "optimize": bool(request.POST.get("optimize"))}
+        return jobResponse(request, enqueueJob(Job.GENERATE, params))
+
+
+class JobStatusView(View):
+    """The status of a background job.
+    htmx requests get the status fragment alone, which the page polls until
+    the job is finished.
+    """
+
+    async def get(self, request, id):
+        """Returns the job's status."""
+        job = await aget_object_or_404(Job, id=id)
+        template = "roster/job_status.html" if isPartial(request) else "roster/job.html"
+        return render(request, template, jobContext(job))
+
+
+class JobOutputView(View):
+    """Downloads the file a finished job made, streamed from the storage."""
+
+    async def get(self, request, id):
+        """Returns the job's output as an attachment."""
+        job = await aget_object_or_404(Job, id=id, status=Job.DONE)
+        if not job.output:
+            raise Http404("The job made no file.")
+        try:
+            output = job.output.open("rb")
+        except FileNotFoundError:
+            raise Http404("The job's file is gone.")
+        response = FileResponse(output, as_attachment=True, filename=job.outputName, content_type=job.outputType)
+        if isinstance(request, ASGIRequest):
+            # Read the file in a thread instead of all at once by the handler.
+            response.streaming_content = astream(response.streaming_content)
+        return response
+
+
+class FairnessReportView(TemplateView):
+    """Each staff's morning and afternoon shifts in a year or a month.
+    The report reads the materialized `StaffShiftCount` rows only, so it
+    costs the same however many years of shifts are kept. The view is
+    async, like `RosterMonthView`.
+    """
+    template_name = "roster/fairness_report.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        """Checks the year and month of the url."""
+        if not datetime.MINYEAR < kwargs["year"] < datetime.MAXYEAR or not 1 <= kwargs.get("month", 1) <= 12:
+            raise Http404("Invalid month.")
+        return super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        """Returns the report."""
+        year, month = self.kwargs["year"], self.kwargs.get("month")
+        if month is None:
+            self.first, self.last = datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+        else:
+            self.first, self.last = monthRange(year, month)
+        self.rows = [row async for row in fairnessRows(self.first, self.last)]
+        return self.render_to_response(self.get_context_data(**kwargs))
+
+    def get_context_data(self, **kwargs):
+        """Adds the period and the rows to the context."""
+        context = super().get_context_data(**kwargs)
+        context["first"] = self.first
+        context["rows"] = self.rows
+        context["isMonth"] = "month" in self.kwargs
+        return context
+
+
+class RosterExportView(View):
+    """Streams the shifts of a range of months as a spreadsheet.
+    The `start` and `end` parameters are YYYY-MM months; `end` defaults to
+    `start`. POST requests run the export as a background job instead.
+    Attributes:
+    - formats: The content type of each export format.
+    """
+    formats = EXPORTTYPES
+
+    def months(self, format: str, data: QueryDict) -> tuple[datetime.date, datetime.date]:
+        """Returns the first dates of the start and end months of the parameters.
+        Raises:
+        - Http404: If the format is unknown.
+        - BadRequest: If the months are malformed or out of order.
+        """
+        if format not in self.formats:
+            raise Http404("Unknown export format.")
+        try:
+            start = parseMonth(data.get("start", ""))
+            end = parseMonth(data.get("end") or data.get("start", ""))
+        except ValueError:
+            raise BadRequest("Invalid month, expected YYYY-MM.")
+        if end < start:
+            raise BadRequest("The end month is before the start month.")
+        return start, end
+
+    def get(self, request, format):
+        """Returns a streaming response with the shifts of the months."""
+        start, end = self.months(format, request.GET)
+        last = monthRange(end.year, end.month)[1]
+        rows = exportRows(start, last)
+        content = streamCsv(rows) if format == "csv" else streamXlsx(rows)
+        if isinstance(request, ASGIRequest):
+            content = astream(content)
+        response = StreamingHttpResponse(content, content_type=self.formats[format])
+        filename = f"roster-{start:%Y-%m}-{end:%Y-%m}.{format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def post(self, request, format):
+        """Queues the export as a background job, whose output is downloaded when it is done."""
+        start, end = self.months(format, request.POST)
+        params = {"format": format, "start": f"{start:%Y-%m}", "end": f"{end:%Y-%m}"}
+        return jobResponse(request, enqueueJob(Job.EXPORT, params))
+
+
+class ApiListView(View):
+    """Read only JSON lists of staffs, rosters, days and shifts, and of deleted rows.
+    Parameters, all optional:
+    - fields: Comma separated fields of the rows; `id` and `updatedAt` are always sent.
+    - since: An ISO 8601 datetime; only rows updated since, less `roster.api.SINCEOVERLAP`, are sent.
+    - cursor: The `next` cursor of the previous page.
+    - limit: The number of rows in a page, at most `roster.api.MAXPAGESIZE`.
+    """
+
+    async def get(self, request, resource):
+        """Returns a page of rows as `{"results": [...], "next": cursor}`."""
+        if resource not in RESOURCES:
+            return JsonResponse({"error": f"Unknown resource {resource!r}."}, status=404)
+        try:
+            fieldNames = RESOURCES[resource].fieldNames(request.GET.get("fields"))
+            since = parseSince(request.GET.get("since"))
+            pageSize = parsePageSize(request.GET.get("limit"))
+            page = await apage(RESOURCES[resource], fieldNames, request.GET.get("cursor"), pageSize, since)
+        except (ValueError, ValidationError) as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return HttpResponse(dumpPage(page), content_type="application/json")
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class TimingStatsView(TemplateView):
+    """Shows the request time percentiles of each view, for staff users only.
+    The timings are kept in memory by `roster.timing.ServerTimingMiddleware`,
+    so each server process shows its own latest requests.
+    """
+    template_name = "roster/timing_stats.html"
+
+    def get_context_data(self, **kwargs):
+        """Adds the timing stats to the context."""
+        context = super().get_context_data(**kwargs)
+        context["stats"] = timingLog.stats()
+        return context